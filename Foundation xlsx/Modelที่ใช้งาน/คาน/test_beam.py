@@ -9,9 +9,17 @@ Output: Cut Length, Volume Cut/Full, Steel Cut/Full, Formwork
 3. ได้ผลลัพธ์ทั้งหมด
 """
 
-from beam_ml import load_and_predict
+import os
 import sys
 
+# โมดูลกลาง (inference.py, model_registry.py) อยู่ที่ root ของ repo
+# ใช้ inference โดยตรง (NumPy อย่างเดียว) ไม่ต้อง import สคริปต์เทรนที่โหลด pandas / scikit-learn
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from inference import load_and_predict
+
 def clear_screen():
     """ล้างหน้าจอ"""
     print("\n" * 2)
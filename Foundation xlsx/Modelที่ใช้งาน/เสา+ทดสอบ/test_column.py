@@ -1,4 +1,14 @@
-from column_ml import load_and_predict
+import os
+import sys
+
+# โมดูลกลาง (inference.py, model_registry.py) อยู่ที่ root ของ repo
+# ใช้ inference โดยตรง (NumPy อย่างเดียว) ไม่ต้อง import สคริปต์เทรนที่โหลด pandas / scikit-learn
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from inference import load_and_predict
+
 
 # ตัวอย่างที่ 1: เสา C01 - 300x1200 mm, สูง 2.80 m
 print("=== ตัวอย่างที่ 1: เสา 300x1200 mm ===")
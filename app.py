@@ -6,10 +6,18 @@ Streamlit UI - Construction Quantity Estimation (Simplified)
 รัน: streamlit run app_simplified.py
 """
 
+import io
+
 import streamlit as st
-import pickle
-import pandas as pd
-import os
+
+# pandas / bulk_estimate import เมื่อใช้งานจริง (ลดเวลา cold start)
+# ส่วนทำนายใช้ NumPy อย่างเดียว - ไม่ import scikit-learn (ดู compact_model.py)
+from model_registry import get_registry
+from inference import predict_cached
+from prediction_cache import get_prediction_cache
+from running_totals import RunningTotals
+from line_items import ItemStore
+from item_formulas import beam_item, column_item, foundation_item, slab_item
 
 # ===================================
 # Configuration
@@ -20,37 +28,37 @@ st.set_page_config(
     layout="wide"
 )
 
+# จำนวนรายการต่อหน้าในตารางรายการของแต่ละส่วนงาน
+PAGE_SIZE = 50
+
 # ===================================
 # Load Model Function
 # ===================================
-def load_model(model_file):
-    """โหลดโมเดล - ลองหาในหลาย path"""
-    paths = [
-        f"models/{model_file}",
-        model_file,
-        f"../{model_file}",
-        f"../../{model_file}"
-    ]
-    
-    for path in paths:
-        if os.path.exists(path):
-            try:
-                with open(path, 'rb') as f:
-                    data = pickle.load(f)
-                return data['model'], data['scaler'], data['feature_names']
-            except Exception as e:
-                continue
-    
-    return None, None, None
+@st.cache_resource
+def get_model_registry():
+    """Registry ของโมเดล - ใช้ร่วมกันทุก session และทุกครั้งที่ rerun"""
+    return get_registry()
+
+@st.cache_resource
+def get_shared_prediction_cache():
+    """cache ผลทำนาย (LRU) - ใช้ร่วมกันทุก session ขนาดเดียว (เช่น เสา 0.30×0.30×2.80) ไม่ต้องทำนายซ้ำ"""
+    return get_prediction_cache()
+
+@st.cache_data(show_spinner="กำลังประมาณการทั้งไฟล์...")
+def run_bulk_estimate(data, file_name, element):
+    """อ่าน schedule ที่อัปโหลดครั้งเดียวแล้วทำนายทุกแถวแบบ batch"""
+    from bulk_estimate import estimate_file
 
-def predict(model, scaler, features, input_data):
-    """ทำนายจากโมเดล"""
+    source = io.BytesIO(data)
+    source.name = file_name
+    return estimate_file(source, element=element, registry=get_model_registry())
+
+def predict(model_file, input_data):
+    """ทำนายจากโมเดล (ผ่าน prediction cache) คืนค่า None ถ้าไม่มีไฟล์โมเดล"""
     try:
-        X = pd.DataFrame([input_data])[features]
-        from sklearn.linear_model import LinearRegression
-        if isinstance(model, LinearRegression):
-            X = scaler.transform(X)
-        return model.predict(X)[0]
+        return predict_cached(model_file, input_data, get_model_registry(), get_shared_prediction_cache())
+    except FileNotFoundError:
+        return None
     except Exception as e:
         st.error(f"Error: {e}")
         return None
@@ -58,19 +66,186 @@ def predict(model, scaler, features, input_data):
 # ===================================
 # Initialize Session State
 # ===================================
+# รายการแต่ละส่วนงานเก็บแบบ columnar (ดู line_items.py)
 if 'foundation_items' not in st.session_state:
-    st.session_state.foundation_items = []
+    st.session_state.foundation_items = ItemStore('foundation')
 if 'column_items' not in st.session_state:
-    st.session_state.column_items = []
+    st.session_state.column_items = ItemStore('column')
 if 'slab_items' not in st.session_state:
-    st.session_state.slab_items = []
+    st.session_state.slab_items = ItemStore('slab')
 if 'beam_items' not in st.session_state:
-    st.session_state.beam_items = []
+    st.session_state.beam_items = ItemStore('beam')
+# ผลรวมต่อส่วนงาน/ทั้งหมด - อัปเดตตอนเพิ่ม/ลบรายการ ไม่ต้องวนรวมใหม่ทุก rerun
+if 'totals' not in st.session_state:
+    st.session_state.totals = RunningTotals({
+        'foundation': st.session_state.foundation_items,
+        'column': st.session_state.column_items,
+        'slab': st.session_state.slab_items,
+        'beam': st.session_state.beam_items,
+    })
+
+# ===================================
+# รายการของส่วนงาน (ตารางแบ่งหน้า + ลบหลายรายการ)
+# ===================================
+ITEM_SECTIONS = [
+    ('foundation', 'Foundation'),
+    ('column', 'Column'),
+    ('slab', 'Slab'),
+    ('beam', 'Beam'),
+]
+
+def show_items(category, title):
+    """ตารางรายการทีละหน้า เลือกได้หลายแถวแล้วลบพร้อมกันด้วย id (render เฉพาะหน้าที่แสดง)"""
+    store = st.session_state[f"{category}_items"]
+    if not len(store):
+        return
+    
+    st.markdown(f"### 📋 รายการ {title} ({len(store):,} รายการ)")
+    
+    pages = (len(store) - 1) // PAGE_SIZE + 1
+    page = 1
+    if pages > 1:
+        page_key = f"page_{category}"
+        # ลบรายการจนจำนวนหน้าลดลง - เลื่อนกลับมาหน้าสุดท้ายที่ยังมีอยู่
+        if st.session_state.get(page_key, 1) > pages:
+            st.session_state[page_key] = pages
+        page = st.number_input(f"หน้า (จาก {pages})", min_value=1, max_value=pages, step=1, key=page_key)
+    start = (page - 1) * PAGE_SIZE
+    
+    column_config = {label: st.column_config.NumberColumn(format="%.2f") for label in store.float_labels()}
+    event = st.dataframe(store.page(start, start + PAGE_SIZE), use_container_width=True, hide_index=True,
+                         column_config=column_config, on_select="rerun", selection_mode="multi-row",
+                         key=f"table_{category}_{store.version}_{page}")
+    
+    # แถวที่เลือก (ตำแหน่งในหน้านี้) -> id ของรายการ
+    page_ids = store.ids[start:start + PAGE_SIZE]
+    selected = [int(page_ids[row]) for row in event.selection.rows if row < len(page_ids)]
+    if selected and st.button(f"🗑️ ลบที่เลือก ({len(selected)} รายการ)", key=f"del_{category}"):
+        st.session_state.totals.remove_many(category, store.delete_ids(selected))
+        # rerun เฉพาะ fragment (ตารางรายการ + สรุป) ไม่ต้องรันฟอร์ม/ทำนายใหม่ทั้งหน้า
+        st.rerun(scope="fragment")
+
+@st.fragment
+def show_item_lists(list_slots, summary_slot):
+    """ตารางรายการทุกส่วนงานและสรุปผลรวม (เขียนลง container ที่สร้างไว้ในตำแหน่งของแต่ละส่วน)
+    ลบรายการแล้วรันเฉพาะ fragment นี้ - ส่วนอื่นของหน้าไม่ถูก render ใหม่"""
+    for category, title in ITEM_SECTIONS:
+        with list_slots[category]:
+            show_items(category, title)
+    with summary_slot:
+        show_summary()
+
+# ===================================
+# สรุปผลรวม
+# ===================================
+def show_summary():
+    """สรุปผลรวมทั้งหมดจาก RunningTotals"""
+    st.markdown("## 📊 สรุปผลรวมทั้งหมด")
+    
+    totals = st.session_state.totals
+    grand = totals.grand()
+    total_volume = grand['volume']
+    total_formwork = grand['formwork']
+    total_steel = grand['steel']
+    
+    if total_volume > 0:
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.markdown(f"""
+            <div style='background-color: #e3f2fd; padding: 20px; border-radius: 10px; text-align: center;'>
+                <h2 style='color: #1976d2; margin: 0;'>📦 Volume</h2>
+                <h1 style='color: #1976d2; margin: 10px 0;'>{total_volume:.2f}</h1>
+                <p style='color: #1976d2; margin: 0; font-size: 1.2em;'>m³</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown(f"""
+            <div style='background-color: #f3e5f5; padding: 20px; border-radius: 10px; text-align: center;'>
+                <h2 style='color: #7b1fa2; margin: 0;'>📐 Formwork</h2>
+                <h1 style='color: #7b1fa2; margin: 10px 0;'>{total_formwork:.2f}</h1>
+                <p style='color: #7b1fa2; margin: 0; font-size: 1.2em;'>m²</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col3:
+            st.markdown(f"""
+            <div style='background-color: #fff3e0; padding: 20px; border-radius: 10px; text-align: center;'>
+                <h2 style='color: #e65100; margin: 0;'>🔩 Steel</h2>
+                <h1 style='color: #e65100; margin: 10px 0;'>{total_steel:.2f}</h1>
+                <p style='color: #e65100; margin: 0; font-size: 1.2em;'>kg ({total_steel/1000:.2f} ตัน)</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        # ตารางสรุป
+        st.markdown("### 📋 รายละเอียดสรุป")
+        
+        summary_data = []
+        for category in totals.categories():
+            t = totals.category(category)
+            steel = f"{t['steel']:.2f}" if totals.has_steel(category) else '-'
+            summary_data.append({'ส่วนงาน': category.capitalize(), 'Volume (m³)': f"{t['volume']:.2f}",
+                                 'Formwork (m²)': f"{t['formwork']:.2f}", 'Steel (kg)': steel})
+        
+        if summary_data:
+            st.dataframe(summary_data, use_container_width=True)
+    else:
+        st.info("📝 กรุณาเพิ่มรายการอย่างน้อย 1 ส่วนงานเพื่อดูผลรวม")
+
+# ===================================
+# โปรเจกต์ (บันทึก/เปิดไฟล์)
+# ===================================
+def project_stores():
+    return {category: st.session_state[f"{category}_items"] for category, _ in ITEM_SECTIONS}
+
+def show_project_panel():
+    """บันทึก/เปิดโปรเจกต์เป็นไฟล์ SQLite (ดู project_store.py)"""
+    from project_store import PROJECT_SUFFIX
+    
+    st.markdown("## 💾 โปรเจกต์")
+    path = st.text_input("ไฟล์โปรเจกต์", value=f"project{PROJECT_SUFFIX}", key="project_path")
+    col1, col2 = st.columns(2)
+    
+    if col1.button("💾 บันทึก", key="project_save"):
+        from project_store import model_versions, save_project
+        try:
+            save_project(path, project_stores(), model_versions(get_model_registry()))
+        except Exception as e:
+            st.error(f"Error: {e}")
+        else:
+            st.success(f"✅ บันทึกแล้ว: {path}")
+    
+    if col2.button("📂 เปิด", key="project_open"):
+        from project_store import open_project
+        try:
+            stores, refreshed = open_project(path, get_model_registry())
+        except Exception as e:
+            st.error(f"Error: {e}")
+        else:
+            for category, store in stores.items():
+                st.session_state[f"{category}_items"] = store
+            st.session_state.totals = RunningTotals(stores)
+            # ล้างการเลือกแถว/หน้าของตารางจากโปรเจกต์เดิม
+            for key in list(st.session_state):
+                if key.startswith(("table_", "page_")):
+                    del st.session_state[key]
+            message = f"✅ เปิดโปรเจกต์ {path} ({sum(len(store) for store in stores.values()):,} รายการ)"
+            if refreshed:
+                message += f" - โมเดลเปลี่ยน ทำนายใหม่: {', '.join(refreshed)}"
+            st.session_state.project_message = message
+            st.rerun()
+    
+    if 'project_message' in st.session_state:
+        st.success(st.session_state.pop('project_message'))
 
 # ===================================
 # Main App
 # ===================================
 def main():
+    with st.sidebar:
+        show_project_panel()
+    
     # Header
     st.markdown("# 🏗️ Construction Quantity Estimation")
     st.markdown("### ระบบประมาณการปริมาณงานก่อสร้าง")
@@ -107,6 +282,9 @@ def main():
     
     st.markdown("---")
     
+    # container ของตารางรายการแต่ละส่วนงาน
+    list_slots = {}
+    
     # ===================================
     # 1. FOUNDATION - ลด Input เหลือ 4 ตัว
     # ===================================
@@ -126,57 +304,13 @@ def main():
         submitted_f = st.form_submit_button("➕ เพิ่ม Foundation", type="primary")
         
         if submitted_f:
-            # คำนวณค่าอื่นๆ อัตโนมัติ
-            f_area = f_width * f_length
-            f_perimeter = 2 * (f_width + f_length)
-            
-            # คำนวณด้วยสูตร
-            volume = f_width * f_length * f_thickness * f_count
-            formwork = (2 * (f_width + f_length) * f_thickness) * f_count
-            
-            # ลองใช้โมเดล
-            data = {
-                'Width': f_width,
-                'Length': f_length,
-                'Thickness': f_thickness,
-                'Area': f_area,
-                'Perimeter': f_perimeter,
-                'Count': f_count
-            }
-            
-            model_vol, scaler_vol, features_vol = load_model("foundation_volume_model.pkl")
-            model_form, scaler_form, features_form = load_model("foundation_formwork_model.pkl")
-            
-            if model_vol and model_form:
-                volume_ml = predict(model_vol, scaler_vol, features_vol, data)
-                formwork_ml = predict(model_form, scaler_form, features_form, data)
-                if volume_ml and formwork_ml:
-                    volume = volume_ml * f_count
-                    formwork = formwork_ml * f_count
-            
-            st.session_state.foundation_items.append({
-                'width': f_width,
-                'length': f_length,
-                'thickness': f_thickness,
-                'count': f_count,
-                'volume': volume,
-                'formwork': formwork
-            })
+            item = foundation_item(f_width, f_length, f_thickness, f_count, predict)
+            st.session_state.foundation_items.append(item)
+            st.session_state.totals.add('foundation', item)
             st.success(f"✅ เพิ่ม Foundation จำนวน {f_count} รายการ")
     
-    # แสดงรายการ Foundation
-    if st.session_state.foundation_items:
-        st.markdown("### 📋 รายการ Foundation")
-        for i, item in enumerate(st.session_state.foundation_items):
-            col1, col2, col3 = st.columns([3, 1, 1])
-            with col1:
-                st.write(f"**รายการ {i+1}:** {item['width']}m × {item['length']}m × {item['thickness']}m × {item['count']} ชิ้น")
-            with col2:
-                st.write(f"Volume: {item['volume']:.2f} m³")
-            with col3:
-                if st.button("🗑️ ลบ", key=f"del_f_{i}"):
-                    st.session_state.foundation_items.pop(i)
-                    st.rerun()
+    # แสดงรายการ Foundation (เขียนโดย show_item_lists)
+    list_slots['foundation'] = st.container()
     
     st.markdown("---")
     
@@ -199,59 +333,13 @@ def main():
         submitted_c = st.form_submit_button("➕ เพิ่ม Column", type="primary")
         
         if submitted_c:
-            # คำนวณค่าอื่นๆ อัตโนมัติ
-            c_perimeter = 2 * (c_width + c_depth)
-            c_area = c_width * c_depth
-            
-            # คำนวณด้วยสูตร
-            volume = c_width * c_depth * c_height * c_count
-            formwork = c_perimeter * c_height * c_count
-            steel = volume * 110
-            
-            # ลองใช้โมเดล
-            data = {
-                'Width': c_width,
-                'Depth': c_depth,
-                'Length': c_height,
-                'Perimeter': c_perimeter,
-                'Area Column': c_area
-            }
-            
-            model_vol, scaler_vol, features_vol = load_model("column_volume_model.pkl")
-            model_form, scaler_form, features_form = load_model("column_formwork_model.pkl")
-            
-            if model_vol and model_form:
-                volume_ml = predict(model_vol, scaler_vol, features_vol, data)
-                formwork_ml = predict(model_form, scaler_form, features_form, data)
-                if volume_ml and formwork_ml:
-                    volume = volume_ml * c_count
-                    formwork = formwork_ml * c_count
-                    steel = volume * 110
-            
-            st.session_state.column_items.append({
-                'width': c_width,
-                'depth': c_depth,
-                'height': c_height,
-                'count': c_count,
-                'volume': volume,
-                'formwork': formwork,
-                'steel': steel
-            })
+            item = column_item(c_width, c_depth, c_height, c_count, predict)
+            st.session_state.column_items.append(item)
+            st.session_state.totals.add('column', item)
             st.success(f"✅ เพิ่ม Column จำนวน {c_count} รายการ")
     
-    # แสดงรายการ Column
-    if st.session_state.column_items:
-        st.markdown("### 📋 รายการ Column")
-        for i, item in enumerate(st.session_state.column_items):
-            col1, col2, col3 = st.columns([3, 1, 1])
-            with col1:
-                st.write(f"**รายการ {i+1}:** {item['width']}m × {item['depth']}m × {item['height']}m × {item['count']} ต้น")
-            with col2:
-                st.write(f"Volume: {item['volume']:.2f} m³, Steel: {item['steel']:.2f} kg")
-            with col3:
-                if st.button("🗑️ ลบ", key=f"del_c_{i}"):
-                    st.session_state.column_items.pop(i)
-                    st.rerun()
+    # แสดงรายการ Column (เขียนโดย show_item_lists)
+    list_slots['column'] = st.container()
     
     st.markdown("---")
     
@@ -274,45 +362,13 @@ def main():
         submitted_s = st.form_submit_button("➕ เพิ่ม Slab", type="primary")
         
         if submitted_s:
-            s_type_code = 0 if s_type == "RC Slab" else 1
-            
-            # ประมาณ Perimeter จาก Area (สมมติเป็นสี่เหลี่ยมผืนผ้า)
-            # ถ้า Area = L × W และสมมติ L/W ≈ 1.5 (อัตราส่วนทั่วไป)
-            # Perimeter ≈ 2 × sqrt(Area × 5)
-            s_perimeter = 2 * (s_area ** 0.5) * 2.5
-            
-            # คำนวณด้วยสูตร
-            volume = s_area * s_thickness * s_count
-            formwork_side = s_perimeter * s_thickness * s_count
-            formwork_all = (formwork_side + s_area) * s_count
-            steel_per_m3 = 90 if s_type_code == 0 else 60
-            steel = volume * steel_per_m3
-            
-            st.session_state.slab_items.append({
-                'type': s_type,
-                'thickness': s_thickness,
-                'area': s_area,
-                'count': s_count,
-                'volume': volume,
-                'formwork_side': formwork_side,
-                'formwork_all': formwork_all,
-                'steel': steel
-            })
+            item = slab_item(s_type, s_thickness, s_area, s_count)
+            st.session_state.slab_items.append(item)
+            st.session_state.totals.add('slab', item)
             st.success(f"✅ เพิ่ม {s_type} จำนวน {s_count} รายการ")
     
-    # แสดงรายการ Slab
-    if st.session_state.slab_items:
-        st.markdown("### 📋 รายการ Slab")
-        for i, item in enumerate(st.session_state.slab_items):
-            col1, col2, col3 = st.columns([3, 1, 1])
-            with col1:
-                st.write(f"**รายการ {i+1}:** {item['type']} - {item['area']}m² × {item['thickness']}m × {item['count']} ชิ้น")
-            with col2:
-                st.write(f"Volume: {item['volume']:.2f} m³, Steel: {item['steel']:.2f} kg")
-            with col3:
-                if st.button("🗑️ ลบ", key=f"del_s_{i}"):
-                    st.session_state.slab_items.pop(i)
-                    st.rerun()
+    # แสดงรายการ Slab (เขียนโดย show_item_lists)
+    list_slots['slab'] = st.container()
     
     st.markdown("---")
     
@@ -335,168 +391,64 @@ def main():
         submitted_b = st.form_submit_button("➕ เพิ่ม Beam", type="primary")
         
         if submitted_b:
-            # คำนวณด้วยสูตรก่อน
-            cut_length = b_length * 0.85  # ประมาณการ 85% ของความยาวเต็ม
-            volume_cut = b_b * b_h * cut_length * b_count
-            volume_full = b_b * b_h * b_length * b_count
-            steel_cut = volume_cut * 110
-            steel_full = volume_full * 110
-            formwork = 2 * (b_b + b_h) * b_length * b_count
-            
-            # ลองใช้โมเดล
-            data_input = {
-                'B': b_b,
-                'H': b_h,
-                'Length': b_length
-            }
-            
-            model_cut, scaler_cut, features_cut = load_model("beam_cut_length_model.pkl")
-            model_form, scaler_form, features_form = load_model("beam_formwork_model.pkl")
-            
-            if model_cut and model_form:
-                cut_length_ml = predict(model_cut, scaler_cut, features_cut, data_input)
-                if cut_length_ml:
-                    cut_length = cut_length_ml
-                    volume_cut = b_b * b_h * cut_length * b_count
-                    steel_cut = volume_cut * 110
-                    
-                    data_with_cut = {
-                        'B': b_b,
-                        'H': b_h,
-                        'Cut Length': cut_length,
-                        'Length': b_length
-                    }
-                    formwork_ml = predict(model_form, scaler_form, features_form, data_with_cut)
-                    if formwork_ml:
-                        formwork = formwork_ml * b_count
-            
-            st.session_state.beam_items.append({
-                'b': b_b,
-                'h': b_h,
-                'length': b_length,
-                'count': b_count,
-                'cut_length': cut_length,
-                'volume_cut': volume_cut,
-                'volume_full': volume_full,
-                'steel_cut': steel_cut,
-                'steel_full': steel_full,
-                'formwork': formwork
-            })
+            item = beam_item(b_b, b_h, b_length, b_count, predict)
+            st.session_state.beam_items.append(item)
+            st.session_state.totals.add('beam', item)
             st.success(f"✅ เพิ่ม Beam จำนวน {b_count} รายการ")
     
-    # แสดงรายการ Beam
-    if st.session_state.beam_items:
-        st.markdown("### 📋 รายการ Beam")
-        for i, item in enumerate(st.session_state.beam_items):
-            col1, col2, col3 = st.columns([3, 1, 1])
-            with col1:
-                st.write(f"**รายการ {i+1}:** {item['b']}m × {item['h']}m × {item['length']}m × {item['count']} เส้น")
-            with col2:
-                st.write(f"Volume (Full): {item['volume_full']:.2f} m³")
-            with col3:
-                if st.button("🗑️ ลบ", key=f"del_b_{i}"):
-                    st.session_state.beam_items.pop(i)
-                    st.rerun()
+    # แสดงรายการ Beam (เขียนโดย show_item_lists)
+    list_slots['beam'] = st.container()
     
-    # ===================================
-    # SUMMARY / TOTAL
-    # ===================================
     st.markdown("---")
-    st.markdown("## 📊 สรุปผลรวมทั้งหมด")
     
-    total_volume = 0
-    total_formwork = 0
-    total_steel = 0
-    
-    # คำนวณผลรวม Foundation
-    for item in st.session_state.foundation_items:
-        total_volume += item['volume']
-        total_formwork += item['formwork']
-    
-    # คำนวณผลรวม Column
-    for item in st.session_state.column_items:
-        total_volume += item['volume']
-        total_formwork += item['formwork']
-        total_steel += item['steel']
-    
-    # คำนวณผลรวม Slab
-    for item in st.session_state.slab_items:
-        total_volume += item['volume']
-        total_formwork += item['formwork_all']
-        total_steel += item['steel']
-    
-    # คำนวณผลรวม Beam
-    for item in st.session_state.beam_items:
-        total_volume += item['volume_full']
-        total_formwork += item['formwork']
-        total_steel += item['steel_full']
+    # ===================================
+    # 5. BULK - อัปโหลด Revit Schedule ทั้งไฟล์
+    # ===================================
+    st.markdown("## 5️⃣ Bulk Schedule (Revit)")
     
-    if total_volume > 0:
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown(f"""
-            <div style='background-color: #e3f2fd; padding: 20px; border-radius: 10px; text-align: center;'>
-                <h2 style='color: #1976d2; margin: 0;'>📦 Volume</h2>
-                <h1 style='color: #1976d2; margin: 10px 0;'>{total_volume:.2f}</h1>
-                <p style='color: #1976d2; margin: 0; font-size: 1.2em;'>m³</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown(f"""
-            <div style='background-color: #f3e5f5; padding: 20px; border-radius: 10px; text-align: center;'>
-                <h2 style='color: #7b1fa2; margin: 0;'>📐 Formwork</h2>
-                <h1 style='color: #7b1fa2; margin: 10px 0;'>{total_formwork:.2f}</h1>
-                <p style='color: #7b1fa2; margin: 0; font-size: 1.2em;'>m²</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(f"""
-            <div style='background-color: #fff3e0; padding: 20px; border-radius: 10px; text-align: center;'>
-                <h2 style='color: #e65100; margin: 0;'>🔩 Steel</h2>
-                <h1 style='color: #e65100; margin: 10px 0;'>{total_steel:.2f}</h1>
-                <p style='color: #e65100; margin: 0; font-size: 1.2em;'>kg ({total_steel/1000:.2f} ตัน)</p>
-            </div>
-            """, unsafe_allow_html=True)
+    uploaded = st.file_uploader("อัปโหลดไฟล์ Schedule (.csv / .xlsx) เช่น 2.0 Column ปริมาณเสา.csv",
+                                type=["csv", "xlsx"], key="bulk_file")
+    if uploaded is not None:
+        bulk_element = st.selectbox("ประเภทส่วนงาน", ["อัตโนมัติ", "foundation", "column", "beam", "slab"],
+                                    key="bulk_element")
+        element = None if bulk_element == "อัตโนมัติ" else bulk_element
         
-        # ตารางสรุป
-        st.markdown("### 📋 รายละเอียดสรุป")
-        
-        summary_data = []
-        
-        if st.session_state.foundation_items:
-            f_vol = sum(i['volume'] for i in st.session_state.foundation_items)
-            f_form = sum(i['formwork'] for i in st.session_state.foundation_items)
-            summary_data.append({'ส่วนงาน': 'Foundation', 'Volume (m³)': f"{f_vol:.2f}", 'Formwork (m²)': f"{f_form:.2f}", 'Steel (kg)': '-'})
-        
-        if st.session_state.column_items:
-            c_vol = sum(i['volume'] for i in st.session_state.column_items)
-            c_form = sum(i['formwork'] for i in st.session_state.column_items)
-            c_steel = sum(i['steel'] for i in st.session_state.column_items)
-            summary_data.append({'ส่วนงาน': 'Column', 'Volume (m³)': f"{c_vol:.2f}", 'Formwork (m²)': f"{c_form:.2f}", 'Steel (kg)': f"{c_steel:.2f}"})
-        
-        if st.session_state.slab_items:
-            s_vol = sum(i['volume'] for i in st.session_state.slab_items)
-            s_form = sum(i['formwork_all'] for i in st.session_state.slab_items)
-            s_steel = sum(i['steel'] for i in st.session_state.slab_items)
-            summary_data.append({'ส่วนงาน': 'Slab', 'Volume (m³)': f"{s_vol:.2f}", 'Formwork (m²)': f"{s_form:.2f}", 'Steel (kg)': f"{s_steel:.2f}"})
-        
-        if st.session_state.beam_items:
-            b_vol = sum(i['volume_full'] for i in st.session_state.beam_items)
-            b_form = sum(i['formwork'] for i in st.session_state.beam_items)
-            b_steel = sum(i['steel_full'] for i in st.session_state.beam_items)
-            summary_data.append({'ส่วนงาน': 'Beam', 'Volume (m³)': f"{b_vol:.2f}", 'Formwork (m²)': f"{b_form:.2f}", 'Steel (kg)': f"{b_steel:.2f}"})
-        
-        if summary_data:
-            df = pd.DataFrame(summary_data)
-            st.dataframe(df, use_container_width=True)
-    else:
-        st.info("📝 กรุณาเพิ่มรายการอย่างน้อย 1 ส่วนงานเพื่อดูผลรวม")
+        try:
+            result, totals = run_bulk_estimate(uploaded.getvalue(), uploaded.name, element)
+        except Exception as e:
+            st.error(f"Error: {e}")
+        else:
+            if not len(totals):
+                st.info(f"📝 ไม่พบโมเดลของส่วนงานนี้ - ไม่มีผลทำนายจากไฟล์ {uploaded.name}")
+            elif not len(result):
+                st.info(f"📝 ไม่มีแถวที่ทำนายได้ในไฟล์ {uploaded.name} (ทุกแถวขาดขนาดที่โมเดลต้องใช้)")
+            else:
+                st.success(f"✅ ทำนาย {len(result)} แถว จากไฟล์ {uploaded.name}")
+            st.dataframe(result, use_container_width=True)
+            
+            # st.columns(0) error - แสดง metric เฉพาะเมื่อมีผลรวม
+            if len(totals):
+                cols = st.columns(len(totals))
+                for col, (name, value) in zip(cols, totals.items()):
+                    col.metric(name, f"{value:,.2f}")
+            
+            st.download_button("⬇️ ดาวน์โหลดผลลัพธ์ (CSV)",
+                               result.to_csv(index=False).encode("utf-8-sig"),
+                               file_name=f"estimate_{uploaded.name.rsplit('.', 1)[0]}.csv",
+                               mime="text/csv")
+    
+    # ===================================
+    # SUMMARY / TOTAL
+    # ===================================
+    st.markdown("---")
+    summary_slot = st.container()
+    show_item_lists(list_slots, summary_slot)
     
     # Footer
     st.markdown("---")
+    stats = get_shared_prediction_cache().stats()
+    st.caption(f"⚡ Prediction cache: hit {stats['hits']} / miss {stats['misses']} "
+               f"({stats['hit_rate']:.0%}, {stats['size']}/{stats['maxsize']} รายการ)")
     st.markdown("""
     <div style='text-align: center; color: gray; padding: 20px;'>
         <p>⚠️ โปรดทราบ: ผลลัพธ์เป็นการประมาณการ ควรตรวจสอบกับแบบรายละเอียดก่อนใช้งานจริง</p>
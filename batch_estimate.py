@@ -0,0 +1,258 @@
+"""
+Batch Estimation - ประมาณการจาก Revit schedule หลายไฟล์ (หลายโปรเจกต์) ในคำสั่งเดียว ไม่ต้องเปิด UI
+
+- รับไฟล์ .csv / .xlsx หลายไฟล์, glob (เช่น "projects/**/*.csv") หรือโฟลเดอร์
+- แต่ละไฟล์อ่านและทำนายทีละ chunk (bulk_estimate.estimate_chunks) ใน process pool
+  หน่วยความจำต่อ worker คงที่ตาม --chunk-rows แม้ไฟล์ export ทั้งโปรเจกต์จะใหญ่หลายร้อย MB
+  worker โหลดโมเดลครั้งเดียวต่อ process (ModelRegistry) และส่งกลับเฉพาะผลรวม ไม่ส่งตารางทั้งตาราง
+- ผลรายแถวเขียนต่อท้ายทีละ chunk: <output-dir>/<ชื่อไฟล์>.estimate.csv (หรือ .parquet)
+- ผลรวมทุกไฟล์ (1 แถวต่อไฟล์) เขียนที่ <output-dir>/totals.csv และแสดงบนหน้าจอ
+  พร้อมผลรวมค่ารายแถวที่ Revit คำนวณไว้ในไฟล์ เฉพาะแถวที่ทำนาย (คอลัมน์ "<ผลลัพธ์> [schedule]") ไว้ตรวจผลทำนาย
+- แถวที่มีช่องเกิน header (comma ในชื่อ Type) ซ่อมตอนอ่าน - จำนวนที่ซ่อม/ข้ามอยู่ใน repaired_lines / skipped_lines
+- exit code 1 ถ้ามีไฟล์ที่ประมาณการไม่สำเร็จ รวมถึงไฟล์ที่ไม่มีแถวที่ทำนายได้เลย (ใช้ใน script ได้)
+
+รัน:
+    python batch_estimate.py "MODEL ML/*.csv"
+    python batch_estimate.py projects/ --output-dir estimates --format parquet --workers 4
+    python batch_estimate.py "3.0 Framing ปริมาณคาน.csv" --element beam
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bulk_estimate import (CHECK_TOLERANCE_PCT, ELEMENT_MODELS, SCHEDULE_SUFFIX, check_totals, estimate_chunks,
+                           reference_totals)
+from schedule_reader import CHUNK_ROWS, describe_bad_lines, merge_summaries
+from training import SerialExecutor, default_workers
+
+SCHEDULE_EXTENSIONS = ('.csv', '.xlsx')
+OUTPUT_FORMATS = ('csv', 'parquet')
+OUTPUT_SUFFIX = '.estimate'
+TOTALS_FILE = 'totals.csv'
+
+
+# ===================================
+# หาไฟล์ input
+# ===================================
+def expand_inputs(patterns):
+    """แปลงไฟล์ / glob / โฟลเดอร์ เป็น list ของไฟล์ schedule (ไม่ซ้ำ เรียงตามลำดับที่ระบุ)"""
+    paths, seen = [], set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(os.path.join(pattern, name) for name in os.listdir(pattern))
+        elif glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            matches = [pattern]
+        for path in matches:
+            key = os.path.abspath(path)
+            if path.lower().endswith(SCHEDULE_EXTENSIONS) and key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+
+def output_paths(paths, output_dir, fmt):
+    """ไฟล์ผลลัพธ์ของแต่ละ input (ชื่อซ้ำกันจากคนละโฟลเดอร์ -> เติมลำดับ)"""
+    outputs, used = [], set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, n = stem, 1
+        while name in used:
+            n += 1
+            name = f"{stem} ({n})"
+        used.add(name)
+        outputs.append(os.path.join(output_dir, f"{name}{OUTPUT_SUFFIX}.{fmt}"))
+    return outputs
+
+
+# ===================================
+# Worker
+# ===================================
+class ChunkWriter:
+    """เขียนผลรายแถวต่อท้ายไฟล์เดียวทีละ chunk (csv หรือ parquet)"""
+
+    def __init__(self, path, fmt='csv'):
+        self.path = path
+        self.fmt = fmt
+        self._started = False
+        self._parquet = None
+
+    def write(self, df):
+        if self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._parquet is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                # คอลัมน์ที่ว่างทั้ง chunk แรกเป็นชนิด null - ให้เป็นข้อความ chunk ถัดไปจะได้เขียนต่อได้
+                schema = pa.schema([pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                                    for f in table.schema], metadata=table.schema.metadata)
+                self._parquet = pq.ParquetWriter(self.path, schema)
+            table = pa.Table.from_pandas(df, schema=self._parquet.schema, preserve_index=False)
+            self._parquet.write_table(table)
+        elif self._started:
+            df.to_csv(self.path, mode='a', header=False, index=False, encoding='utf-8')
+        else:
+            df.to_csv(self.path, index=False, encoding='utf-8-sig')
+        self._started = True
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+
+def estimate_to_file(path, output, element=None, fmt='csv', chunk_rows=CHUNK_ROWS):
+    """ประมาณการ 1 ไฟล์ทีละ chunk แล้วเขียนผลรายแถว คืนค่าสรุป (dict เล็กๆ ส่งกลับจาก process ลูก)"""
+    start = time.perf_counter()
+    summary = {'source': path, 'element': element, 'rows': 0, 'repaired_lines': 0, 'skipped_lines': 0,
+               'output': None, 'error': None}
+    try:
+        totals, reference, schedule = {}, {}, None
+        # เขียนไฟล์ชั่วคราวก่อน - ไม่เหลือไฟล์ผลลัพธ์ครึ่งๆ กลางๆ ถ้าเขียนไม่สำเร็จ
+        tmp = output + '.tmp'
+        writer = ChunkWriter(tmp, fmt)
+        try:
+            for element, result, chunk_totals, chunk_schedule, bad_lines in estimate_chunks(
+                    path, element, chunk_rows=chunk_rows):
+                schedule = merge_summaries(schedule, chunk_schedule)
+                if bad_lines:
+                    summary['repaired_lines'] += bad_lines['repaired']
+                    summary['skipped_lines'] += bad_lines['skipped']
+                if result is None:
+                    continue
+                summary['element'] = element
+                summary['rows'] += len(result)
+                writer.write(result)
+                for name, value in chunk_totals.items():
+                    totals[name] = totals.get(name, 0.0) + float(value)
+                for name, (col, value) in reference_totals(result, chunk_totals.index).items():
+                    reference[name] = (col, reference.get(name, (col, 0.0))[1] + value)
+            writer.close()
+            if summary['element'] is None:
+                raise ValueError("ไม่มีแถวข้อมูลในไฟล์")
+            if not summary['rows']:
+                # ทุกแถวขาดค่าที่โมเดลต้องใช้ - ไม่นับเป็นไฟล์ที่ประมาณการสำเร็จ
+                raise ValueError(f"ไม่มีแถวที่ทำนายได้ในไฟล์ ({summary['element']})")
+            os.replace(tmp, output)
+        finally:
+            writer.close()
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        summary['output'] = output
+        summary.update(totals)
+        check = check_totals(totals, reference, schedule)
+        summary.update({output + SCHEDULE_SUFFIX: value for output, value in zip(check['output'], check['schedule_total'])})
+    except Exception as e:
+        summary['error'] = f"{type(e).__name__}: {e}"
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def run_batch(paths, output_dir, element=None, fmt='csv', max_workers=None, chunk_rows=CHUNK_ROWS):
+    """ประมาณการทุกไฟล์ คืนค่า list ของสรุปเรียงตามลำดับ input (แสดงผลทันทีที่แต่ละไฟล์เสร็จ)"""
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = output_paths(paths, output_dir, fmt)
+    max_workers = min(max_workers or default_workers(), len(paths)) or 1
+
+    executor = SerialExecutor() if max_workers == 1 else ProcessPoolExecutor(max_workers)
+    try:
+        futures = {executor.submit(estimate_to_file, path, output, element, fmt, chunk_rows): i
+                   for i, (path, output) in enumerate(zip(paths, outputs))}
+        summaries = [None] * len(paths)
+        for future in as_completed(futures):
+            summary = future.result()
+            summaries[futures[future]] = summary
+            name = os.path.basename(summary['source'])
+            if summary['error']:
+                print(f"❌ {name}: {summary['error']}")
+            else:
+                mark = '⚠️' if summary['skipped_lines'] else '✅'
+                print(f"{mark} {name}: {summary['element']} {summary['rows']:,} แถว ({summary['seconds']:.2f} s)")
+            bad_lines = describe_bad_lines({'repaired': summary['repaired_lines'], 'skipped': summary['skipped_lines']})
+            if bad_lines:
+                print(f"    {bad_lines}")
+    finally:
+        if max_workers > 1:
+            executor.shutdown()
+    return summaries
+
+
+def write_totals(summaries, path):
+    """ผลรวมของทุกไฟล์เป็น CSV (1 แถวต่อไฟล์ คอลัมน์ผลลัพธ์ตามที่แต่ละส่วนงานมี)"""
+    import pandas as pd
+
+    pd.DataFrame(summaries).to_csv(path, index=False, encoding='utf-8-sig')
+    return path
+
+
+def print_totals(summaries):
+    """ผลรวมต่อส่วนงาน (รวมทุกไฟล์)"""
+    by_element = {}
+    for summary in summaries:
+        if summary['error']:
+            continue
+        totals = by_element.setdefault(summary['element'], {'files': 0, 'rows': 0})
+        totals['files'] += 1
+        totals['rows'] += summary['rows']
+        checked = totals.setdefault('checked', {})
+        for name in ELEMENT_MODELS.get(summary['element'], {}):
+            if name in summary:
+                totals[name] = totals.get(name, 0.0) + summary[name]
+            # เทียบเฉพาะไฟล์ที่ schedule มีผลรวมของคอลัมน์นั้น: [ผลทำนาย, ผลรวมใน schedule]
+            if name + SCHEDULE_SUFFIX in summary:
+                pair = checked.setdefault(name, [0.0, 0.0])
+                pair[0] += summary[name]
+                pair[1] += summary[name + SCHEDULE_SUFFIX]
+
+    print("\n📊 ผลรวม:")
+    for element, totals in by_element.items():
+        print(f"  {element}: {totals.pop('files')} ไฟล์, {totals.pop('rows'):,} แถว")
+        checked = totals.pop('checked')
+        for name, value in totals.items():
+            line = f"    {name}: {value:,.2f}"
+            if checked.get(name, [0.0, 0.0])[1]:
+                predicted, expected = checked[name]
+                diff = (predicted - expected) / expected * 100
+                mark = '✓' if abs(diff) <= CHECK_TOLERANCE_PCT else '⚠️'
+                line += f"  {mark} schedule {expected:,.2f} เทียบกับ {predicted:,.2f} (ต่าง {diff:+.1f}%)"
+            print(line)
+
+
+# ===================================
+# CLI
+# ===================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ประมาณการปริมาณงานจาก Revit schedule หลายไฟล์ (ไม่ต้องเปิด UI)")
+    parser.add_argument('inputs', nargs='+', help="ไฟล์ .csv / .xlsx, glob หรือโฟลเดอร์")
+    parser.add_argument('--element', choices=sorted(ELEMENT_MODELS), help="ประเภทส่วนงาน (ถ้าไม่ระบุจะเดาจากแต่ละไฟล์)")
+    parser.add_argument('--output-dir', default='estimates', help="โฟลเดอร์ผลลัพธ์")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv', help="รูปแบบไฟล์ผลรายแถว")
+    parser.add_argument('--workers', type=int, help="จำนวน process (ค่าเริ่มต้น = จำนวน core)")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help="จำนวนแถวที่อ่าน/ทำนายต่อครั้ง")
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print("❌ ไม่พบไฟล์ schedule (.csv / .xlsx)")
+        return 1
+
+    print(f"⏳ ประมาณการ {len(paths)} ไฟล์...")
+    start = time.perf_counter()
+    summaries = run_batch(paths, args.output_dir, args.element, args.format, args.workers, args.chunk_rows)
+    totals_path = write_totals(summaries, os.path.join(args.output_dir, TOTALS_FILE))
+
+    print_totals(summaries)
+    failed = sum(1 for summary in summaries if summary['error'])
+    print(f"\n💾 ผลลัพธ์ที่: {args.output_dir} (ผลรวม: {totals_path})")
+    print(f"⏱️ {time.perf_counter() - start:.2f} s, สำเร็จ {len(paths) - failed}/{len(paths)} ไฟล์")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
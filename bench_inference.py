@@ -0,0 +1,212 @@
+"""
+Inference Benchmark - วัดความเร็วการทำนายของโมเดลทุกส่วนงาน (ฐานราก / เสา / คาน / พื้น)
+ใช้ไฟล์โมเดลใน MODEL ML/ (offline ไม่ต้องมีข้อมูลเทรน)
+
+วัดต่อส่วนงาน (แต่ละส่วนงานรันใน process ใหม่ เพื่อให้ cold load และ peak RSS ไม่ปนกัน):
+- cold_load_ms      import inference + โหลดโมเดลทุกไฟล์ของส่วนงาน
+- single-row        p50 / p99 ของ load_and_predict 1 แถว (dict แบบที่ app.py ใช้) หน่วย µs
+- batch             throughput (แถว/วินาที) ที่ 1 / 100 / 10,000 แถว ผ่าน predict_batch
+- peak_rss_mb       หน่วยความจำสูงสุดของ process
+
+backend: compact (NumPy, ค่าเริ่มต้นของ registry) และ pickle (scikit-learn)
+ผลลัพธ์เขียนเป็น JSON ที่ bench_output.txt (เทียบระหว่างเวอร์ชันได้)
+
+รัน:
+    python bench_inference.py
+    python bench_inference.py --elements beam --backends compact --output /tmp/bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, 'MODEL ML')
+OUTPUT_FILE = os.path.join(BASE_DIR, 'bench_output.txt')
+
+ELEMENTS = ['foundation', 'column', 'beam', 'slab']
+BACKENDS = ['compact', 'pickle']
+BATCH_SIZES = [1, 100, 10_000]
+
+SINGLE_ROW_RUNS = 2000
+WARMUP_RUNS = 20
+# เวลาขั้นต่ำที่วัด throughput ของแต่ละขนาด batch
+MIN_BATCH_SECONDS = 0.2
+
+SEED = 42
+
+
+def element_model_files(element, model_dir=MODEL_DIR):
+    """ไฟล์โมเดลทั้งหมดของส่วนงาน เช่น beam -> beam_cut_length_model.pkl, ..."""
+    return sorted(name for name in os.listdir(model_dir)
+                  if name.startswith(element + '_') and name.endswith('_model.pkl'))
+
+
+def percentile(sorted_values, q):
+    """percentile แบบ nearest-rank"""
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+# ===================================
+# วัดใน process ลูก (1 ส่วนงาน × 1 backend)
+# ===================================
+def bench_element(element, backend, model_dir):
+    """วัดทุกโมเดลของส่วนงาน คืนค่า dict ผลลัพธ์"""
+    import resource
+
+    start = time.perf_counter()
+    import numpy as np
+    from inference import load_and_predict, predict_batch
+    from model_registry import ModelRegistry
+
+    registry = ModelRegistry([model_dir], prefer_compact=(backend == 'compact'))
+    files = element_model_files(element, model_dir)
+    loaded = {name: registry.get(name) for name in files}
+    cold_load_ms = (time.perf_counter() - start) * 1000
+
+    rng = np.random.default_rng(SEED)
+    models = []
+    for name, (model, scaler, features) in loaded.items():
+        if model is None:
+            models.append({'model': name, 'error': 'โหลดไม่ได้'})
+            continue
+
+        # input สุ่ม (ค่าไม่มีผลกับเวลา - tree ลึกเท่าเดิม, linear คำนวณเท่าเดิม)
+        dtype = [(feat, 'f8') for feat in features]
+        rows = np.zeros(max(BATCH_SIZES), dtype=dtype)
+        for feat in features:
+            rows[feat] = rng.uniform(0.1, 10.0, len(rows))
+        row = {feat: float(rows[0][feat]) for feat in features}
+
+        # single-row latency (ทางเดียวกับ app.py / test_*.py)
+        for _ in range(WARMUP_RUNS):
+            load_and_predict(name, row, registry)
+        times = []
+        for _ in range(SINGLE_ROW_RUNS):
+            t = time.perf_counter()
+            load_and_predict(name, row, registry)
+            times.append((time.perf_counter() - t) * 1e6)
+        times.sort()
+
+        # batch throughput
+        throughput = {}
+        for size in BATCH_SIZES:
+            batch = rows[:size]
+            predict_batch(name, batch, registry)
+            runs, elapsed = 0, 0.0
+            t = time.perf_counter()
+            while elapsed < MIN_BATCH_SECONDS:
+                predict_batch(name, batch, registry)
+                runs += 1
+                elapsed = time.perf_counter() - t
+            throughput[str(size)] = size * runs / elapsed
+
+        models.append({
+            'model': name,
+            'model_type': type(model).__name__,
+            'features': len(features),
+            'single_row_us': {'p50': percentile(times, 50), 'p99': percentile(times, 99)},
+            'rows_per_sec': throughput,
+        })
+
+    # ru_maxrss เป็น KB บน Linux, bytes บน macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+    return {
+        'element': element,
+        'backend': backend,
+        'cold_load_ms': cold_load_ms,
+        'peak_rss_mb': peak_mb,
+        'sklearn_imported': 'sklearn' in sys.modules,
+        'models': models,
+    }
+
+
+def run_child(element, backend, model_dir):
+    """รัน bench_element ใน process ใหม่"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', element, backend, '--model-dir', model_dir]
+    env = dict(os.environ, PYTHONWARNINGS='ignore')
+    out = subprocess.run(cmd, capture_output=True, text=True, cwd=BASE_DIR, env=env)
+    if out.returncode != 0:
+        return {'element': element, 'backend': backend, 'error': out.stderr.strip().splitlines()[-1:]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# ===================================
+# รายงาน
+# ===================================
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=BASE_DIR)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_report(results):
+    print("\n" + "="*100)
+    print(f"{'model':<32}{'backend':<9}{'p50 µs':>9}{'p99 µs':>9}"
+          + ''.join(f"{f'{size:,} rows/s':>17}" for size in BATCH_SIZES))
+    print("="*100)
+    for result in results:
+        if 'error' in result:
+            print(f"❌ {result['element']} ({result['backend']}): {result['error']}")
+            continue
+        for m in result['models']:
+            if 'error' in m:
+                print(f"❌ {m['model']}: {m['error']}")
+                continue
+            rates = ''.join(f"{m['rows_per_sec'][str(size)]:>17,.0f}" for size in BATCH_SIZES)
+            print(f"{m['model']:<32}{result['backend']:<9}{m['single_row_us']['p50']:>9.1f}"
+                  f"{m['single_row_us']['p99']:>9.1f}{rates}")
+        print(f"  ↳ {result['element']} ({result['backend']}): cold load {result['cold_load_ms']:.0f} ms, "
+              f"peak RSS {result['peak_rss_mb']:.0f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="วัดความเร็วการทำนายของโมเดลทุกส่วนงาน")
+    parser.add_argument('--elements', nargs='+', choices=ELEMENTS, default=ELEMENTS)
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=BACKENDS)
+    parser.add_argument('--model-dir', default=MODEL_DIR, help="โฟลเดอร์ไฟล์ .pkl")
+    parser.add_argument('--output', default=OUTPUT_FILE, help="ไฟล์ผลลัพธ์ (JSON)")
+    parser.add_argument('--child', nargs=2, metavar=('ELEMENT', 'BACKEND'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(bench_element(*args.child, args.model_dir)))
+        return 0
+
+    results = []
+    for element in args.elements:
+        for backend in args.backends:
+            print(f"⏳ {element} ({backend})...")
+            results.append(run_child(element, backend, args.model_dir))
+
+    print_report(results)
+
+    import numpy as np
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'single_row_runs': SINGLE_ROW_RUNS,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 บันทึกผลที่: {args.output}")
+
+    return 0 if all('error' not in r for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
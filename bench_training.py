@@ -0,0 +1,182 @@
+"""
+Training Benchmark - ขยาย Revit schedule จริงเป็นข้อมูลสังเคราะห์ 10k / 100k / 1M แถว
+แล้วรัน pipeline เทรนทั้งเส้น (อ่านไฟล์ -> แปลงตัวเลข -> รวม Steel -> scale -> fit -> pickle)
+เพื่อดูว่าขั้นตอนไหนเริ่มไม่ scale
+
+ข้อมูลสังเคราะห์:
+- สุ่มแถวจาก schedule จริง (มีหน่วยเหมือนเดิม เช่น '2.80 m') แล้วคูณคอลัมน์ปริมาณด้วย factor สุ่ม
+  ต่อแถว (0.95 - 1.05) เพื่อไม่ให้ค่าซ้ำกันทั้งหมด
+- เขียนเป็น CSV รูปแบบ Revit (ชื่อ schedule, header, แถวว่าง, ข้อมูล) ลงโฟลเดอร์ชั่วคราว
+- Steel in ML.xlsx ขยายในหน่วยความจำ (เขียน .xlsx 1M แถวช้าเกินกว่าจะเป็นส่วนหนึ่งของ benchmark)
+
+รัน:
+    python bench_training.py
+    python bench_training.py --element column --sizes 10000 100000 --workers 4
+    python bench_training.py --sizes 1000000 --no-fit
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# ปิด parse_cache - ต้องการวัดการอ่านไฟล์จริงทุกครั้ง
+os.environ['PARSE_CACHE'] = '0'
+
+import timing
+from model_registry import MODEL_DIR
+from parse_cache import cached_workbook
+from quantity_parser import parse_quantity
+from schedule_reader import read_schedule
+from train_all import load_script
+from training import save_models, train_models
+
+OUTPUT_FILE = 'bench_training_output.txt'
+
+# ส่วนงานที่ใช้ไฟล์ CSV (ฐานรากเป็น .xlsx หลายไฟล์ - เขียน 1M แถวช้าเกินไป)
+ELEMENT_FILES = {
+    'column': ['COLUMN_FILE'],
+    'beam': ['BEAM_FILE'],
+    'slab': ['RC_FILE', 'PT_FILE'],
+}
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+STEEL_FILE = 'Steel in ML.xlsx'
+SEED = 42
+
+
+# ===================================
+# สร้างข้อมูลสังเคราะห์
+# ===================================
+def jitter_schedule(df, n_rows, rng):
+    """สุ่มแถวจาก schedule ให้ได้ n_rows แถว และคูณคอลัมน์ปริมาณด้วย factor สุ่มต่อแถว"""
+    out = df.iloc[rng.integers(0, len(df), n_rows)].reset_index(drop=True)
+    factor = rng.uniform(0.95, 1.05, n_rows)
+    for col in out.columns:
+        values, unit = parse_quantity(out[col])
+        if unit is None or values.isna().mean() > 0.5:
+            continue
+        text = np.char.mod('%.3f', values.to_numpy() * factor).astype(object)
+        text = text + f' {unit}'
+        out[col] = np.where(values.notna(), text, out[col])
+    return out
+
+
+def write_revit_csv(df, path, title):
+    """เขียน CSV รูปแบบ Revit schedule: ชื่อ, header, แถวว่าง, ข้อมูล"""
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        f.write(f'"{title}"\n')
+        df.head(0).to_csv(f, index=False)
+        f.write('\n')
+        df.to_csv(f, index=False, header=False)
+
+
+def make_dataset(module, element, n_rows, data_dir, out_dir, rng):
+    """เขียน schedule สังเคราะห์ของส่วนงาน คืนค่า dict ของ sheet Steel ที่ขยายแล้ว"""
+    for attr in ELEMENT_FILES[element]:
+        name = getattr(module, attr)
+        df = read_schedule(os.path.join(data_dir, name))
+        write_revit_csv(jitter_schedule(df, n_rows, rng), os.path.join(out_dir, name), f"Synthetic {name}")
+
+    sheets = cached_workbook(os.path.join(data_dir, STEEL_FILE))
+    return {name: sheet.iloc[rng.integers(0, len(sheet), n_rows)].reset_index(drop=True)
+            for name, sheet in sheets.items()}
+
+
+# ===================================
+# Benchmark
+# ===================================
+def run_pipeline(module, element, data_dir, steel_sheets, fit, max_workers):
+    """รัน pipeline เทรน 1 รอบ (ข้อความ progress ถูกซ่อน) คืนค่า records ของ timing"""
+    with timing.collect(), contextlib.redirect_stdout(io.StringIO()):
+        inputs = module.load_inputs(data_dir, steel_sheets)
+        jobs, _ = module.build_jobs(*inputs)
+        if fit and jobs:
+            results = train_models(jobs, element, max_workers)
+            with tempfile.TemporaryDirectory() as model_dir:
+                save_models(results, module.ARTIFACTS, model_dir)
+    return timing.get_records()
+
+
+def bench(element, sizes, data_dir=MODEL_DIR, fit=True, max_workers=None):
+    module = load_script(element)
+    rng = np.random.default_rng(SEED)
+
+    runs = []
+    for n_rows in sizes:
+        print(f"⏳ {element}: {n_rows:,} แถว...")
+        with tempfile.TemporaryDirectory() as tmp:
+            steel_sheets = make_dataset(module, element, n_rows, data_dir, tmp, rng)
+            start = time.perf_counter()
+            records = run_pipeline(module, element, tmp, steel_sheets, fit, max_workers)
+            wall = time.perf_counter() - start
+        runs.append({'rows': n_rows, 'wall_s': wall, 'summary': timing.summarize(records), 'records': records})
+        print(f"   ✓ {wall:.2f} s")
+    return runs
+
+
+def print_table(runs):
+    """ตาราง stage × ขนาดข้อมูล (วินาทีรวม) และอัตราการโตเทียบขนาดก่อนหน้า"""
+    stages = []
+    for run in runs:
+        for item in run['summary']:
+            if item['stage'] not in stages:
+                stages.append(item['stage'])
+
+    totals = [{item['stage']: item['total_s'] for item in run['summary']} for run in runs]
+    print("\n" + "="*(16 + 22 * len(runs)))
+    headers = [f"{run['rows']:,} แถว (s)" for run in runs]
+    print(f"{'stage':<16}" + ''.join(f"{header:>22}" for header in headers))
+    print("="*(16 + 22 * len(runs)))
+    for name in stages + ['wall']:
+        cells = []
+        for i, run in enumerate(runs):
+            value = run['wall_s'] if name == 'wall' else totals[i].get(name, 0.0)
+            cell = f"{value:.3f}"
+            if i > 0:
+                prev = runs[i - 1]['wall_s'] if name == 'wall' else totals[i - 1].get(name, 0.0)
+                if prev > 0:
+                    cell += f" (×{value / prev:.1f})"
+            cells.append(f"{cell:>22}")
+        print(f"{name:<16}" + ''.join(cells))
+    print("\n(×N = เวลาเทียบกับขนาดก่อนหน้า - ข้อมูลเพิ่ม 10 เท่า ถ้า ×N เกิน 10 มากแปลว่าขั้นตอนนั้นไม่ scale)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="benchmark pipeline เทรนด้วยข้อมูลสังเคราะห์")
+    parser.add_argument('--element', choices=list(ELEMENT_FILES), default='beam')
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES)
+    parser.add_argument('--data-dir', default=MODEL_DIR, help="โฟลเดอร์ schedule จริงที่ใช้เป็นต้นแบบ")
+    parser.add_argument('--workers', type=int, help="จำนวน process ตอน fit")
+    parser.add_argument('--no-fit', action='store_true', help="วัดเฉพาะการเตรียมข้อมูล (ไม่ fit / pickle)")
+    parser.add_argument('--output', default=OUTPUT_FILE, help="ไฟล์ผลลัพธ์ (JSON)")
+    args = parser.parse_args(argv)
+
+    runs = bench(args.element, args.sizes, args.data_dir, not args.no_fit, args.workers)
+    print_table(runs)
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'element': args.element,
+        'fit': not args.no_fit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'runs': runs,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+    print(f"\n💾 บันทึกผลที่: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Bulk Schedule Estimation - ประมาณการปริมาณงานจากไฟล์ Schedule ทั้งไฟล์
+อ่านไฟล์ Revit schedule (เช่น 2.0 Column ปริมาณเสา.csv, 3.0 Framing ปริมาณคาน.csv)
+ครั้งเดียว แล้วทำนายทุกแถวด้วยโมเดลของส่วนงานนั้นแบบ batch
+ไฟล์ใหญ่: estimate_chunks อ่านและทำนายทีละ chunk (หน่วยความจำคงที่ ไม่ขึ้นกับขนาดไฟล์)
+ตรวจผลรวม: check_totals เทียบผลรวมที่ทำนายได้กับผลรวมของค่ารายแถวที่ Revit คำนวณไว้ในไฟล์ (เฉพาะแถวที่ทำนาย)
+และตรวจผลรวมรายแถวทั้งไฟล์กับแถว grand total (อ่านแถวครบหรือไม่)
+
+รัน:
+    python bulk_estimate.py "MODEL ML/2.0 Column ปริมาณเสา.csv"
+    python bulk_estimate.py schedule.csv --element beam --output result.csv
+"""
+
+import argparse
+import sys
+
+import pandas as pd
+
+from feature_schema import canonical_frame, canonical_names
+from inference import predict_batch
+from model_registry import get_registry
+from quantity_parser import clean_numeric_columns, parse_quantity
+from schedule_reader import (CHUNK_ROWS, ROW_ELEMENT, ROW_KIND, describe_bad_lines, iter_schedule, read_schedule,
+                             schedule_totals, source_name)
+
+# ===================================
+# ส่วนงานและโมเดลที่ใช้
+# ===================================
+# กลุ่ม features ใน feature_schema ที่โมเดลของส่วนงานใช้ (ค่าเริ่มต้น = 'features')
+FEATURE_GROUPS = {'beam': 'features_for_cut'}
+
+# features ที่ต้องมีในไฟล์ schedule ของแต่ละส่วนงาน (ชื่อมาตรฐานตาม feature_schema)
+ELEMENT_FEATURES = {
+    element: list(canonical_names(element, FEATURE_GROUPS.get(element, 'features')).values())
+    for element in ['foundation', 'column', 'beam', 'slab']
+}
+
+# ผลลัพธ์ -> ชื่อโมเดล (เรียงตามลำดับที่ต้องทำนาย)
+# ไม่มี Steel: Steel in ML.xlsx ไม่มี key (Type Mark / Type / Level) ให้จับคู่กับแถว schedule - ยังเทรนไม่ได้
+ELEMENT_MODELS = {
+    'foundation': {
+        'Volume (m³)': 'foundation_volume',
+        'Formwork (m²)': 'foundation_formwork',
+    },
+    'column': {
+        'Volume (m³)': 'column_volume',
+        'Formwork (m²)': 'column_formwork',
+    },
+    'beam': {
+        'Cut Length (m)': 'beam_cut_length',
+        'Volume (m³)': 'beam_volume',
+        'Formwork (m²)': 'beam_formwork',
+    },
+    'slab': {
+        'Volume (m³)': 'slab_volume',
+        'Formwork Side (m²)': 'slab_formwork_side',
+        'Formwork (m²)': 'slab_formwork_all',
+    },
+}
+
+# คอลัมน์ข้อความที่คัดลอกไปไว้ในผลลัพธ์เพื่อให้อ่านง่าย
+ID_COLUMNS = ['Level', 'Base Level', 'Reference Level', 'Type', 'Type Mark', 'Count']
+
+# ผลลัพธ์ -> คอลัมน์ของ schedule ที่มีผลรวมในแถว grand total / subtotal (ใช้ตรวจผลรวมที่ทำนายได้)
+CHECK_COLUMNS = {
+    'Cut Length (m)': ['Cut Length'],
+    'Volume (m³)': ['Volume', 'Volume New'],
+    'Formwork Side (m²)': ['Formwork (Side)'],
+    'Formwork (m²)': ['Formwork', 'Formwork (ALL)'],
+}
+# ต่างกันเกินกี่ % ถึงเตือน
+CHECK_TOLERANCE_PCT = 5.0
+# คอลัมน์ในตารางผลลัพธ์ที่เก็บค่ารายแถวของ schedule เอง เช่น 'Volume New [schedule]'
+SCHEDULE_SUFFIX = ' [schedule]'
+
+# คอลัมน์ที่แปลงเป็นตัวเลขตอนอ่านทีละ chunk (features ของทุกส่วนงาน + Count)
+NUMERIC_COLUMNS = sorted({col for features in ELEMENT_FEATURES.values() for col in features} | {'Count', 'Cut Length'})
+
+
+def detect_element(df, name=''):
+    """เดาส่วนงานจากคอลัมน์ของ schedule"""
+    cols = set(df.columns)
+    name = name.lower()
+
+    if 'Default Thickness' in cols or 'floor' in name or 'slab' in name:
+        return 'slab'
+    if {'B', 'H'} <= cols or 'framing' in name or 'beam' in name:
+        return 'beam'
+    if 'Area Column' in cols or 'column' in name:
+        return 'column'
+    if 'Thickness' in cols or 'foundation' in name:
+        return 'foundation'
+    raise ValueError(f"ไม่รู้จักประเภท schedule จากคอลัมน์: {sorted(cols)}")
+
+
+def slab_type_codes(df, name=''):
+    """0 = RC, 1 = Post-Tension (ดูจาก Type / Structural Material / ชื่อไฟล์)"""
+    text = pd.Series('', index=df.index)
+    for col in ['Type', 'Structural Material']:
+        if col in df.columns:
+            text = text + ' ' + df[col].astype(str)
+    text = text.str.lower()
+
+    is_pt = text.str.contains('post') | text.str.contains('tension')
+    if 'ps floor' in name.lower() or 'post' in name.lower():
+        is_pt[:] = True
+    return is_pt.astype(int)
+
+
+def build_features(df, element, name=''):
+    """เตรียม feature frame (ตัวเลข) ของทุกแถว คืนค่า (features, mask ของแถวที่ใช้ได้)"""
+    df = df.copy()
+    if element == 'slab' and 'Slab_Type' not in df.columns:
+        df['Slab_Type'] = slab_type_codes(df, name)
+    # ชื่อคอลัมน์ต่างจาก export มาตรฐาน (เช่น 'Thickness' ของพื้น) -> จับคู่ตาม schema เดียวกับตอนเทรน
+    df = canonical_frame(df, element)
+
+    features = ELEMENT_FEATURES[element]
+    missing = [f for f in features if f not in df.columns]
+    if missing:
+        raise ValueError(f"schedule ขาดคอลัมน์ {missing} สำหรับ {element}")
+
+    columns = features + [c for c in ['Cut Length'] if c in df.columns]
+    X = clean_numeric_columns(df[columns].copy(), columns)
+
+    # แถวผลรวม (เช่น "Rectangular Column: 229") ไม่มีขนาด - ไม่นำมาทำนาย
+    valid = X[features].notna().all(axis=1)
+    return X, valid
+
+
+def estimate_schedule(df, element=None, name='', registry=None):
+    """ทำนายปริมาณงานทุกแถวของ schedule คืนค่า (ตารางรายแถว, ผลรวม)"""
+    registry = registry or get_registry()
+    if ROW_KIND in df.columns:
+        # อ่านแบบเก็บแถวผลรวมไว้ (SCHEDULE_TOTALS=keep) - ทำนายเฉพาะแถวรายการจริง
+        df = df[df[ROW_KIND] == ROW_ELEMENT]
+    element = element or detect_element(df, name)
+
+    X, valid = build_features(df, element, name)
+    X = X[valid]
+
+    result = df.loc[valid, [c for c in ID_COLUMNS if c in df.columns]].copy()
+    for col in ELEMENT_FEATURES[element]:
+        result[col] = X[col]
+
+    for output, model_name in ELEMENT_MODELS[element].items():
+        if registry.get(f"{model_name}_model.pkl")[0] is None:
+            continue
+        # คานใช้ Cut Length ที่ทำนายได้เป็น feature ของ Volume/Formwork
+        if output == 'Cut Length (m)':
+            predicted = predict_batch(model_name, X, registry)
+            if 'Cut Length' in X.columns:
+                X['Cut Length'] = X['Cut Length'].fillna(pd.Series(predicted, index=X.index))
+            else:
+                X['Cut Length'] = predicted
+            result[output] = predicted
+            continue
+        result[output] = predict_batch(model_name, X, registry)
+
+    outputs = [c for c in ELEMENT_MODELS[element] if c in result.columns]
+    # ค่าที่ schedule คำนวณไว้เองในแถวเดียวกัน (ใช้ตรวจผลทำนาย)
+    for output in outputs:
+        col = next((c for c in CHECK_COLUMNS.get(output, []) if c in df.columns), None)
+        if col is not None:
+            result[col + SCHEDULE_SUFFIX] = parse_quantity(df.loc[valid, col])[0]
+    totals = result[outputs].sum()
+    return result.reset_index(drop=True), totals
+
+
+def reference_totals(result, outputs):
+    """ผลรวมค่ารายแถวของ schedule เฉพาะแถวที่ทำนาย: ผลลัพธ์ -> (คอลัมน์ของ schedule, ผลรวม)"""
+    reference = {}
+    for output in outputs:
+        col = next((c for c in CHECK_COLUMNS.get(output, []) if c + SCHEDULE_SUFFIX in result.columns), None)
+        if col is not None:
+            reference[output] = (col, float(result[col + SCHEDULE_SUFFIX].sum()))
+    return reference
+
+
+def diff_pct(value, expected):
+    return (value - expected) / expected * 100 if expected else float('nan')
+
+
+def check_totals(totals, reference, summary=None):
+    """เทียบผลรวมที่ทำนายได้กับผลรวมค่ารายแถวของ schedule ในแถวเดียวกัน (reference_totals)
+    summary (df.attrs['totals']) -> ตรวจผลรวมรายแถวทั้งไฟล์กับ grand total ด้วย (NaN ถ้าไม่มี grand total)
+    คืนค่า DataFrame: output, schedule_column, schedule_total, predicted_total, diff_pct,
+    all_rows_total, grand_total, grand_diff_pct - เฉพาะผลลัพธ์ที่เทียบได้"""
+    element_rows = (summary or {}).get('element_rows', {})
+    grand = schedule_totals(summary)
+    rows = []
+    for output, predicted in totals.items():
+        if output not in reference:
+            continue
+        col, expected = reference[output]
+        all_rows, grand_total = element_rows.get(col, float('nan')), grand.get(col, float('nan'))
+        rows.append({'output': output, 'schedule_column': col, 'schedule_total': expected,
+                     'predicted_total': float(predicted), 'diff_pct': diff_pct(float(predicted), expected),
+                     'all_rows_total': all_rows, 'grand_total': grand_total,
+                     'grand_diff_pct': diff_pct(all_rows, grand_total)})
+    return pd.DataFrame(rows, columns=['output', 'schedule_column', 'schedule_total', 'predicted_total', 'diff_pct',
+                                       'all_rows_total', 'grand_total', 'grand_diff_pct'])
+
+
+def print_check(check):
+    """แสดงผลการเทียบผลรวม (เตือนถ้าต่างเกิน CHECK_TOLERANCE_PCT)"""
+    if not len(check):
+        return
+    print("\n🔍 เทียบกับผลรวมใน schedule:")
+    for row in check.itertuples(index=False):
+        mark = '✓' if abs(row.diff_pct) <= CHECK_TOLERANCE_PCT else '⚠️'
+        print(f"  {mark} {row.output}: ทำนาย {row.predicted_total:,.2f} / schedule {row.schedule_total:,.2f} "
+              f"({row.schedule_column} ของแถวที่ทำนาย, ต่าง {row.diff_pct:+.1f}%)")
+        if abs(row.grand_diff_pct) > CHECK_TOLERANCE_PCT:
+            print(f"    ⚠️ ผลรวมรายแถว {row.all_rows_total:,.2f} ไม่ตรงกับ grand total {row.grand_total:,.2f} "
+                  f"({row.grand_diff_pct:+.1f}%) - อ่านแถวไม่ครบหรือแยกแถวผลรวมผิด")
+        not_predicted = row.all_rows_total - row.schedule_total
+        if abs(not_predicted) > 1e-9:
+            print(f"    ℹ️ แถวที่ไม่ได้ทำนาย (ขาดขนาด) มี {row.schedule_column} รวม {not_predicted:,.2f}")
+
+
+def estimate_file(source, element=None, registry=None):
+    """อ่านไฟล์ schedule ครั้งเดียวแล้วทำนายทั้งไฟล์"""
+    df = read_schedule(source)
+    return estimate_schedule(df, element=element, name=source_name(source), registry=registry)
+
+
+def estimate_chunks(source, element=None, registry=None, chunk_rows=CHUNK_ROWS):
+    """อ่านและทำนายไฟล์ schedule ทีละ chunk - yield (ส่วนงาน, ตารางรายแถว, ผลรวม, แถวผลรวมของ schedule,
+    จำนวนแถวที่ซ่อม/ข้ามตอนอ่าน) ของแต่ละ chunk (ส่วนงานเดาจาก chunk แรกถ้าไม่ระบุ, chunk ที่มีแต่แถวผลรวมส่ง None)
+    รวมแถวผลรวมของทุก chunk ด้วย merge_summaries แล้ว schedule_totals เพื่อตรวจผลรวมทั้งไฟล์"""
+    registry = registry or get_registry()
+    name = source_name(source)
+    for chunk in iter_schedule(source, chunk_rows, numeric=NUMERIC_COLUMNS, totals='drop'):
+        summary = chunk.attrs.get('totals')
+        bad_lines = chunk.attrs.get('bad_lines')
+        if not len(chunk):
+            yield element, None, None, summary, bad_lines
+            continue
+        element = element or detect_element(chunk, name)
+        result, totals = estimate_schedule(chunk, element=element, name=name, registry=registry)
+        yield element, result, totals, summary, bad_lines
+
+
+# ===================================
+# CLI
+# ===================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ประมาณการปริมาณงานจาก Revit schedule ทั้งไฟล์")
+    parser.add_argument('schedule', help="ไฟล์ schedule (.csv / .xlsx)")
+    parser.add_argument('--element', choices=sorted(ELEMENT_MODELS), help="ประเภทส่วนงาน (ถ้าไม่ระบุจะเดาจากคอลัมน์)")
+    parser.add_argument('--output', help="บันทึกตารางผลลัพธ์เป็น CSV")
+    args = parser.parse_args(argv)
+
+    try:
+        df = read_schedule(args.schedule)
+        result, totals = estimate_schedule(df, element=args.element, name=source_name(args.schedule))
+    except (OSError, ValueError) as e:
+        # ไฟล์อ่านไม่ได้ / ไม่รู้จักประเภท schedule (ผนัง, เสาเข็ม, โครงเหล็ก) / ขาดคอลัมน์ที่โมเดลต้องใช้
+        print(f"❌ {args.schedule}: {e}")
+        return 1
+    bad_lines = describe_bad_lines(df.attrs.get('bad_lines'))
+    if bad_lines:
+        print(f"⚠️ {bad_lines}")
+
+    print(f"\n📋 ทำนาย {len(result)} แถว")
+    if args.output:
+        result.to_csv(args.output, index=False, encoding='utf-8-sig')
+        print(f"💾 บันทึกที่: {args.output}")
+    else:
+        print(result.to_string(index=False))
+
+    print("\n📊 ผลรวม:")
+    for name, value in totals.items():
+        print(f"  {name}: {value:,.2f}")
+    print_check(check_totals(totals, reference_totals(result, totals.index), df.attrs.get('totals')))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Compact Model - export โมเดลเป็น NumPy array (.npy) สำหรับ cold start ที่เร็ว
+และ predictor ที่ใช้ NumPy อย่างเดียว (ไม่ต้อง import scikit-learn)
+
+โครงสร้าง: foundation_volume_model.pkl -> foundation_volume_model.compact/
+    meta.json       ชนิดโมเดล, feature_names, ค่าคงที่ และ sha256 ของ .pkl ต้นทาง
+    *.npy           array ของโมเดล (โหลดด้วย np.load(mmap_mode='r'))
+
+ชนิดที่รองรับ:
+    linear      LinearRegression + StandardScaler: ((X - mean) / scale) @ coef + intercept
+    trees       RandomForest / GradientBoosting: node ของทุกต้นต่อกันเป็น array เดียว
+                ผลลัพธ์ = bias + weight * ผลรวมค่า leaf ของทุกต้น
+                (RandomForest: bias 0, weight 1/จำนวนต้น / GradientBoosting: bias ค่าเริ่มต้น, weight learning_rate)
+
+export ใหม่ทั้งโฟลเดอร์ MODEL ML:
+    python compact_model.py
+"""
+
+import json
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+
+COMPACT_SUFFIX = '.compact'
+COMPACT_VERSION = 1
+
+# จำนวนแถวที่ traverse tree พร้อมกัน (array แถว × ต้น ต้องอยู่ใน cache ถึงจะเร็ว)
+TREE_CHUNK_ROWS = 512
+
+
+def compact_path(model_path):
+    """path ของโฟลเดอร์ compact ของไฟล์ .pkl"""
+    root, _ = os.path.splitext(model_path)
+    return root + COMPACT_SUFFIX
+
+
+# ===================================
+# Export
+# ===================================
+def linear_arrays(model, scaler):
+    """array ของ LinearRegression (ข้อมูลผ่าน StandardScaler ก่อนเสมอ)"""
+    arrays = {
+        'coef': np.asarray(model.coef_, dtype=np.float64).ravel(),
+        'mean': np.asarray(scaler.mean_, dtype=np.float64),
+        'scale': np.asarray(scaler.scale_, dtype=np.float64),
+    }
+    return arrays, {'intercept': float(np.ravel(model.intercept_)[0])}
+
+
+def tree_arrays(trees, bias, weight):
+    """รวม node ของทุกต้นเป็น array เดียว - leaf ชี้กลับหาตัวเอง (traverse จำนวนรอบคงที่ได้)"""
+    left, right, feature, threshold, value, missing_left, roots = [], [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for tree in trees:
+        t = tree.tree_
+        n = t.node_count
+        ids = np.arange(n) + offset
+        is_leaf = t.children_left == -1
+
+        left.append(np.where(is_leaf, ids, t.children_left + offset))
+        right.append(np.where(is_leaf, ids, t.children_right + offset))
+        feature.append(np.where(is_leaf, 0, t.feature))
+        threshold.append(np.where(is_leaf, 0.0, t.threshold))
+        value.append(t.value.reshape(n, -1)[:, 0])
+        missing = getattr(t, 'missing_go_to_left', None)
+        missing_left.append(np.zeros(n, dtype=bool) if missing is None else np.asarray(missing, dtype=bool))
+        roots.append(offset)
+
+        offset += n
+        max_depth = max(max_depth, t.max_depth)
+
+    arrays = {
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'value': np.concatenate(value).astype(np.float64),
+        'missing_left': np.concatenate(missing_left),
+        'roots': np.asarray(roots, dtype=np.int32),
+    }
+    return arrays, {'bias': float(bias), 'weight': float(weight), 'max_depth': int(max_depth)}
+
+
+def model_arrays(model, scaler):
+    """แปลงโมเดลเป็น (kind, arrays, ค่าคงที่) หรือ None ถ้าไม่รองรับ"""
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_'):
+        return ('linear',) + linear_arrays(model, scaler)
+
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is None:
+        return None
+
+    if hasattr(model, 'learning_rate'):
+        # GradientBoosting (squared error): ค่าเริ่มต้น = DummyRegressor ค่าเฉลี่ย
+        init = getattr(model, 'init_', None)
+        if not hasattr(init, 'constant_'):
+            return None
+        trees = [stage[0] for stage in estimators]
+        bias = np.ravel(init.constant_)[0]
+        return ('trees',) + tree_arrays(trees, bias, model.learning_rate)
+
+    # RandomForest: ค่าเฉลี่ยของทุกต้น
+    return ('trees',) + tree_arrays(estimators, 0.0, 1.0 / len(estimators))
+
+
+def export_compact(model, scaler, feature_names, model_path, source_sha256=None, metadata=None):
+    """เขียนโฟลเดอร์ compact ข้างไฟล์ .pkl คืนค่า path หรือ None ถ้าโมเดลชนิดนี้ไม่รองรับ"""
+    converted = model_arrays(model, scaler)
+    if converted is None:
+        print(f"⚠️ export compact ไม่ได้: ไม่รองรับ {type(model).__name__}")
+        return None
+    kind, arrays, constants = converted
+
+    meta = {
+        'version': COMPACT_VERSION,
+        'kind': kind,
+        'model_type': type(model).__name__,
+        'feature_names': list(feature_names),
+        'constants': constants,
+        'arrays': sorted(arrays),
+        'source_sha256': source_sha256,
+        'metadata': metadata,
+    }
+
+    target = compact_path(model_path)
+    directory = os.path.dirname(os.path.abspath(target))
+    tmp_dir = tempfile.mkdtemp(prefix='.tmp_', dir=directory)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, name + '.npy'), array)
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1)
+
+        # แทนที่โฟลเดอร์เดิม: ย้ายของเดิมออกก่อน (rename ทับโฟลเดอร์ที่มีไฟล์ไม่ได้)
+        old_dir = None
+        if os.path.exists(target):
+            old_dir = tempfile.mkdtemp(prefix='.old_', dir=directory)
+            os.replace(target, os.path.join(old_dir, 'model'))
+        os.replace(tmp_dir, target)
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return target
+
+
+# ===================================
+# Predictor (NumPy อย่างเดียว)
+# ===================================
+class CompactModel:
+    """โมเดลที่โหลดจากโฟลเดอร์ compact - predict(X) รับ X ที่ยังไม่ scale เรียงตาม feature_names"""
+
+    def __init__(self, meta, arrays):
+        self.kind = meta['kind']
+        self.model_type = meta['model_type']
+        self.feature_names = meta['feature_names']
+        self.source_sha256 = meta.get('source_sha256')
+        self.metadata = meta.get('metadata')
+        self.constants = meta['constants']
+        self.arrays = arrays
+        if self.kind == 'trees':
+            # ลูกซ้าย/ขวาสลับกันใน array เดียว: ลูกของ node i อยู่ที่ 2i (ซ้าย) และ 2i + 1 (ขวา)
+            self.children = np.stack([arrays['left'], arrays['right']], axis=1).ravel().astype(np.intp)
+            self.feature = np.asarray(arrays['feature'], dtype=np.intp)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.feature_names))
+        if self.kind == 'linear':
+            return self.predict_linear(X)
+        return self.predict_trees(X)
+
+    def predict_linear(self, X):
+        a = self.arrays
+        return ((X - a['mean']) / a['scale']) @ a['coef'] + self.constants['intercept']
+
+    def predict_trees(self, X):
+        # scikit-learn เปรียบเทียบ threshold กับ X ที่ปัดเป็น float32
+        X = X.astype(np.float32).astype(np.float64)
+        has_nan = bool(np.isnan(X).any())
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), TREE_CHUNK_ROWS):
+            out[start:start + TREE_CHUNK_ROWS] = self.tree_sums(X[start:start + TREE_CHUNK_ROWS], has_nan)
+        return self.constants['bias'] + self.constants['weight'] * out
+
+    def tree_sums(self, X, has_nan=False):
+        """ผลรวมค่า leaf ของทุกต้น สำหรับแต่ละแถว (ทุกแถว × ทุกต้น เดินลงพร้อมกันทีละชั้น)"""
+        a = self.arrays
+        threshold = a['threshold']
+        flat = X.ravel()
+        offsets = (np.arange(len(X)) * X.shape[1])[:, None]
+        nodes = np.repeat(np.asarray(a['roots'], dtype=np.intp)[None, :], len(X), axis=0)
+        for _ in range(self.constants['max_depth']):
+            x = flat[offsets + self.feature[nodes]]
+            go_right = x > threshold[nodes]
+            if has_nan:
+                go_right |= np.isnan(x) & ~a['missing_left'][nodes]
+            nodes = self.children[2 * nodes + go_right]
+        return a['value'][nodes].sum(axis=1)
+
+
+def load_compact(path, mmap_mode='r'):
+    """โหลดโฟลเดอร์ compact เป็น CompactModel (array เป็น memory map ไม่ต้องอ่านทั้งไฟล์)"""
+    with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != COMPACT_VERSION:
+        raise ValueError(f"compact version ไม่ตรง: {meta.get('version')}")
+    arrays = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode) for name in meta['arrays']}
+    return CompactModel(meta, arrays)
+
+
+def read_compact_meta(path):
+    """อ่าน meta.json (None ถ้าไม่มีหรืออ่านไม่ได้)"""
+    try:
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# ===================================
+# CLI - export ไฟล์ .pkl ที่มีอยู่แล้ว
+# ===================================
+def export_existing(model_dir):
+    """export compact ของไฟล์ *_model.pkl ทุกไฟล์ในโฟลเดอร์ คืนค่า list ของ path"""
+    from model_registry import file_sha256
+
+    exported = []
+    for name in sorted(os.listdir(model_dir)):
+        if not name.endswith('_model.pkl'):
+            continue
+        path = os.path.join(model_dir, name)
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        target = export_compact(data['model'], data['scaler'], data['feature_names'], path,
+                                file_sha256(path), data.get('metadata'))
+        if target is not None:
+            print(f"📦 {name} -> {os.path.basename(target)}")
+            exported.append(target)
+    return exported
+
+
+if __name__ == "__main__":
+    import sys
+    from model_registry import MODEL_DIR
+
+    export_existing(sys.argv[1] if len(sys.argv) > 1 else MODEL_DIR)
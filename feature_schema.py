@@ -0,0 +1,269 @@
+"""
+Feature Schema - กำหนดคอลัมน์ features / targets ของแต่ละส่วนงานแบบประกาศ (declarative)
+แทนลูปค้นหาคำในชื่อคอลัมน์ที่เขียนซ้ำใน prepare_*_data ของทุกสคริปต์เทรน
+
+schema ของส่วนงาน = กลุ่ม (features, targets, ...) เรียงตามลำดับที่หา แต่ละกลุ่มมี role เรียงตามลำดับ
+role หนึ่งได้คอลัมน์แรก (ตามลำดับ header) ที่ผ่านกฎทั้งหมด:
+    any     คำใดคำหนึ่งอยู่ในชื่อคอลัมน์ (ไม่สนตัวพิมพ์)
+    all     ทุกคำต้องอยู่ในชื่อคอลัมน์
+    none    ต้องไม่มีคำเหล่านี้ในชื่อคอลัมน์
+    skip    ข้ามคอลัมน์ที่ชื่อทั้งชื่อตรงกับคำเหล่านี้ (รวมกับ skip ของกลุ่ม)
+    not_in  ข้ามคอลัมน์ที่ใช้ไปแล้วในกลุ่มอื่น ('features') หรือ role อื่น ('targets.cut_length')
+    name    ชื่อคอลัมน์มาตรฐาน (ชื่อที่ Revit export และเป็นชื่อ feature ของโมเดล)
+กลุ่ม exclusive: 1 คอลัมน์ใช้ได้กับ role เดียวในกลุ่ม
+
+schema ถูก compile ครั้งเดียว และผลการจับคู่ถูก cache ตาม header (ส่วนงาน + ชื่อคอลัมน์ทั้งหมด)
+header เดิมไม่ต้องจับคู่ใหม่ ใช้ร่วมกันทั้งสคริปต์เทรนและการทำนาย (bulk_estimate)
+
+ตัวอย่าง:
+    columns = resolve_columns('column', df.columns)
+    columns['features']            # {'width': 'Width', 'depth': 'Depth', ...} (None = ไม่พบ)
+    feature_list(columns, 'features')   # ['Width', 'Depth', ...] เฉพาะที่พบ
+    df = canonical_frame(df, 'slab')    # เปลี่ยนชื่อคอลัมน์ที่จับคู่ได้เป็นชื่อมาตรฐาน
+"""
+
+from functools import lru_cache
+
+# ===================================
+# Schema ของแต่ละส่วนงาน
+# ===================================
+SCHEMAS = {
+    'foundation': [
+        ('features', {
+            'exclusive': True,
+            'roles': [
+                ('width', {'any': ['Width', 'กว้าง', 'W'], 'name': 'Width'}),
+                ('length', {'any': ['Length', 'ยาว', 'L'], 'name': 'Length'}),
+                ('thickness', {'any': ['Thickness', 'หนา', 'Thk', 'Thick', 'T'], 'skip': ['type', 'count'],
+                               'name': 'Thickness'}),
+                ('area', {'any': ['Area', 'พื้นที่'], 'name': 'Area'}),
+                ('perimeter', {'any': ['Perimeter', 'เส้นรอบรูป'], 'name': 'Perimeter'}),
+                ('count', {'any': ['Count', 'จำนวน', 'Qty'], 'name': 'Count'}),
+            ],
+        }),
+        ('targets', {
+            'roles': [
+                ('volume', {'any': ['Volume', 'ปริมาตร', 'Concrete', 'คอนกรีต', 'Vol']}),
+                ('formwork', {'any': ['Formwork', 'แบบหล่อ', 'Form']}),
+                ('steel', {'any': ['Steel', 'เหล็ก', 'Rebar']}),
+            ],
+        }),
+    ],
+    'column': [
+        ('features', {
+            'exclusive': True,
+            'skip': ['type'],
+            'none': ['family'],
+            'roles': [
+                ('width', {'any': ['Width'], 'name': 'Width'}),
+                ('depth', {'any': ['Depth'], 'name': 'Depth'}),
+                ('length', {'any': ['Length'], 'name': 'Length'}),
+                ('perimeter', {'any': ['Perimeter'], 'name': 'Perimeter'}),
+                ('area', {'any': ['Area Column'], 'name': 'Area Column'}),
+            ],
+        }),
+        ('targets', {
+            'roles': [
+                ('volume', {'any': ['volume', 'ปริมาตร']}),
+                ('formwork', {'any': ['formwork', 'แบบหล่อ'], 'not_in': ['features']}),
+            ],
+        }),
+    ],
+    'beam': [
+        # features สำหรับทำนาย Cut Length (ไม่มี Cut Length เอง)
+        ('features_for_cut', {
+            'exclusive': True,
+            'skip': ['type', 'description', 'family', 'level', 'count'],
+            'none': ['cut', 'formwork', 'volume'],
+            'roles': [
+                ('b', {'any': ['B', 'Width', 'กว้าง'], 'name': 'B'}),
+                ('h', {'any': ['H', 'Height', 'Depth', 'สูง'], 'name': 'H'}),
+                ('length', {'any': ['Length', 'ยาว'], 'name': 'Length'}),
+            ],
+        }),
+        # features สำหรับ Volume / Formwork / Steel
+        ('features', {
+            'exclusive': True,
+            'skip': ['type', 'description', 'family', 'level', 'count'],
+            'none': ['formwork', 'volume'],
+            'roles': [
+                ('b', {'any': ['B', 'Width', 'กว้าง'], 'name': 'B'}),
+                ('h', {'any': ['H', 'Height', 'Depth', 'สูง'], 'name': 'H'}),
+                ('cut_length', {'any': ['Cut Length', 'Cut', 'ตัด'], 'name': 'Cut Length'}),
+                ('length', {'any': ['Length', 'ยาว'], 'name': 'Length'}),
+            ],
+        }),
+        ('targets', {
+            'roles': [
+                ('volume', {'any': ['volume', 'ปริมาตร'], 'not_in': ['features']}),
+                ('cut_length', {'all': ['cut', 'length'], 'not_in': ['features_for_cut']}),
+                ('length', {'all': ['length'], 'none': ['cut'], 'not_in': ['features', 'targets.cut_length']}),
+                ('formwork', {'any': ['formwork', 'แบบหล่อ'], 'not_in': ['features']}),
+            ],
+        }),
+    ],
+    'slab': [
+        ('features', {
+            'exclusive': True,
+            'skip': ['type', 'description', 'family'],
+            'roles': [
+                ('thickness', {'any': ['Thickness', 'หนา', 'Default Thickness'], 'name': 'Default Thickness'}),
+                ('perimeter', {'any': ['Perimeter', 'เส้นรอบรูป'], 'name': 'Perimeter'}),
+                ('area', {'any': ['Area', 'พื้นที่'], 'name': 'Area'}),
+                ('slab_type', {'any': ['Slab_Type'], 'name': 'Slab_Type'}),  # Type ที่สคริปต์เพิ่มเข้าไป
+            ],
+        }),
+        ('targets', {
+            'roles': [
+                ('volume', {'any': ['volume', 'ปริมาตร'], 'not_in': ['features']}),
+                ('formwork_side', {'all': ['formwork', 'side'], 'not_in': ['features']}),
+                ('formwork_all', {'all': ['formwork', 'all'], 'not_in': ['features']}),
+            ],
+        }),
+    ],
+    # ยังไม่มีสคริปต์เทรน - ประกาศไว้ตามคอลัมน์ของ 5.0 Wall / 1.3 Pile
+    'wall': [
+        ('features', {
+            'exclusive': True,
+            'skip': ['type', 'description', 'count'],
+            'roles': [
+                ('width', {'any': ['Width', 'หนา'], 'name': 'Width'}),
+                ('length', {'any': ['Length', 'ยาว'], 'name': 'Length'}),
+                ('height', {'any': ['Unconnected Height', 'Height', 'สูง'], 'name': 'Unconnected Height'}),
+                ('area', {'any': ['Area', 'พื้นที่'], 'name': 'Area'}),
+            ],
+        }),
+        ('targets', {
+            'roles': [
+                ('volume', {'any': ['volume', 'ปริมาตร'], 'not_in': ['features']}),
+                ('formwork', {'any': ['formwork', 'แบบหล่อ'], 'not_in': ['features']}),
+            ],
+        }),
+    ],
+    'pile': [
+        ('features', {
+            'exclusive': True,
+            'skip': ['type', 'family', 'count'],
+            'roles': [
+                ('radius', {'any': ['Radius', 'รัศมี'], 'name': 'Radius'}),
+                ('length', {'any': ['Length', 'ยาว'], 'name': 'Length'}),
+                ('perimeter', {'any': ['Perimeter', 'เส้นรอบรูป'], 'name': 'Perimeter'}),
+            ],
+        }),
+        ('targets', {
+            'roles': [
+                ('volume', {'any': ['volume', 'ปริมาตร'], 'not_in': ['features']}),
+                ('formwork', {'any': ['formwork', 'แบบหล่อ'], 'not_in': ['features']}),
+            ],
+        }),
+    ],
+}
+
+
+# ===================================
+# Compile
+# ===================================
+def lower_all(words):
+    return tuple(word.lower() for word in words)
+
+
+def compile_role(role, group):
+    """กฎของ role -> tuple ที่จับคู่ได้เร็ว (คำตัวพิมพ์เล็กทั้งหมด)"""
+    return {
+        'any': lower_all(role.get('any', [])),
+        'all': lower_all(role.get('all', [])),
+        'none': lower_all(group.get('none', []) + role.get('none', [])),
+        'skip': frozenset(lower_all(group.get('skip', []) + role.get('skip', []))),
+        'not_in': tuple(role.get('not_in', [])),
+        'name': role.get('name'),
+    }
+
+
+def matches(rule, name):
+    """ชื่อคอลัมน์ (ตัวพิมพ์เล็ก) ผ่านกฎของ role หรือไม่"""
+    if name in rule['skip'] or any(word in name for word in rule['none']):
+        return False
+    if rule['all'] and not all(word in name for word in rule['all']):
+        return False
+    return not rule['any'] or any(word in name for word in rule['any'])
+
+
+def compile_schema(schema):
+    return [(group_name, bool(group.get('exclusive')),
+             [(role_name, compile_role(role, group)) for role_name, role in group['roles']])
+            for group_name, group in schema]
+
+
+COMPILED = {element: compile_schema(schema) for element, schema in SCHEMAS.items()}
+
+
+# ===================================
+# จับคู่คอลัมน์
+# ===================================
+def blocked_columns(refs, resolved, current):
+    """คอลัมน์ที่ role ห้ามใช้ตาม not_in"""
+    blocked = set()
+    for ref in refs:
+        group, _, role = ref.partition('.')
+        found = current if group not in resolved else resolved[group]
+        if role:
+            blocked.add(found.get(role))
+        else:
+            blocked.update(found.values())
+    blocked.discard(None)
+    return blocked
+
+
+@lru_cache(maxsize=256)
+def _resolve(element, columns):
+    lowered = [(col, str(col).lower()) for col in columns]
+    resolved = {}
+    for group_name, exclusive, roles in COMPILED[element]:
+        found, used = {}, set()
+        for role_name, rule in roles:
+            blocked = blocked_columns(rule['not_in'], resolved, found) | used
+            col = next((col for col, name in lowered if col not in blocked and matches(rule, name)), None)
+            found[role_name] = col
+            if exclusive and col is not None:
+                used.add(col)
+        resolved[group_name] = found
+    return resolved
+
+
+def resolve_columns(element, columns):
+    """จับคู่ role -> ชื่อคอลัมน์จริงของทุกกลุ่ม (cache ตาม header) คืนค่า dict ใหม่ทุกครั้ง (แก้ไขได้)"""
+    if element not in COMPILED:
+        raise ValueError(f"ไม่มี schema ของส่วนงาน {element} (มี {sorted(COMPILED)})")
+    return {group: dict(found) for group, found in _resolve(element, tuple(columns)).items()}
+
+
+def feature_list(resolved, group):
+    """คอลัมน์ที่พบของกลุ่ม เรียงตามลำดับ role"""
+    return [col for col in resolved[group].values() if col is not None]
+
+
+def canonical_names(element, group='features'):
+    """ชื่อมาตรฐานของ role ในกลุ่ม (ชื่อ feature ของโมเดล)"""
+    roles = next(roles for name, _, roles in COMPILED[element] if name == group)
+    return {role_name: rule['name'] for role_name, rule in roles if rule['name']}
+
+
+def canonical_frame(df, element):
+    """เปลี่ยนชื่อคอลัมน์ที่จับคู่ได้เป็นชื่อมาตรฐาน (เช่น 'Thickness' -> 'Default Thickness')
+    คอลัมน์ที่ชื่อตรงอยู่แล้ว หรือชื่อมาตรฐานมีอยู่แล้วใน df ไม่เปลี่ยน"""
+    resolved = resolve_columns(element, df.columns)
+    rename = {}
+    for group, found in resolved.items():
+        for role, name in canonical_names(element, group).items():
+            col = found[role]
+            if col is not None and col != name and name not in df.columns and col not in rename \
+                    and name not in rename.values():
+                rename[col] = name
+    return df.rename(columns=rename) if rename else df
+
+
+def print_resolved(resolved, group, labels=None):
+    """แสดงคอลัมน์ที่พบของกลุ่ม (labels = role -> ชื่อที่แสดง)"""
+    for role, col in resolved[group].items():
+        if col is not None:
+            print(f"  ✓ พบ {(labels or {}).get(role, role)}: {col}")
@@ -0,0 +1,112 @@
+"""
+Batch Prediction API - ทำนายหลายแถวในการเรียก predict ครั้งเดียว
+ใช้แทน load_and_predict แบบทีละแถวใน foundation_ml / column_ml / beam_ml / slab_ml
+
+ตัวอย่าง:
+    from inference import predict_batch
+    volumes = predict_batch('column_volume', [
+        {'Width': 1200, 'Depth': 300, 'Length': 2.8, 'Perimeter': 3000, 'Area Column': 2160},
+        {'Width': 400, 'Depth': 400, 'Length': 3.0, 'Perimeter': 1600, 'Area Column': 1120},
+    ])
+"""
+
+import os
+
+import numpy as np
+
+from compact_model import CompactModel
+from model_registry import get_registry
+from prediction_cache import get_prediction_cache, prediction_key
+
+
+def model_file_name(model_name):
+    """แปลงชื่อโมเดลเป็นชื่อไฟล์ เช่น 'column_volume' -> 'column_volume_model.pkl'"""
+    if os.path.exists(model_name):
+        return os.path.abspath(model_name)
+    if model_name.endswith('.pkl'):
+        return model_name
+    if model_name.endswith('_model'):
+        return f"{model_name}.pkl"
+    return f"{model_name}_model.pkl"
+
+
+def rows_to_matrix(rows, features):
+    """แปลง input (list ของ dict, DataFrame หรือ NumPy structured array) เป็น matrix float ตามลำดับ features"""
+    if hasattr(rows, 'columns'):
+        return rows[features].to_numpy(dtype=float)
+
+    if isinstance(rows, np.ndarray) and rows.dtype.names:
+        X = np.empty((len(rows), len(features)), dtype=float)
+        for j, feat in enumerate(features):
+            X[:, j] = rows[feat]
+        return X
+
+    if isinstance(rows, dict):
+        rows = [rows]
+    return np.array([[row[feat] for feat in features] for row in rows], dtype=float).reshape(-1, len(features))
+
+
+def predict_matrix(model, scaler, X):
+    """ทำนายจาก matrix ที่เรียงคอลัมน์ตาม feature_names แล้ว"""
+    if len(X) == 0:
+        return np.empty(0, dtype=float)
+
+    # โมเดล compact รวม StandardScaler ไว้แล้ว
+    if isinstance(model, CompactModel):
+        return model.predict(X)
+
+    # Linear Regression ถูกเทรนด้วยข้อมูลที่ผ่าน StandardScaler
+    # (เช็คจาก coef_ แทน isinstance - ไม่ต้อง import scikit-learn; โมเดล tree ไม่มี coef_)
+    if hasattr(model, 'coef_'):
+        X = (X - scaler.mean_) / scaler.scale_
+
+    # โมเดล tree ถูก fit ด้วย DataFrame - ส่งชื่อ feature ไปด้วย (ndarray เปล่าจะมี warning ทุกครั้ง)
+    # X เรียงตาม feature_names ที่บันทึกจาก X.columns ตอนเทรน จึงตรงกับ feature_names_in_
+    names = getattr(model, 'feature_names_in_', None)
+    if names is not None:
+        import pandas as pd
+
+        X = pd.DataFrame(X, columns=names)
+
+    return np.asarray(model.predict(X), dtype=float)
+
+
+def predict_batch(model_name, rows, registry=None):
+    """ทำนายหลายแถวพร้อมกัน คืนค่า array ที่เรียงตรงกับ rows"""
+    if registry is None:
+        registry = get_registry()
+    model_file = model_file_name(model_name)
+
+    model, scaler, features = registry.get(model_file)
+    if model is None:
+        raise FileNotFoundError(f"ไม่พบไฟล์โมเดล: {model_file}")
+
+    X = rows_to_matrix(rows, features)
+    return predict_matrix(model, scaler, X)
+
+
+def load_and_predict(model_file, input_data, registry=None):
+    """ทำนาย 1 แถว - API เดียวกับ load_and_predict ในสคริปต์เทรน (ไม่ต้อง import ส่วนเทรน)"""
+    return predict_batch(model_file, [input_data], registry)[0]
+
+
+def predict_cached(model_name, input_data, registry=None, cache=None):
+    """ทำนาย 1 แถวผ่าน prediction cache (key = sha256 ของไฟล์โมเดล + ค่า input)
+
+    input เดิมกับโมเดล version เดิม คืนค่าจาก cache ทันทีโดยไม่เรียกโมเดล
+    """
+    if registry is None:
+        registry = get_registry()
+    # เช็ค None ตรงๆ - PredictionCache มี __len__ ทำให้ cache ที่ยังว่างเป็นเท็จ
+    if cache is None:
+        cache = get_prediction_cache()
+    model_file = model_file_name(model_name)
+
+    entry = registry.get_entry(model_file)
+    if entry is None:
+        raise FileNotFoundError(f"ไม่พบไฟล์โมเดล: {model_file}")
+
+    key = prediction_key(entry.sha256, entry.feature_names, input_data)
+    return cache.get_or_compute(key, lambda: float(
+        predict_matrix(entry.model, entry.scaler, rows_to_matrix([input_data], entry.feature_names))[0]
+    ))
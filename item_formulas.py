@@ -0,0 +1,181 @@
+"""
+Item Formulas - คำนวณปริมาณงานของรายการจาก input (สูตร + ผลทำนายของโมเดล ถ้ามี)
+ใช้ร่วมกันระหว่างฟอร์มใน app.py (ทีละรายการ) และการทำนายใหม่ตอนเปิดโปรเจกต์ (ทั้งส่วนงานพร้อมกัน)
+
+input เป็นค่าเดี่ยวหรือ NumPy array ก็ได้ (สูตรเป็น element-wise ทั้งหมด)
+predict(model_file, data) คืนค่าผลทำนาย (ค่าเดี่ยว/array ตาม input) หรือ None ถ้าไม่มีโมเดล
+
+ตัวอย่าง:
+    item = column_item(0.30, 0.30, 2.80, 1, predict)
+    # {'width': 0.3, 'depth': 0.3, 'height': 2.8, 'count': 1, 'volume': ..., 'formwork': ..., 'steel': ...}
+"""
+
+import numpy as np
+
+# ส่วนงาน -> โมเดลที่ใช้ (ผลของส่วนงานเปลี่ยนเมื่อไฟล์โมเดลเหล่านี้เปลี่ยน)
+CATEGORY_MODELS = {
+    'foundation': ['foundation_volume_model.pkl', 'foundation_formwork_model.pkl'],
+    'column': ['column_volume_model.pkl', 'column_formwork_model.pkl'],
+    'slab': [],
+    'beam': ['beam_cut_length_model.pkl', 'beam_formwork_model.pkl'],
+}
+
+# ส่วนงาน -> คอลัมน์ input ของรายการ
+CATEGORY_INPUTS = {
+    'foundation': ['width', 'length', 'thickness', 'count'],
+    'column': ['width', 'depth', 'height', 'count'],
+    'slab': ['type', 'thickness', 'area', 'count'],
+    'beam': ['b', 'h', 'length', 'count'],
+}
+
+# ปริมาณเหล็กต่อคอนกรีต 1 m³ (kg)
+STEEL_PER_M3 = 110
+SLAB_STEEL_PER_M3 = {'RC Slab': 90, 'Post-Tension Slab': 60}
+
+
+def foundation_item(width, length, thickness, count, predict):
+    # คำนวณค่าอื่นๆ อัตโนมัติ
+    area = width * length
+    perimeter = 2 * (width + length)
+
+    # คำนวณด้วยสูตร
+    volume = width * length * thickness * count
+    formwork = (2 * (width + length) * thickness) * count
+
+    # ลองใช้โมเดล
+    data = {
+        'Width': width,
+        'Length': length,
+        'Thickness': thickness,
+        'Area': area,
+        'Perimeter': perimeter,
+        'Count': count
+    }
+    volume_ml = predict("foundation_volume_model.pkl", data)
+    formwork_ml = predict("foundation_formwork_model.pkl", data)
+    if volume_ml is not None and formwork_ml is not None:
+        volume = volume_ml * count
+        formwork = formwork_ml * count
+
+    return {
+        'width': width,
+        'length': length,
+        'thickness': thickness,
+        'count': count,
+        'volume': volume,
+        'formwork': formwork
+    }
+
+
+def column_item(width, depth, height, count, predict):
+    # คำนวณค่าอื่นๆ อัตโนมัติ
+    perimeter = 2 * (width + depth)
+    area = width * depth
+
+    # คำนวณด้วยสูตร
+    volume = width * depth * height * count
+    formwork = perimeter * height * count
+
+    # ลองใช้โมเดล
+    data = {
+        'Width': width,
+        'Depth': depth,
+        'Length': height,
+        'Perimeter': perimeter,
+        'Area Column': area
+    }
+    volume_ml = predict("column_volume_model.pkl", data)
+    formwork_ml = predict("column_formwork_model.pkl", data)
+    if volume_ml is not None and formwork_ml is not None:
+        volume = volume_ml * count
+        formwork = formwork_ml * count
+
+    return {
+        'width': width,
+        'depth': depth,
+        'height': height,
+        'count': count,
+        'volume': volume,
+        'formwork': formwork,
+        'steel': volume * STEEL_PER_M3
+    }
+
+
+def slab_item(slab_type, thickness, area, count, predict=None):
+    """พื้นใช้สูตรอย่างเดียว (slab_type เป็นชื่อประเภท หรือ array ของชื่อ)"""
+    # ประมาณ Perimeter จาก Area (สมมติเป็นสี่เหลี่ยมผืนผ้า)
+    # ถ้า Area = L × W และสมมติ L/W ≈ 1.5 (อัตราส่วนทั่วไป)
+    # Perimeter ≈ 2 × sqrt(Area × 5)
+    perimeter = 2 * (area ** 0.5) * 2.5
+
+    # คำนวณด้วยสูตร
+    volume = area * thickness * count
+    formwork_side = perimeter * thickness * count
+    formwork_all = (formwork_side + area) * count
+    steel_per_m3 = np.where(np.asarray(slab_type) == 'RC Slab',
+                            SLAB_STEEL_PER_M3['RC Slab'], SLAB_STEEL_PER_M3['Post-Tension Slab'])
+
+    return {
+        'type': slab_type,
+        'thickness': thickness,
+        'area': area,
+        'count': count,
+        'volume': volume,
+        'formwork_side': formwork_side,
+        'formwork_all': formwork_all,
+        'steel': volume * steel_per_m3
+    }
+
+
+def beam_item(b, h, length, count, predict):
+    # คำนวณด้วยสูตรก่อน
+    cut_length = length * 0.85  # ประมาณการ 85% ของความยาวเต็ม
+    volume_full = b * h * length * count
+    formwork = 2 * (b + h) * length * count
+
+    # ลองใช้โมเดล
+    data_input = {
+        'B': b,
+        'H': h,
+        'Length': length
+    }
+    cut_length_ml = predict("beam_cut_length_model.pkl", data_input)
+    if cut_length_ml is not None:
+        cut_length = cut_length_ml
+
+        data_with_cut = {
+            'B': b,
+            'H': h,
+            'Cut Length': cut_length,
+            'Length': length
+        }
+        formwork_ml = predict("beam_formwork_model.pkl", data_with_cut)
+        if formwork_ml is not None:
+            formwork = formwork_ml * count
+
+    volume_cut = b * h * cut_length * count
+    return {
+        'b': b,
+        'h': h,
+        'length': length,
+        'count': count,
+        'cut_length': cut_length,
+        'volume_cut': volume_cut,
+        'volume_full': volume_full,
+        'steel_cut': volume_cut * STEEL_PER_M3,
+        'steel_full': volume_full * STEEL_PER_M3,
+        'formwork': formwork
+    }
+
+
+ITEM_FUNCTIONS = {
+    'foundation': foundation_item,
+    'column': column_item,
+    'slab': slab_item,
+    'beam': beam_item,
+}
+
+
+def compute_item(category, inputs, predict):
+    """คำนวณรายการจาก dict ของ input (ค่าเดี่ยวหรือ array ของทั้งส่วนงาน)"""
+    return ITEM_FUNCTIONS[category](*[inputs[name] for name in CATEGORY_INPUTS[category]], predict)
@@ -0,0 +1,196 @@
+"""
+Line Items - รายการประมาณการใน session เก็บแบบ columnar (NumPy array ต่อคอลัมน์, dtype คงที่)
+
+แทน list ของ dict (dict ละหลายร้อย byte + ต้องวนสร้าง widget ทุกรายการทุก rerun):
+- ต่อรายการใช้หน่วยความจำคงที่ (8 byte ต่อคอลัมน์ตัวเลข) และ array ขยายทีละ 2 เท่า (append เฉลี่ย O(1))
+- ลบหลายรายการพร้อมกันด้วย mask ครั้งเดียว
+- แสดงผลทีละหน้า (page) - เวลา render ต่อ rerun ไม่ขึ้นกับจำนวนรายการทั้งหมด
+- ทุกรายการมี id ถาวร (ไม่เลื่อนตามการลบเหมือน index) - ลบด้วย id ได้ถูกตัวเสมอ
+
+ตัวอย่าง:
+    store = ItemStore('column')
+    item_id = store.append({'width': 0.3, 'depth': 0.3, 'height': 2.8, 'count': 1, ...})
+    store.page(0, 50)          # dict หัวตาราง -> array ของหน้าแรก (ส่งให้ st.dataframe ได้เลย)
+    removed = store.delete_ids([item_id])
+    totals.remove_many('column', removed)
+"""
+
+import numpy as np
+
+# ส่วนงาน -> [(ชื่อคอลัมน์, dtype, หัวตาราง)] ชื่อคอลัมน์ตรงกับ CATEGORY_FIELDS ใน running_totals.py
+SCHEMAS = {
+    'foundation': [
+        ('width', np.float64, 'Width (m)'),
+        ('length', np.float64, 'Length (m)'),
+        ('thickness', np.float64, 'Thickness (m)'),
+        ('count', np.int64, 'Count'),
+        ('volume', np.float64, 'Volume (m³)'),
+        ('formwork', np.float64, 'Formwork (m²)'),
+    ],
+    'column': [
+        ('width', np.float64, 'Width (m)'),
+        ('depth', np.float64, 'Depth (m)'),
+        ('height', np.float64, 'Height (m)'),
+        ('count', np.int64, 'Count'),
+        ('volume', np.float64, 'Volume (m³)'),
+        ('formwork', np.float64, 'Formwork (m²)'),
+        ('steel', np.float64, 'Steel (kg)'),
+    ],
+    'slab': [
+        ('type', 'U17', 'Type'),
+        ('thickness', np.float64, 'Thickness (m)'),
+        ('area', np.float64, 'Area (m²)'),
+        ('count', np.int64, 'Count'),
+        ('volume', np.float64, 'Volume (m³)'),
+        ('formwork_side', np.float64, 'Formwork ข้าง (m²)'),
+        ('formwork_all', np.float64, 'Formwork (m²)'),
+        ('steel', np.float64, 'Steel (kg)'),
+    ],
+    'beam': [
+        ('b', np.float64, 'B (m)'),
+        ('h', np.float64, 'H (m)'),
+        ('length', np.float64, 'Length (m)'),
+        ('count', np.int64, 'Count'),
+        ('cut_length', np.float64, 'Cut Length (m)'),
+        ('volume_cut', np.float64, 'Volume Cut (m³)'),
+        ('volume_full', np.float64, 'Volume Full (m³)'),
+        ('steel_cut', np.float64, 'Steel Cut (kg)'),
+        ('steel_full', np.float64, 'Steel Full (kg)'),
+        ('formwork', np.float64, 'Formwork (m²)'),
+    ],
+}
+
+INITIAL_CAPACITY = 16
+
+# หัวคอลัมน์ id ของรายการในตาราง
+ID_LABEL = 'ID'
+
+
+class ItemStore:
+    """รายการของส่วนงานเดียว - array ต่อคอลัมน์ ใช้จริง [:len(store)] ส่วนที่เหลือเป็นที่ว่างสำรอง"""
+
+    def __init__(self, category):
+        self.category = category
+        self.schema = SCHEMAS[category]
+        self._size = 0
+        self._columns = {name: np.zeros(INITIAL_CAPACITY, dtype=dtype) for name, dtype, _ in self.schema}
+        self._ids = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        self._next_id = 1
+        # เพิ่มทุกครั้งที่ลบ - ใช้เป็นส่วนหนึ่งของ key ตาราง ให้การเลือกแถวเดิม (index เก่า) ถูกล้าง
+        self.version = 0
+
+    @classmethod
+    def from_columns(cls, category, columns, ids, next_id=None):
+        """สร้าง store จาก array ทั้งคอลัมน์ (เช่น ตอนเปิดโปรเจกต์ที่บันทึกไว้)"""
+        store = cls(category)
+        store._resize(max(INITIAL_CAPACITY, len(ids)))
+        store._size = len(ids)
+        for name, array in store._columns.items():
+            array[:store._size] = columns[name]
+        store._ids[:store._size] = ids
+        store._next_id = next_id or int(np.max(ids, initial=0)) + 1
+        return store
+
+    @property
+    def next_id(self):
+        return self._next_id
+
+    def set_columns(self, columns):
+        """แทนค่าคอลัมน์ (ทุกแถว) ด้วย array ใหม่ - ใช้ตอนคำนวณผลลัพธ์ใหม่ทั้งส่วนงาน"""
+        for name, values in columns.items():
+            self._columns[name][:self._size] = values
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return len(self._columns[self.schema[0][0]])
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self._columns.values())
+
+    def _resize(self, capacity):
+        for name, array in self._columns.items():
+            resized = np.zeros(capacity, dtype=array.dtype)
+            resized[:self._size] = array[:self._size]
+            self._columns[name] = resized
+        ids = np.zeros(capacity, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        self._ids = ids
+
+    def append(self, item):
+        """เพิ่ม 1 รายการ (dict ที่มีครบทุกคอลัมน์ของ schema) คืนค่า id ของรายการ"""
+        if self._size == self.capacity:
+            self._resize(2 * self.capacity)
+        for name, array in self._columns.items():
+            array[self._size] = item[name]
+        item_id = self._next_id
+        self._ids[self._size] = item_id
+        self._next_id += 1
+        self._size += 1
+        return item_id
+
+    @property
+    def ids(self):
+        """id ของทุกรายการ เรียงตามลำดับที่แสดง (view - ห้ามแก้ค่า)"""
+        return self._ids[:self._size]
+
+    def column(self, name):
+        """array ของคอลัมน์ (view - ห้ามแก้ค่า)"""
+        return self._columns[name][:self._size]
+
+    def columns(self, rows=None):
+        """dict ชื่อคอลัมน์ -> array (rows = index ของแถวที่ต้องการ, None = ทุกแถว)"""
+        if rows is None:
+            return {name: array[:self._size] for name, array in self._columns.items()}
+        return {name: array[:self._size][rows] for name, array in self._columns.items()}
+
+    def delete(self, rows):
+        """ลบหลายแถวพร้อมกัน คืนค่า columns ของแถวที่ถูกลบ (ใช้หักออกจาก RunningTotals)"""
+        rows = np.unique(np.asarray(rows, dtype=np.intp))
+        rows = rows[(rows >= 0) & (rows < self._size)]
+        removed = self.columns(rows)
+        if len(rows) == 0:
+            return removed
+
+        keep = np.ones(self._size, dtype=bool)
+        keep[rows] = False
+        size = int(keep.sum())
+        for array in list(self._columns.values()) + [self._ids]:
+            array[:size] = array[:self._size][keep]
+        self._size = size
+        self.version += 1
+
+        # คืนหน่วยความจำเมื่อใช้ไม่ถึง 1/4 (เหลือที่ว่างเท่าจำนวนที่ใช้ - append ต่อได้โดยไม่ขยายทันที)
+        if self.capacity > INITIAL_CAPACITY and self._size < self.capacity // 4:
+            self._resize(max(INITIAL_CAPACITY, 2 * self._size))
+        return removed
+
+    def delete_ids(self, ids):
+        """ลบรายการตาม id (id ที่ไม่มีแล้วถูกข้าม) คืนค่า columns ของแถวที่ถูกลบ"""
+        rows = np.flatnonzero(np.isin(self.ids, np.asarray(ids, dtype=np.int64)))
+        return self.delete(rows)
+
+    def clear(self):
+        self._size = 0
+        self._resize(INITIAL_CAPACITY)
+        self.version += 1
+
+    def labels(self):
+        """หัวตารางเรียงตาม schema"""
+        return [label for _, _, label in self.schema]
+
+    def float_labels(self):
+        """หัวตารางของคอลัมน์ทศนิยม (จัดรูปแบบ 2 ตำแหน่งตอนแสดงผล)"""
+        return [label for _, dtype, label in self.schema if np.dtype(dtype).kind == 'f']
+
+    def page(self, start, stop):
+        """แถว [start, stop) สำหรับแสดงผล: dict หัวตาราง -> array (copy เฉพาะแถวของหน้านั้น)"""
+        start = max(0, start)
+        stop = min(stop, self._size)
+        page = {ID_LABEL: self._ids[start:stop].copy()}
+        for name, _, label in self.schema:
+            page[label] = self._columns[name][start:stop].copy()
+        return page
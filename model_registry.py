@@ -0,0 +1,161 @@
+"""
+Model Registry - โหลดโมเดล *_model.pkl ครั้งเดียวต่อ process
+ใช้ร่วมกันทุก session / ทุกครั้งที่ Streamlit rerun
+
+- หาไฟล์โมเดลใน MODEL ML/ ก่อน แล้วค่อยลอง path เดิม (models/, ., ../, ../../)
+- เก็บ (model, scaler, feature_names) ไว้ในหน่วยความจำ
+- ถ้ามีโฟลเดอร์ .compact ที่ export จาก .pkl เดียวกัน (sha256 ตรงกัน) จะโหลด compact แทน
+  (NumPy memory map ไม่ต้อง unpickle / import scikit-learn) - scaler เป็น None เพราะรวมอยู่ในโมเดลแล้ว
+- โหลดใหม่เฉพาะเมื่อไฟล์เปลี่ยน (mtime/size เปลี่ยน และ hash ของไฟล์เปลี่ยน)
+"""
+
+import os
+import pickle
+import hashlib
+import threading
+
+from compact_model import compact_path, load_compact, read_compact_meta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, 'MODEL ML')
+
+# โมเดลที่เลิกใช้ - เทรนจาก Steel ที่จับคู่กับแถว schedule ตามลำดับแถว (ผิดแถว) ก่อนจับคู่ด้วย key
+# ไฟล์ที่ยังค้างอยู่ในเครื่องจะไม่ถูกเปิดให้บริการ (prediction_server) - เทรนใหม่ด้วย key แล้วค่อยเอาออกจากรายการ
+RETIRED_MODELS = {'column_steel_model.pkl', 'beam_steel_model.pkl', 'slab_steel_model.pkl'}
+
+# path เดิมที่ app.py เคยใช้ (relative กับ working directory)
+LEGACY_DIRS = ['models', '.', '..', os.path.join('..', '..')]
+
+
+def file_sha256(path):
+    """คำนวณ sha256 ของไฟล์"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ModelEntry:
+    """ข้อมูลโมเดลที่โหลดแล้ว 1 ไฟล์"""
+
+    def __init__(self, path, stat, sha256, data):
+        self.path = path
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.sha256 = sha256
+        self.model = data['model']
+        self.scaler = data['scaler']
+        self.feature_names = data['feature_names']
+
+    def as_tuple(self):
+        return self.model, self.scaler, self.feature_names
+
+
+def load_model_data(path, sha256, prefer_compact=True):
+    """โหลดข้อมูลโมเดล - ใช้ compact ถ้า export จาก .pkl ไฟล์นี้ ไม่เช่นนั้น unpickle"""
+    if prefer_compact:
+        compact = compact_path(path)
+        meta = read_compact_meta(compact)
+        if meta is not None and meta.get('source_sha256') == sha256:
+            model = load_compact(compact)
+            return {'model': model, 'scaler': None, 'feature_names': model.feature_names}
+
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class ModelRegistry:
+    """Registry ของโมเดล - thread-safe, โหลดไฟล์ละครั้ง"""
+
+    def __init__(self, search_dirs=None, prefer_compact=True):
+        if search_dirs is None:
+            search_dirs = [MODEL_DIR] + LEGACY_DIRS
+        self.search_dirs = list(search_dirs)
+        self.prefer_compact = prefer_compact
+        self._entries = {}
+        self._paths = {}
+        self._lock = threading.RLock()
+        self.loads = 0
+
+    def resolve(self, model_file):
+        """หา path ของไฟล์โมเดล (cache ผลลัพธ์ไว้)"""
+        path = self._paths.get(model_file)
+        if path is not None and os.path.exists(path):
+            return path
+
+        candidates = [model_file] if os.path.isabs(model_file) else [
+            os.path.join(d, model_file) for d in self.search_dirs
+        ]
+        for candidate in candidates:
+            if os.path.exists(candidate):
+                self._paths[model_file] = candidate
+                return candidate
+
+        self._paths.pop(model_file, None)
+        return None
+
+    def get_entry(self, model_file):
+        """คืนค่า ModelEntry (โหลดใหม่ถ้าไฟล์เปลี่ยน) หรือ None ถ้าหาไม่พบ"""
+        with self._lock:
+            path = self.resolve(model_file)
+            if path is None:
+                return None
+
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+
+            entry = self._entries.get(model_file)
+            if entry is not None and entry.path == path:
+                if entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                    return entry
+
+            try:
+                sha256 = file_sha256(path)
+                # mtime เปลี่ยนแต่เนื้อหาเหมือนเดิม - ไม่ต้อง unpickle ใหม่
+                if entry is not None and entry.path == path and entry.sha256 == sha256:
+                    entry.mtime_ns = stat.st_mtime_ns
+                    entry.size = stat.st_size
+                    return entry
+
+                data = load_model_data(path, sha256, self.prefer_compact)
+                entry = ModelEntry(path, stat, sha256, data)
+            except Exception:
+                return None
+
+            self._entries[model_file] = entry
+            self.loads += 1
+            return entry
+
+    def get(self, model_file):
+        """คืนค่า (model, scaler, feature_names) หรือ (None, None, None)"""
+        entry = self.get_entry(model_file)
+        if entry is None:
+            return None, None, None
+        return entry.as_tuple()
+
+    def version(self, model_file):
+        """hash ของไฟล์โมเดลที่โหลดอยู่ (ใช้เป็น version ของ artifact)"""
+        entry = self.get_entry(model_file)
+        return entry.sha256 if entry is not None else None
+
+    def clear(self):
+        """ล้างโมเดลทั้งหมดออกจากหน่วยความจำ"""
+        with self._lock:
+            self._entries.clear()
+            self._paths.clear()
+
+
+_registry = ModelRegistry()
+
+
+def get_registry():
+    """registry กลางของ process"""
+    return _registry
+
+
+def load_model(model_file):
+    """โหลดโมเดลผ่าน registry กลาง - คืนค่า (model, scaler, feature_names)"""
+    return _registry.get(model_file)
@@ -0,0 +1,139 @@
+"""
+Parse Cache - cache ผลการอ่านไฟล์ข้อมูลเทรน (schedule .csv/.xlsx และ Steel in ML.xlsx)
+
+key = SHA-256 ของเนื้อหาไฟล์ + ชนิดการอ่าน + CACHE_VERSION
+ถ้าไฟล์ไม่เปลี่ยน จะโหลด DataFrame ที่ parse แล้วจาก Parquet (ไม่ต้องผ่าน openpyxl อีก)
+ถ้าไม่มี pyarrow หรือคอลัมน์มีชนิดปนกันจนเขียน Parquet ไม่ได้ จะเก็บเป็น pickle แทน
+
+ตัวอย่าง:
+    from parse_cache import cached_schedule, cached_workbook
+    df = cached_schedule('MODEL ML/3.0 Framing ปริมาณคาน.csv')
+    sheets = cached_workbook('MODEL ML/Steel in ML.xlsx')
+
+ปิด cache ได้ด้วย environment variable PARSE_CACHE=0
+"""
+
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from model_registry import BASE_DIR, file_sha256
+from schedule_reader import read_schedule, totals_mode
+from timing import record, stage
+
+CACHE_DIR = os.path.join(BASE_DIR, '.parse_cache')
+
+# เปลี่ยนเลขนี้เมื่อวิธี parse เปลี่ยน (cache เก่าจะไม่ถูกใช้)
+CACHE_VERSION = 5
+
+# Parquet ต้องใช้ pyarrow (มากับ streamlit) - ถ้าไม่มีใช้ pickle แทน
+HAS_PARQUET = importlib.util.find_spec('pyarrow') is not None
+
+
+def cache_enabled():
+    return os.environ.get('PARSE_CACHE', '1') != '0'
+
+
+def cache_key(path, kind):
+    """ชื่อ entry ใน cache ของไฟล์นี้"""
+    return f"{kind}-v{CACHE_VERSION}-{file_sha256(path)}"
+
+
+# ===================================
+# เขียน / อ่าน entry
+# ===================================
+def write_frame(df, base):
+    """เขียน DataFrame 1 ตัว คืนค่าชื่อไฟล์ที่เขียน"""
+    if HAS_PARQUET:
+        try:
+            df.to_parquet(base + '.parquet')
+            return os.path.basename(base) + '.parquet'
+        except (ValueError, TypeError):
+            # คอลัมน์ object ที่มีทั้งตัวเลขและข้อความ - Parquet เก็บไม่ได้
+            pass
+    df.to_pickle(base + '.pkl')
+    return os.path.basename(base) + '.pkl'
+
+
+def read_frame(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def save_entry(key, frames):
+    """บันทึก dict ของ DataFrame (ชื่อ -> frame) แบบ atomic"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.tmp_', dir=CACHE_DIR)
+    try:
+        index = []
+        for i, (name, df) in enumerate(frames.items()):
+            index.append({'name': name, 'file': write_frame(df, os.path.join(tmp_dir, str(i)))})
+        with open(os.path.join(tmp_dir, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_dir, os.path.join(CACHE_DIR, key))
+    except OSError:
+        # process อื่นเขียน entry เดียวกันเสร็จก่อน
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def load_entry(key):
+    """โหลด dict ของ DataFrame จาก cache หรือ None ถ้าไม่มี"""
+    entry_dir = os.path.join(CACHE_DIR, key)
+    index_path = os.path.join(entry_dir, 'index.json')
+    if not os.path.exists(index_path):
+        return None
+    try:
+        with open(index_path, encoding='utf-8') as f:
+            index = json.load(f)
+        return {item['name']: read_frame(os.path.join(entry_dir, item['file'])) for item in index}
+    except Exception:
+        # entry เสีย - อ่านไฟล์ต้นฉบับใหม่
+        return None
+
+
+def cached(path, kind, parse):
+    """คืนค่า dict ของ DataFrame จาก cache หรือ parse(path) แล้วเก็บลง cache"""
+    if not cache_enabled():
+        return parse(path)
+
+    name = os.path.basename(path)
+    start = time.perf_counter()
+    key = cache_key(path, kind)
+    frames = load_entry(key)
+    record('cache_load', time.perf_counter() - start, file=name, kind=kind, hit=frames is not None)
+    if frames is None:
+        frames = parse(path)
+        with stage('cache_save', file=name, kind=kind):
+            save_entry(key, frames)
+    return frames
+
+
+# ===================================
+# API สำหรับสคริปต์เทรน
+# ===================================
+def cached_schedule(path, totals=None):
+    """read_schedule ผ่าน cache (แยก entry ตามโหมดแถวผลรวม)"""
+    totals = totals_mode(totals)
+    return cached(path, f'schedule-{totals}', lambda p: {'schedule': read_schedule(p, totals)})['schedule']
+
+
+def cached_workbook(path):
+    """อ่าน Excel ทุก sheet (dict ชื่อ sheet -> DataFrame) ผ่าน cache"""
+    return cached(path, 'workbook', read_workbook)
+
+
+def read_workbook(path):
+    """อ่าน Excel ทุก sheet ในครั้งเดียว"""
+    with stage('read_file', file=os.path.basename(path)):
+        return pd.read_excel(path, sheet_name=None)
+
+
+def clear_cache():
+    """ลบ cache ทั้งหมด"""
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
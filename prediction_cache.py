@@ -0,0 +1,89 @@
+"""
+Prediction Cache - cache ผลทำนายแบบ LRU ใช้ร่วมกันทุก session ของ app
+
+key = (version ของไฟล์โมเดล (sha256), ชื่อ features, ค่า input ที่ทำให้เป็นรูปแบบเดียวกัน)
+- โมเดลถูกเทรนใหม่ -> sha256 เปลี่ยน -> key เก่าไม่ถูกใช้อีก (และถูกดันออกตาม LRU)
+- ค่า input ปัดเป็น 9 ตำแหน่งทศนิยม (0.1 + 0.2 กับ 0.3 เป็น key เดียวกัน)
+
+ตัวอย่าง:
+    from prediction_cache import get_prediction_cache
+    cache = get_prediction_cache()
+    value = cache.get_or_compute(key, lambda: predict(...))
+    cache.stats()   # {'hits': ..., 'misses': ..., 'size': ..., 'maxsize': ..., 'hit_rate': ...}
+"""
+
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = 4096
+
+# จำนวนตำแหน่งทศนิยมของค่า input ใน key
+KEY_DECIMALS = 9
+
+
+def canonical_values(row, features):
+    """ค่า input เรียงตาม features เป็น tuple ของ float (ปัดเศษ, -0.0 -> 0.0)"""
+    return tuple(round(float(row[feat]), KEY_DECIMALS) + 0.0 for feat in features)
+
+
+def prediction_key(version, features, row):
+    """key ของผลทำนาย 1 แถว"""
+    return version, tuple(features), canonical_values(row, features)
+
+
+class PredictionCache:
+    """LRU cache ของผลทำนาย - thread-safe (Streamlit รันแต่ละ session ใน thread แยก)"""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        """คืนค่าจาก cache หรือเรียก compute() แล้วเก็บผล"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        # คำนวณนอก lock - session อื่นไม่ต้องรอ
+        value = compute()
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+_cache = PredictionCache()
+
+
+def get_prediction_cache():
+    """cache กลางของ process"""
+    return _cache
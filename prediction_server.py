@@ -0,0 +1,298 @@
+"""
+Prediction Server - HTTP service บนเครื่อง (standard library อย่างเดียว ทำงาน offline)
+ให้โปรแกรมอื่น (BIM plugin, ตารางคำนวณราคา) เรียกโมเดลได้โดยไม่ต้องเปิด Streamlit
+
+Endpoints:
+    GET  /health                         สถานะ + จำนวนโมเดลที่โหลด
+    GET  /models                         โมเดลทั้งหมด: element, target, features, version (sha256)
+    POST /predict/{element}/{target}     ทำนาย 1 แถว   body: {"Width": 0.3, "Depth": 0.3, ...}
+                                         -> {"prediction": ..., "version": ...}
+    POST /bulk/{element}/{target}        ทำนายหลายแถว body: {"rows": [{...}, {...}]}
+                                         -> {"predictions": [...], "version": ...}
+
+- โหลดโมเดลทุกตัวใน MODEL ML/ ครั้งเดียวตอนเริ่ม (ผ่าน ModelRegistry - ใช้ .compact ถ้ามี)
+- server เป็น asyncio (thread เดียว, HTTP/1.1 keep-alive) - ไม่มีต้นทุนสร้าง/สลับ thread ต่อ request
+- request แบบ 1 แถวที่เข้ามาพร้อมกันถูกรวมเป็น micro-batch แล้วทำนายด้วย predict ครั้งเดียว
+  (รวม request ที่อ่านได้ในรอบเดียวกันของ event loop หรือรอเพิ่มไม่เกิน --max-wait-ms, ไม่เกิน --max-batch แถว)
+
+รัน:
+    python prediction_server.py
+    python prediction_server.py --port 8765 --max-batch 256 --max-wait-ms 1
+
+ตัวอย่าง:
+    curl -X POST localhost:8765/predict/beam/cut_length -d '{"B": 0.2, "H": 0.6, "Length": 8.25}'
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from http import HTTPStatus
+
+from inference import predict_matrix, rows_to_matrix
+from model_registry import MODEL_DIR, RETIRED_MODELS, ModelRegistry
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH = 256
+# 0 = รวมเฉพาะ request ที่มาถึงในรอบเดียวกันของ event loop (ไม่เพิ่ม latency)
+DEFAULT_MAX_WAIT_MS = 0.0
+
+# ขนาด body สูงสุดที่รับ (byte)
+MAX_BODY_BYTES = 64 * 1024 * 1024
+MODEL_SUFFIX = '_model.pkl'
+ELEMENTS = ['foundation', 'column', 'beam', 'slab']
+
+
+class BadRequest(Exception):
+    """input ไม่ถูกต้อง (ตอบ 400)"""
+
+
+class MicroBatcher:
+    """คิวของ request 1 แถวของโมเดลเดียว - ทำนายทั้งคิวด้วย predict ครั้งเดียว (ใช้ใน event loop เท่านั้น)"""
+
+    def __init__(self, entry, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT_MS / 1000):
+        self.entry = entry
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.rows = 0
+        self._pending = []
+        self._timer = None
+
+    def submit(self, row):
+        """เพิ่ม 1 แถว (ตรวจ features แล้ว) เข้าคิว คืนค่า asyncio.Future ของผลทำนาย"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            # call_soon: ทำนายหลัง callback ที่พร้อมแล้วในรอบนี้ (request อื่นที่อ่านเสร็จพร้อมกัน) ได้เข้าคิวก่อน
+            if self.max_wait > 0:
+                self._timer = loop.call_later(self.max_wait, self.flush)
+            else:
+                self._timer = loop.call_soon(self.flush)
+        return future
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        try:
+            X = rows_to_matrix([row for row, _ in batch], self.entry.feature_names)
+            predictions = predict_matrix(self.entry.model, self.entry.scaler, X)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(batch)
+        for (_, future), value in zip(batch, predictions):
+            # client ตัดการเชื่อมต่อไปแล้ว -> future ถูกยกเลิก
+            if not future.done():
+                future.set_result(float(value))
+
+
+class PredictionService:
+    """โมเดลที่โหลดแล้ว + micro-batcher ต่อโมเดล"""
+
+    def __init__(self, model_dir=MODEL_DIR, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.registry = ModelRegistry([model_dir])
+        self.entries = {}
+        self.batchers = {}
+        for name in sorted(os.listdir(model_dir)):
+            if not name.endswith(MODEL_SUFFIX):
+                continue
+            if name in RETIRED_MODELS:
+                print(f"⚠️ ข้ามโมเดลที่เลิกใช้: {name}")
+                continue
+            entry = self.registry.get_entry(name)
+            if entry is None:
+                print(f"⚠️ โหลดโมเดลไม่ได้: {name}")
+                continue
+            key = name[:-len(MODEL_SUFFIX)]
+            self.entries[key] = entry
+            self.batchers[key] = MicroBatcher(entry, max_batch, max_wait_ms / 1000)
+
+    def model_key(self, element, target):
+        key = f"{element}_{target}"
+        if key not in self.entries:
+            raise KeyError(f"ไม่มีโมเดล {element}/{target}")
+        return key
+
+    def check_row(self, key, row):
+        """ตรวจว่า row มี features ครบและเป็นตัวเลข"""
+        if not isinstance(row, dict):
+            raise BadRequest("แต่ละแถวต้องเป็น JSON object")
+        features = self.entries[key].feature_names
+        missing = [feat for feat in features if feat not in row]
+        if missing:
+            raise BadRequest(f"ขาด features: {missing} (ต้องมี {features})")
+        for feat in features:
+            if isinstance(row[feat], bool) or not isinstance(row[feat], (int, float)):
+                raise BadRequest(f"{feat} ต้องเป็นตัวเลข")
+        return row
+
+    async def predict_one(self, element, target, row):
+        key = self.model_key(element, target)
+        value = await self.batchers[key].submit(self.check_row(key, row))
+        return value, self.entries[key].sha256
+
+    def predict_many(self, element, target, rows):
+        """หลายแถว - ทำนายทันที (เป็น batch อยู่แล้ว)"""
+        key = self.model_key(element, target)
+        if not isinstance(rows, list):
+            raise BadRequest('body ต้องเป็น {"rows": [...]}')
+        rows = [self.check_row(key, row) for row in rows]
+        entry = self.entries[key]
+        X = rows_to_matrix(rows, entry.feature_names)
+        return predict_matrix(entry.model, entry.scaler, X).tolist(), entry.sha256
+
+    def models(self):
+        models = []
+        for key, entry in self.entries.items():
+            element = next((e for e in ELEMENTS if key.startswith(e + '_')), key.split('_')[0])
+            models.append({'element': element, 'target': key[len(element) + 1:],
+                           'features': list(entry.feature_names), 'version': entry.sha256})
+        return models
+
+    def stats(self):
+        return {key: {'batches': b.batches, 'rows': b.rows} for key, b in self.batchers.items()}
+
+    # ===================================
+    # HTTP
+    # ===================================
+    async def dispatch(self, method, path, body):
+        """คืนค่า (status, payload)"""
+        parts = path.split('?', 1)[0].strip('/').split('/')
+        try:
+            if method == 'GET' and parts == ['health']:
+                return 200, {'status': 'ok', 'models': len(self.entries), 'batches': self.stats()}
+            if method == 'GET' and parts == ['models']:
+                return 200, {'models': self.models()}
+            if method != 'POST' or len(parts) != 3 or parts[0] not in ('predict', 'bulk'):
+                raise KeyError(f"ไม่มี endpoint {method} {path}")
+
+            _, element, target = parts
+            try:
+                data = json.loads(body or b'null')
+            except ValueError:
+                raise BadRequest("body ไม่ใช่ JSON")
+
+            if parts[0] == 'predict':
+                value, version = await self.predict_one(element, target, data)
+                return 200, {'prediction': value, 'version': version}
+            rows = data.get('rows') if isinstance(data, dict) else None
+            values, version = self.predict_many(element, target, rows)
+            return 200, {'predictions': values, 'version': version}
+        except BadRequest as e:
+            return 400, {'error': str(e)}
+        except KeyError as e:
+            return 404, {'error': e.args[0]}
+        except Exception as e:
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+
+    async def handle_connection(self, reader, writer):
+        """1 connection (HTTP/1.1 keep-alive: หลาย request ต่อ connection)"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, path, version = lines[0].split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(':')
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = content_length(headers)
+                except BadRequest as e:
+                    # ไม่รู้ว่า body ยาวเท่าไร - อ่าน request ถัดไปบน connection นี้ต่อไม่ได้
+                    status, payload = 400, {'error': str(e)}
+                    keep_alive = False
+                else:
+                    if length > MAX_BODY_BYTES:
+                        status, payload = 413, {'error': f"body ใหญ่เกิน {MAX_BODY_BYTES} byte"}
+                        keep_alive = False
+                    else:
+                        try:
+                            body = await reader.readexactly(length)
+                        except (asyncio.IncompleteReadError, ConnectionError):
+                            break
+                        status, payload = await self.dispatch(method, path, body)
+                        connection = headers.get('connection', '').lower()
+                        keep_alive = connection == 'keep-alive' or (version == 'HTTP/1.1' and connection != 'close')
+
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+
+def content_length(headers):
+    """ความยาว body จาก header Content-Length (ไม่มี = 0) - ไม่ใช่จำนวนเต็มบวกจะ raise BadRequest"""
+    value = headers.get('content-length', '').strip()
+    if not value:
+        return 0
+    # int() รับ '-5', '+5', '1_000' ได้ - ยอมเฉพาะตัวเลข ASCII
+    if not (value.isascii() and value.isdigit()):
+        raise BadRequest(f"Content-Length ไม่ถูกต้อง: {value!r}")
+    return int(value)
+
+
+async def start_server(host=DEFAULT_HOST, port=DEFAULT_PORT, model_dir=MODEL_DIR,
+                       max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+    """โหลดโมเดลทั้งหมดแล้วเริ่มรับ connection คืนค่า (asyncio server, service)"""
+    service = PredictionService(model_dir, max_batch, max_wait_ms)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    return server, service
+
+
+async def serve(host, port, model_dir, max_batch, max_wait_ms):
+    server, service = await start_server(host, port, model_dir, max_batch, max_wait_ms)
+    print(f"✅ โหลดโมเดล {len(service.entries)} ตัว")
+    print(f"🚀 http://{host}:{server.sockets[0].getsockname()[1]}  (Ctrl+C เพื่อหยุด)")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP service สำหรับทำนายปริมาณงาน (offline)")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH, help="จำนวนแถวสูงสุดต่อ micro-batch")
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="เวลารอ request อื่นมารวม batch (ms, 0 = รวมเฉพาะที่มาพร้อมกัน)")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.model_dir, args.max_batch, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Project Store - บันทึก/เปิดโปรเจกต์ประมาณการ (รายการทุกส่วนงาน) เป็นไฟล์ SQLite ไฟล์เดียว
+
+ตารางในไฟล์:
+    meta                key/value: format, วันที่บันทึก, version (sha256) ของโมเดลที่ใช้ทำนาย, next_id
+    items_<ส่วนงาน>      1 แถวต่อรายการ: id + input + ผลลัพธ์ที่คำนวณแล้ว (คอลัมน์ตาม line_items.SCHEMAS)
+
+เปิดโปรเจกต์: อ่านผลลัพธ์ที่บันทึกไว้ได้เลย ไม่ต้องทำนายใหม่
+ยกเว้นส่วนงานที่ไฟล์โมเดลเปลี่ยนไปจากตอนบันทึก -> ทำนายใหม่ทั้งส่วนงานในการเรียกโมเดลครั้งเดียว (batch)
+
+ตัวอย่าง:
+    save_project('อาคาร A.estimate.db', stores, model_versions())
+    stores, refreshed = open_project('อาคาร A.estimate.db')
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+from inference import predict_batch
+from item_formulas import CATEGORY_INPUTS, CATEGORY_MODELS, compute_item
+from line_items import SCHEMAS, ItemStore
+from model_registry import get_registry
+
+PROJECT_SUFFIX = '.estimate.db'
+FORMAT_VERSION = 1
+
+# dtype.kind ของ NumPy -> ชนิดคอลัมน์ SQLite
+SQL_TYPES = {'f': 'REAL', 'i': 'INTEGER', 'U': 'TEXT'}
+
+
+def model_versions(registry=None):
+    """version (sha256) ปัจจุบันของโมเดลทุกตัวที่ app ใช้ (None = ไม่มีไฟล์โมเดล)"""
+    registry = registry or get_registry()
+    return {model_file: registry.version(model_file)
+            for models in CATEGORY_MODELS.values() for model_file in models}
+
+
+def stale_categories(saved_versions, current_versions):
+    """ส่วนงานที่โมเดลเปลี่ยนไปจากตอนบันทึก (ต้องทำนายใหม่)"""
+    return [category for category, models in CATEGORY_MODELS.items()
+            if any(saved_versions.get(model) != current_versions.get(model) for model in models)]
+
+
+# ===================================
+# บันทึก
+# ===================================
+def create_tables(conn):
+    conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    for category, schema in SCHEMAS.items():
+        columns = ', '.join(f'"{name}" {SQL_TYPES[np.dtype(dtype).kind]} NOT NULL' for name, dtype, _ in schema)
+        conn.execute(f'CREATE TABLE items_{category} (id INTEGER PRIMARY KEY, {columns})')
+
+
+def save_project(path, stores, versions):
+    """เขียนโปรเจกต์ลงไฟล์ (เขียนไฟล์ชั่วคราวก่อนแล้ว os.replace - ไฟล์เดิมไม่เสียถ้าบันทึกไม่สำเร็จ)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp_', suffix=PROJECT_SUFFIX, dir=directory)
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(tmp_path)
+        try:
+            with conn:
+                create_tables(conn)
+                meta = {
+                    'format': FORMAT_VERSION,
+                    'saved_at': datetime.now().isoformat(timespec='seconds'),
+                    'model_versions': versions,
+                    'next_ids': {category: store.next_id for category, store in stores.items()},
+                }
+                conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                                 [(key, json.dumps(value, ensure_ascii=False)) for key, value in meta.items()])
+                for category, store in stores.items():
+                    names = [name for name, _, _ in SCHEMAS[category]]
+                    columns = store.columns()
+                    placeholders = ', '.join('?' * (len(names) + 1))
+                    conn.executemany(f"INSERT INTO items_{category} VALUES ({placeholders})",
+                                     zip(store.ids.tolist(), *[columns[name].tolist() for name in names]))
+        finally:
+            conn.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+# ===================================
+# เปิด
+# ===================================
+def load_project(path):
+    """อ่านไฟล์โปรเจกต์ คืนค่า (dict ส่วนงาน -> ItemStore, meta)"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"ไม่พบไฟล์โปรเจกต์: {path}")
+
+    conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+    try:
+        meta = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM meta")}
+        if meta.get('format') != FORMAT_VERSION:
+            raise ValueError(f"format ของไฟล์โปรเจกต์ไม่รองรับ: {meta.get('format')}")
+
+        stores = {}
+        for category, schema in SCHEMAS.items():
+            names = [name for name, _, _ in schema]
+            fields = ', '.join(f'"{name}"' for name in names)
+            rows = conn.execute(f"SELECT id, {fields} FROM items_{category} ORDER BY rowid").fetchall()
+            values = list(zip(*rows)) or [()] * (len(names) + 1)
+            columns = {name: np.array(values[i + 1], dtype=dtype) for i, (name, dtype, _) in enumerate(schema)}
+            stores[category] = ItemStore.from_columns(category, columns, np.array(values[0], dtype=np.int64),
+                                                      meta.get('next_ids', {}).get(category))
+    finally:
+        conn.close()
+    return stores, meta
+
+
+def batch_predictor(registry):
+    """predict สำหรับ item_formulas ที่รับ input เป็น array ทั้งส่วนงาน (None ถ้าไม่มีไฟล์โมเดล)"""
+    def predict(model_file, data):
+        rows = np.rec.fromarrays([np.asarray(value, dtype=float) for value in data.values()], names=list(data))
+        try:
+            return predict_batch(model_file, rows, registry)
+        except FileNotFoundError:
+            return None
+    return predict
+
+
+def refresh_outputs(store, registry=None):
+    """คำนวณผลลัพธ์ใหม่ทั้งส่วนงานจาก input ที่บันทึกไว้"""
+    if not len(store):
+        return
+    predict = batch_predictor(registry or get_registry())
+    inputs = {name: store.column(name) for name in CATEGORY_INPUTS[store.category]}
+    outputs = compute_item(store.category, inputs, predict)
+    store.set_columns({name: values for name, values in outputs.items() if name not in inputs})
+
+
+def open_project(path, registry=None):
+    """เปิดโปรเจกต์ คืนค่า (dict ส่วนงาน -> ItemStore, ส่วนงานที่ทำนายใหม่เพราะโมเดลเปลี่ยน)"""
+    registry = registry or get_registry()
+    stores, meta = load_project(path)
+    refreshed = []
+    for category in stale_categories(meta.get('model_versions', {}), model_versions(registry)):
+        if len(stores[category]):
+            refresh_outputs(stores[category], registry)
+            refreshed.append(category)
+    return stores, refreshed
@@ -0,0 +1,87 @@
+"""
+Running Totals - ผลรวมปริมาณงานของ session (ต่อส่วนงาน และรวมทั้งหมด)
+อัปเดตตอนเพิ่ม/ลบ (O(จำนวนรายการที่เปลี่ยน)) แทนการวนรวมรายการทั้งหมดทุกครั้งที่ Streamlit rerun
+
+ตัวอย่าง:
+    totals = RunningTotals()
+    totals.add('column', item)        # item = dict ของรายการที่เพิ่มใน st.session_state.column_items
+    totals.remove_many('column', removed)   # removed = columns ที่ ItemStore.delete() คืนมา
+    totals.category('column')         # {'count': ..., 'volume': ..., 'formwork': ..., 'steel': ...}
+    totals.grand()
+"""
+
+# ส่วนงาน -> คอลัมน์ของรายการที่ใช้เป็น volume / formwork / steel (None = ไม่มีค่า)
+CATEGORY_FIELDS = {
+    'foundation': {'volume': 'volume', 'formwork': 'formwork', 'steel': None},
+    'column': {'volume': 'volume', 'formwork': 'formwork', 'steel': 'steel'},
+    'slab': {'volume': 'volume', 'formwork': 'formwork_all', 'steel': 'steel'},
+    'beam': {'volume': 'volume_full', 'formwork': 'formwork', 'steel': 'steel_full'},
+}
+
+QUANTITIES = ['volume', 'formwork', 'steel']
+
+
+class RunningTotals:
+    """ผลรวมต่อส่วนงานและผลรวมทั้งหมด"""
+
+    def __init__(self, stores=None):
+        """stores = dict ส่วนงาน -> ItemStore (รวมรายการที่มีอยู่แล้ว)"""
+        self.reset()
+        for category, store in (stores or {}).items():
+            self.add_many(category, store.columns())
+
+    def reset(self):
+        self._totals = {category: dict.fromkeys(['count'] + QUANTITIES, 0) for category in CATEGORY_FIELDS}
+
+    def _apply(self, category, item, sign):
+        totals = self._totals[category]
+        totals['count'] += sign
+        for quantity, field in CATEGORY_FIELDS[category].items():
+            if field is not None:
+                totals[quantity] += sign * item[field]
+        self._settle(totals)
+
+    def _apply_many(self, category, columns, sign):
+        """บวก/ลบหลายรายการพร้อมกัน (columns = dict ชื่อคอลัมน์ -> array)"""
+        totals = self._totals[category]
+        fields = CATEGORY_FIELDS[category]
+        totals['count'] += sign * len(columns[fields['volume']])
+        for quantity, field in fields.items():
+            if field is not None:
+                totals[quantity] += sign * float(columns[field].sum())
+        self._settle(totals)
+
+    @staticmethod
+    def _settle(totals):
+        if totals['count'] == 0:
+            # ไม่มีรายการเหลือ - ล้างเศษทศนิยมที่สะสมจากการบวก/ลบ
+            totals.update(dict.fromkeys(QUANTITIES, 0))
+
+    def add(self, category, item):
+        self._apply(category, item, 1)
+
+    def remove(self, category, item):
+        self._apply(category, item, -1)
+
+    def add_many(self, category, columns):
+        self._apply_many(category, columns, 1)
+
+    def remove_many(self, category, columns):
+        self._apply_many(category, columns, -1)
+
+    def category(self, category):
+        return dict(self._totals[category])
+
+    def has_steel(self, category):
+        return CATEGORY_FIELDS[category]['steel'] is not None
+
+    def grand(self):
+        grand = dict.fromkeys(['count'] + QUANTITIES, 0)
+        for totals in self._totals.values():
+            for key in grand:
+                grand[key] += totals[key]
+        return grand
+
+    def categories(self):
+        """ส่วนงานที่มีรายการ (เรียงตาม CATEGORY_FIELDS)"""
+        return [category for category, totals in self._totals.items() if totals['count'] > 0]
@@ -0,0 +1,526 @@
+"""
+Schedule Reader - อ่านไฟล์ Schedule ที่ export จาก Revit (CSV / XLSX)
+
+รูปแบบไฟล์:
+    แถว 1: ชื่อ schedule เช่น "2.0 Column ปริมาณเสา"
+    แถว 2: header เช่น Type, Count, Width, Depth, ...
+    แถว 3: แถวว่าง
+    แถวถัดไป: ข้อมูล (+ แถวผลรวม เช่น "Rectangular Column: 229" และ grand total)
+
+แถวผลรวมถูกแยกออกด้วย classify_rows (element / subtotal / grand total) ทุกครั้งที่อ่าน
+ไม่ให้ถูกนับเป็นรายการจริงตอนเทรนหรือรวมปริมาณ - ค่าที่ Revit รวมไว้ และผลรวมของแถวรายการ
+เก็บที่ df.attrs['totals'] (ตรวจว่าอ่านแถวครบด้วย schedule_totals)
+
+อ่านไฟล์ครั้งเดียว: ดู bytes ช่วงต้นไฟล์ (SNIFF_BYTES) เพื่อหา encoding และแถว header
+แล้วให้ pandas parse ทั้งไฟล์ครั้งเดียวด้วย encoding ที่หาได้
+
+ไฟล์ใหญ่ (export ทั้งโปรเจกต์ทุก Level): iter_schedule อ่านทีละ chunk (ไม่เกิน chunk_rows แถว)
+แต่ละ chunk ตัดแถวว่าง / header ซ้ำ / แถวผลรวม และแปลงคอลัมน์ตัวเลขแล้ว
+ใช้หน่วยความจำคงที่ตามขนาด chunk ไม่ขึ้นกับขนาดไฟล์ (CSV เท่านั้น - XLSX อ่านทั้งไฟล์แล้วแบ่ง chunk)
+
+ใช้ร่วมกันโดย foundation_ml / column_ml / beam_ml / slab_ml, bulk_estimate และ app.py
+"""
+
+import os
+import csv
+import io
+import re
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from quantity_parser import clean_numeric_columns, parse_quantity
+from timing import record, stage
+
+ENCODINGS = ['utf-8-sig', 'cp874', 'windows-1252']
+
+# จำนวน bytes ต้นไฟล์ที่ใช้หา encoding / header
+SNIFF_BYTES = 16 * 1024
+
+# ชื่อคอลัมน์ที่บอกว่าแถวนี้คือ header
+HEADER_KEYWORDS = {'Type', 'Count', 'Width', 'Depth', 'Length', 'Thickness', 'Default Thickness',
+                   'Perimeter', 'Area', 'Volume', 'Formwork', 'Family', 'B', 'H', 'Cut Length'}
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+
+# จำนวนแถวต่อ chunk ของ iter_schedule
+CHUNK_ROWS = 50_000
+
+# แถวที่มีช่องเกิน header (ข้อความมี comma แต่ไม่มีเครื่องหมายคำพูด เช่น Type "... LL=200, SDL=250")
+# รวมช่องที่เกินกลับเป็นช่องเดียว - ลองที่ Type ก่อน แล้วคอลัมน์ข้อความอื่น แล้วคอลัมน์ปริมาณ (จากซ้ายไปขวา)
+REPAIR_FIRST = 'Type'
+# คอลัมน์ปริมาณ (ชื่อมีคำเหล่านี้ หรือ B / H) ต้องว่างหรือขึ้นต้นด้วยตัวเลขหลังรวมช่อง
+QUANTITY_WORDS = ('width', 'depth', 'length', 'thickness', 'perimeter', 'area', 'volume', 'formwork', 'count',
+                  'height', 'radius')
+NUMBER_START = re.compile(r'^\s*[-+]?\.?\d')
+
+# แถวผลรวมของกลุ่ม: คอลัมน์แรกเป็น "ชื่อกลุ่ม: จำนวน" เช่น "Round Column: 123", "Level 1: 29", "Grand total: 177"
+SUBTOTAL_PATTERN = r'^.+:\s*\d+$'
+GRAND_TOTAL_LABEL = 'grand total'
+
+# ชนิดของแถว (classify_rows) และคอลัมน์ที่เก็บชนิดเมื่อไม่ตัดแถวผลรวมทิ้ง
+ROW_KIND = 'Row Kind'
+ROW_ELEMENT = 'element'
+ROW_SUBTOTAL = 'subtotal'
+ROW_GRAND_TOTAL = 'grand_total'
+
+# 'drop' = ตัดแถวผลรวมทิ้ง (ค่าเริ่มต้น), 'keep' = เก็บไว้พร้อมคอลัมน์ Row Kind
+# ตั้งค่าเริ่มต้นได้ด้วย environment variable SCHEDULE_TOTALS
+TOTALS_MODES = ('drop', 'keep')
+
+
+def source_name(source):
+    """ชื่อไฟล์ของ source (path หรือ file-like ที่มี .name)"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    return getattr(source, 'name', '') or ''
+
+
+def read_head(source, size=SNIFF_BYTES):
+    """อ่าน bytes ช่วงต้นไฟล์ (ไม่ขยับตำแหน่งของ file-like)"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read(size)
+    if hasattr(source, 'getbuffer'):
+        return bytes(source.getbuffer()[:size])
+    pos = source.tell()
+    head = source.read(size)
+    source.seek(pos)
+    return head
+
+
+def decode_head(head, enc):
+    """decode bytes ช่วงต้นไฟล์ - ยอมให้ตัวอักษรสุดท้ายถูกตัดครึ่ง"""
+    try:
+        return head.decode(enc)
+    except UnicodeDecodeError as e:
+        # ตัวอักษร multi-byte ที่ถูกตัดตรงขอบ SNIFF_BYTES
+        if len(head) >= SNIFF_BYTES and e.start >= len(head) - 4:
+            return head[:e.start].decode(enc)
+        raise
+
+
+def sniff_encodings(head):
+    """รายการ encoding ที่ decode ต้นไฟล์ได้ (เรียงตามลำดับที่ควรลอง)"""
+    found = []
+    for enc in ENCODINGS:
+        try:
+            found.append((enc, decode_head(head, enc)))
+        except UnicodeDecodeError:
+            continue
+    if not found:
+        raise ValueError("ไม่สามารถ decode ไฟล์ได้")
+    return found
+
+
+def is_header_row(cells):
+    """แถวนี้เป็น header หรือไม่ (มีชื่อคอลัมน์ที่รู้จักอย่างน้อย 2 ช่อง)"""
+    names = {str(c).strip() for c in cells if c is not None and str(c).strip()}
+    return len(names & HEADER_KEYWORDS) >= 2
+
+
+def find_header_row(rows):
+    """หา index ของแถว header จากแถวแรกๆ ของไฟล์"""
+    for idx, cells in enumerate(rows):
+        if is_header_row(cells):
+            return idx
+    return 0
+
+
+def clean_schedule(df):
+    """ลบแถว/คอลัมน์ว่าง, header ซ้ำ และ strip ชื่อคอลัมน์"""
+    # isna ครั้งเดียวใช้ได้ทั้งแถวและคอลัมน์
+    empty = df.isna().to_numpy()
+    df = df.loc[~empty.all(axis=1), ~empty.all(axis=0)]
+    df.columns = [str(c).strip() for c in df.columns]
+    if len(df.columns):
+        df = df[df.iloc[:, 0].to_numpy() != 'Type']
+    return df
+
+
+def is_quantity_column(name):
+    lower = str(name).strip().lower()
+    return lower in ('b', 'h') or any(word in lower for word in QUANTITY_WORDS)
+
+
+class LineRepair:
+    """ซ่อมแถวที่มีช่องเกิน header (ใช้ใน RepairedCSV) - รวมช่องที่เกินของแถวกลับเป็นช่องเดียว
+    แถวที่รวมแล้วคอลัมน์ปริมาณยังไม่ใช่ตัวเลขทุกตำแหน่ง -> ข้ามแถวนั้น (นับไว้ที่ skipped)"""
+
+    def __init__(self, header):
+        self.width = len(header)
+        names = [str(c).strip() for c in header]
+        self.quantity = [i for i, name in enumerate(names) if is_quantity_column(name)]
+        text = [i for i in range(self.width) if i not in self.quantity]
+        self.positions = sorted(text, key=lambda i: names[i] != REPAIR_FIRST) + self.quantity
+        self.repaired = 0
+        self.skipped = 0
+
+    def __call__(self, fields):
+        extra = len(fields) - self.width
+        if extra > 0:
+            for i in self.positions:
+                row = fields[:i] + [','.join(fields[i:i + extra + 1])] + fields[i + extra + 1:]
+                if all(not row[j] or NUMBER_START.match(row[j]) for j in self.quantity):
+                    self.repaired += 1
+                    return row
+        self.skipped += 1
+        return None
+
+    def report(self):
+        return {'repaired': self.repaired, 'skipped': self.skipped}
+
+
+class RepairedCSV(io.TextIOBase):
+    """ข้อความ CSV ที่ซ่อมแถวแล้ว (file-like ให้ pandas อ่าน) - แถวหลัง header ที่มีช่องเกินผ่าน LineRepair
+    แถวที่ซ่อมไม่ได้ถูกตัดออก ไม่ใช้ on_bad_lines ของ pandas เพราะถ้าแถวข้อมูลแรกมีช่องเกิน
+    pandas จะเดาช่องที่เกินเป็น index แล้วเลื่อนทุกคอลัมน์ไปหนึ่งช่อง (ไม่เรียก on_bad_lines)
+    อ่านทีละ FILL_ROWS แถวตามที่ pandas ขอ - ไม่โหลดทั้งไฟล์"""
+
+    FILL_ROWS = 1000
+
+    def __init__(self, stream, repair, header_row):
+        self.rows = enumerate(csv.reader(stream))
+        self.repair = repair
+        self.header_row = header_row
+        self.out = io.StringIO()
+        self.writer = csv.writer(self.out, lineterminator='\n')
+        self.buffer = ''
+        self.done = False
+
+    def readable(self):
+        return True
+
+    def fill(self):
+        for _ in range(self.FILL_ROWS):
+            item = next(self.rows, None)
+            if item is None:
+                self.done = True
+                break
+            i, fields = item
+            if i > self.header_row and len(fields) > self.repair.width:
+                fields = self.repair(fields)
+                if fields is None:
+                    continue
+            self.writer.writerow(fields)
+        self.buffer += self.out.getvalue()
+        self.out.seek(0)
+        self.out.truncate()
+
+    def read(self, size=-1):
+        while not self.done and (size is None or size < 0 or len(self.buffer) < size):
+            self.fill()
+        if size is None or size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+@contextmanager
+def open_text(source, enc):
+    """เปิด source เป็นข้อความด้วย encoding ที่หาได้ (file-like ไม่ถูกปิด)"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding=enc, newline='') as f:
+            yield f
+        return
+    rewind(source)
+    f = io.TextIOWrapper(source, encoding=enc, newline='')
+    try:
+        yield f
+    finally:
+        f.detach()
+
+
+def describe_bad_lines(report):
+    """ข้อความสรุปแถวที่ซ่อม/ข้าม ('' ถ้าไม่มี)"""
+    if not report:
+        return ''
+    parts = []
+    if report.get('repaired'):
+        parts.append(f"ซ่อมแถวที่มีช่องเกิน {report['repaired']:,} แถว")
+    if report.get('skipped'):
+        parts.append(f"ข้ามแถวที่อ่านไม่ได้ {report['skipped']:,} แถว")
+    return ', '.join(parts)
+
+
+def rewind(source):
+    """กลับไปต้นไฟล์ (สำหรับ file-like)"""
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def csv_layouts(source):
+    """(encoding, แถว header, encoding ที่ส่งให้ pandas, ช่องของ header) ของทุก encoding ที่ decode ต้นไฟล์ได้"""
+    head = read_head(source)
+    for enc, text in sniff_encodings(head):
+        lines = text.splitlines()
+        # แถวสุดท้ายของ head อาจถูกตัดครึ่ง - ใช้เฉพาะแถวที่ครบ
+        if len(head) >= SNIFF_BYTES and len(lines) > 1:
+            lines = lines[:-1]
+        rows = list(csv.reader(lines))
+        header_row = find_header_row(rows)
+        header = rows[header_row] if header_row < len(rows) else []
+        # BOM อยู่ในแถวที่ถูกข้ามอยู่แล้ว - ใช้ codec utf-8 ของ pandas ที่เร็วกว่า utf-8-sig
+        pandas_enc = 'utf-8' if enc == 'utf-8-sig' and header_row > 0 else enc
+        yield enc, header_row, pandas_enc, header
+
+
+def read_schedule_csv(source):
+    """อ่าน CSV schedule - หา encoding/header จากต้นไฟล์ แล้ว parse ครั้งเดียว
+    แถวที่มีช่องเกิน header: parse ใหม่ผ่าน RepairedCSV (จำนวนแถวที่ซ่อม/ข้ามอยู่ที่ df.attrs['bad_lines'])"""
+    name = os.path.basename(source_name(source))
+    start = time.perf_counter()
+    candidates = list(csv_layouts(source))
+
+    for i, (enc, header_row, pandas_enc, header) in enumerate(candidates):
+        record('detect_header', time.perf_counter() - start, file=name)
+
+        start = time.perf_counter()
+        repair = LineRepair(header)
+        try:
+            try:
+                # ไฟล์ส่วนใหญ่ไม่มีแถวเสีย - อ่านไฟล์ตรงๆ ก่อน
+                rewind(source)
+                df = pd.read_csv(source, encoding=pandas_enc, skiprows=header_row, header=0, on_bad_lines='error')
+                # แถวข้อมูลแรกมีช่องเกิน -> pandas ใช้ช่องที่เกินเป็น index แทนที่จะ error
+                repaired = not isinstance(df.index, pd.RangeIndex)
+            except pd.errors.ParserError:
+                repaired = True
+            if repaired:
+                with open_text(source, enc) as stream:
+                    df = pd.read_csv(RepairedCSV(stream, repair, header_row), skiprows=header_row, header=0)
+        except UnicodeDecodeError:
+            # ต้นไฟล์ decode ได้แต่ส่วนหลังไม่ได้ - ลอง encoding ถัดไป
+            if i == len(candidates) - 1:
+                raise
+            start = time.perf_counter()
+            continue
+
+        df = clean_schedule(df)
+        record('read_file', time.perf_counter() - start, file=name, rows=len(df))
+        df.attrs['encoding'] = enc
+        df.attrs['header_row'] = header_row
+        df.attrs['bad_lines'] = repair.report()
+        return df
+
+
+def read_schedule_excel(source):
+    """อ่าน Excel schedule (parse ครั้งเดียว แล้วตั้ง header จากแถวที่พบ)"""
+    name = os.path.basename(source_name(source))
+    with stage('read_file', file=name):
+        raw = pd.read_excel(source, header=None)
+    with stage('detect_header', file=name):
+        header_row = find_header_row(raw.head(50).itertuples(index=False))
+
+    df = raw.iloc[header_row + 1:].copy()
+    df.columns = raw.iloc[header_row].tolist()
+    df = df.loc[:, df.columns.notna()]
+    # header=None ทำให้ทุกคอลัมน์เป็น object - แปลงคอลัมน์ที่เป็นตัวเลขล้วนให้เป็น numeric dtype
+    df = clean_schedule(df.reset_index(drop=True)).infer_objects()
+    df.attrs['header_row'] = header_row
+    return df
+
+
+def read_schedule(source, totals=None):
+    """อ่านไฟล์ schedule (CSV หรือ XLSX) เป็น DataFrame
+    totals = 'drop' (ตัดแถวผลรวม) / 'keep' (เก็บไว้ + คอลัมน์ Row Kind) - None ใช้ค่าจาก SCHEDULE_TOTALS
+    ผลรวมที่ schedule คำนวณไว้เองอยู่ที่ df.attrs['totals'] ทั้งสองแบบ"""
+    if source_name(source).lower().endswith(EXCEL_EXTENSIONS):
+        df = read_schedule_excel(source)
+    else:
+        df = read_schedule_csv(source)
+    with stage('classify_rows', file=os.path.basename(source_name(source)), rows=len(df)):
+        return apply_totals(df, totals)
+
+
+# ===================================
+# แถวผลรวม (subtotal / grand total)
+# ===================================
+def totals_mode(totals=None):
+    """'drop' หรือ 'keep' (ค่าเริ่มต้นจาก environment variable SCHEDULE_TOTALS)"""
+    totals = totals or os.environ.get('SCHEDULE_TOTALS', 'drop')
+    if totals not in TOTALS_MODES:
+        raise ValueError(f"totals ต้องเป็น {TOTALS_MODES} ไม่ใช่ {totals!r}")
+    return totals
+
+
+def classify_rows(df):
+    """ชนิดของทุกแถวในครั้งเดียว (vectorized): ROW_ELEMENT / ROW_SUBTOTAL / ROW_GRAND_TOTAL
+
+    subtotal:    คอลัมน์แรกเป็น "ชื่อกลุ่ม: จำนวน" (เช่น "Round Column: 123", "Foundation: 2")
+                 หรือจำนวนล้วนโดยคอลัมน์ที่สองว่าง (schedule ที่จัดกลุ่มแบบไม่มีชื่อกลุ่ม)
+    grand total: "Grand total: N" หรือคอลัมน์แรกว่างและคอลัมน์ที่สองไม่ใช่ข้อความ (ว่าง / จำนวน)
+    """
+    if not len(df.columns):
+        return np.full(len(df), ROW_ELEMENT, dtype=object)
+
+    first = df.iloc[:, 0].astype('string').str.strip()
+    if len(df.columns) > 1:
+        second = df.iloc[:, 1].astype('string').str.strip().fillna('')
+    else:
+        second = pd.Series('', index=df.index, dtype='string')
+    second_blank = second.to_numpy() == ''
+    second_count = second.str.fullmatch(r'[\d.,]+').to_numpy(dtype=bool)
+
+    labelled = first.str.match(SUBTOTAL_PATTERN).fillna(False).to_numpy(dtype=bool)
+    grand_label = first.str.lower().str.startswith(GRAND_TOTAL_LABEL).fillna(False).to_numpy(dtype=bool)
+    count_only = first.str.fullmatch(r'\d+').fillna(False).to_numpy(dtype=bool) & second_blank
+    blank = first.fillna('').to_numpy() == ''
+
+    return np.select(
+        [grand_label | (blank & (second_blank | second_count)), labelled | count_only],
+        [ROW_GRAND_TOTAL, ROW_SUBTOTAL],
+        ROW_ELEMENT,
+    ).astype(object)
+
+
+def total_summary(df, kinds):
+    """ค่าที่ schedule รวมไว้เองจากแถว subtotal / grand total (dict/list ล้วน - เก็บใน attrs / cache ได้)
+    subtotals = [{'count': จำนวนในแถว, 'values': {คอลัมน์: ค่า}}, ...] เรียงตามไฟล์
+    element_rows = {คอลัมน์ปริมาณ: ผลรวมของทุกแถวรายการ} ใช้ตรวจกับ grand total ว่าอ่านแถวครบ"""
+    summary = {'subtotals': [], 'grand_total': {}, 'grand_total_rows': int((kinds == ROW_GRAND_TOTAL).sum()),
+               'element_rows': {}}
+    elements = kinds == ROW_ELEMENT
+    for col in df.columns[1:]:
+        if col != ROW_KIND and is_quantity_column(col):
+            values = parse_quantity(df.loc[elements, col])[0]
+            if values.notna().any():
+                summary['element_rows'][col] = float(values.sum())
+    for kind in (ROW_SUBTOTAL, ROW_GRAND_TOTAL):
+        mask = kinds == kind
+        if not mask.any():
+            continue
+        # คอลัมน์แรกเป็นชื่อกลุ่ม / จำนวน - ไม่ใช่ปริมาณ
+        values = pd.DataFrame({col: parse_quantity(df.loc[mask, col])[0]
+                               for col in df.columns[1:] if col != ROW_KIND})
+        values = values.loc[:, values.notna().any()]
+        if kind == ROW_GRAND_TOTAL:
+            summary['grand_total'] = {col: float(value) for col, value in values.sum().items()}
+            continue
+        counts = df.loc[mask].iloc[:, 0].astype('string').str.extract(r'(\d+)\s*$')[0].astype(float)
+        for count, row in zip(counts.tolist(), values.to_dict('records')):
+            summary['subtotals'].append({'count': None if pd.isna(count) else int(count),
+                                         'values': {col: v for col, v in row.items() if not pd.isna(v)}})
+    return summary
+
+
+def merge_summaries(a, b):
+    """รวม total_summary ของหลาย chunk ในไฟล์เดียวกัน (None = ไม่มีผลรวม)"""
+    if a is None or b is None:
+        return a or b
+    grand_total = dict(a['grand_total'])
+    for col, value in b['grand_total'].items():
+        grand_total[col] = grand_total.get(col, 0.0) + value
+    element_rows = dict(a['element_rows'])
+    for col, value in b['element_rows'].items():
+        element_rows[col] = element_rows.get(col, 0.0) + value
+    return {'subtotals': a['subtotals'] + b['subtotals'], 'grand_total': grand_total,
+            'grand_total_rows': a['grand_total_rows'] + b['grand_total_rows'], 'element_rows': element_rows}
+
+
+def schedule_totals(summary):
+    """grand total ของ schedule ต่อคอลัมน์ ({} ถ้าระบุแถว grand total ไม่ได้)
+    - มีแถว grand total -> ใช้แถวนั้น
+    - แถวผลรวมสุดท้ายมีจำนวนเท่ากับผลรวมจำนวนของ subtotal ก่อนหน้า -> แถวสุดท้ายคือ grand total
+      (schedule ที่จัดกลุ่มโดยไม่มีชื่อกลุ่ม แถวรวมทั้งหมดมีแค่จำนวนในคอลัมน์แรกเหมือน subtotal)
+    - ไม่เช่นนั้นไม่เดา (รวม subtotal จะนับซ้ำเมื่อจัดกลุ่มซ้อนหลายชั้น)
+    ใช้ตรวจ element_rows เท่านั้น - ผลทำนายเทียบกับค่ารายแถวของ schedule เฉพาะแถวที่ทำนาย (bulk_estimate)"""
+    if not summary:
+        return {}
+    if summary['grand_total']:
+        return dict(summary['grand_total'])
+
+    subtotals = summary['subtotals']
+    if len(subtotals) > 1:
+        last, rest = subtotals[-1], subtotals[:-1]
+        if last['count'] is not None and all(s['count'] is not None for s in rest) \
+                and last['count'] == sum(s['count'] for s in rest):
+            return dict(last['values'])
+    return {}
+
+
+def apply_totals(df, totals=None):
+    """แยกแถวผลรวมตามโหมด และเก็บ total_summary ไว้ที่ df.attrs['totals']"""
+    totals = totals_mode(totals)
+    kinds = classify_rows(df)
+    summary = total_summary(df, kinds)
+    if totals == 'drop':
+        df = df[kinds == ROW_ELEMENT]
+    else:
+        df = df.copy()
+        df[ROW_KIND] = kinds
+    df.attrs['totals'] = summary
+    return df
+
+
+# ===================================
+# อ่านทีละ chunk (ไฟล์ใหญ่)
+# ===================================
+def clean_chunk(df, numeric=(), totals=None):
+    """ทำความสะอาด 1 chunk: strip ชื่อคอลัมน์, ตัดแถวว่าง / header ซ้ำ, แยกแถวผลรวม แล้วแปลงคอลัมน์ตัวเลข
+    (ไม่ตัดคอลัมน์ว่าง - ทุก chunk ต้องมีคอลัมน์ชุดเดียวกัน)"""
+    df.columns = [str(c).strip() for c in df.columns]
+    keep = ~df.isna().to_numpy().all(axis=1)
+    if len(df.columns):
+        keep &= df.iloc[:, 0].to_numpy() != 'Type'
+    df = apply_totals(df[keep], totals)
+    return clean_numeric_columns(df.copy(), [c for c in numeric if c in df.columns])
+
+
+def iter_schedule_csv(source, chunk_rows=CHUNK_ROWS, usecols=None, numeric=(), totals=None):
+    """อ่าน CSV schedule ทีละ chunk (DataFrame ไม่เกิน chunk_rows แถว)
+    usecols = เก็บเฉพาะคอลัมน์ที่ต้องใช้ (ชื่อตาม header), numeric = คอลัมน์ที่แปลงเป็นตัวเลข
+    ผลรวมของ schedule ใน chunk นั้นอยู่ที่ chunk.attrs['totals'] (รวมทั้งไฟล์ด้วย merge_summaries)
+    แถวที่มีช่องเกิน header ซ่อมด้วย RepairedCSV - จำนวนที่ซ่อม/ข้ามที่อ่านถึงระหว่าง chunk นั้นอยู่ที่
+    chunk.attrs['bad_lines'] (pandas อ่านล่วงหน้าเป็นช่วง แถวใกล้ขอบ chunk อาจนับไปกับ chunk ข้างเคียง - รวมทั้งไฟล์ถูกต้อง)"""
+    name = os.path.basename(source_name(source))
+    candidates = list(csv_layouts(source))
+
+    # อ่านผ่าน RepairedCSV เป็นข้อความที่ decode แล้ว - ไม่ใช้ encoding ที่ส่งให้ pandas
+    for i, (enc, header_row, _, header) in enumerate(candidates):
+        yielded = False
+        repair = LineRepair(header)
+        try:
+            with open_text(source, enc) as stream:
+                # อ่านทุกคอลัมน์เป็นข้อความ - ชนิดข้อมูลไม่เปลี่ยนไปตาม chunk (ตัวเลขแปลงใน clean_chunk)
+                # ซ่อมแถวระหว่างอ่าน (RepairedCSV) ไม่ต้องอ่านไฟล์ซ้ำ - pandas อ่านล่วงหน้าตั้งแต่สร้าง reader
+                seen = repair.report()
+                reader = pd.read_csv(RepairedCSV(stream, repair, header_row), skiprows=header_row, header=0,
+                                     dtype=str, chunksize=chunk_rows)
+                with reader:
+                    for n, chunk in enumerate(reader):
+                        counts = repair.report()
+                        with stage('read_chunk', file=name, chunk=n, rows=len(chunk)):
+                            chunk = clean_chunk(chunk, numeric, totals)
+                            if usecols is not None:
+                                chunk = chunk[[c for c in chunk.columns if c in set(usecols) or c == ROW_KIND]]
+                        chunk.attrs['encoding'] = enc
+                        chunk.attrs['header_row'] = header_row
+                        chunk.attrs['bad_lines'] = {key: counts[key] - seen[key] for key in counts}
+                        seen = counts
+                        yielded = True
+                        yield chunk
+            return
+        except UnicodeDecodeError:
+            # chunk ที่ส่งออกไปแล้วเรียกคืนไม่ได้ - ลอง encoding ถัดไปได้เฉพาะเมื่อยังไม่ได้ส่ง chunk ใด
+            if yielded or i == len(candidates) - 1:
+                raise
+
+
+def iter_schedule(source, chunk_rows=CHUNK_ROWS, usecols=None, numeric=(), totals=None):
+    """อ่านไฟล์ schedule ทีละ chunk - CSV อ่านแบบ streaming, XLSX อ่านทั้งไฟล์แล้วแบ่ง chunk"""
+    if not source_name(source).lower().endswith(EXCEL_EXTENSIONS):
+        yield from iter_schedule_csv(source, chunk_rows, usecols, numeric, totals)
+        return
+
+    df = read_schedule(source, totals)
+    summary = df.attrs['totals']
+    if usecols is not None:
+        df = df[[c for c in df.columns if c in set(usecols) or c == ROW_KIND]]
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = clean_numeric_columns(df.iloc[start:start + chunk_rows].copy(), [c for c in numeric if c in df.columns])
+        # ผลรวมของทั้งไฟล์อยู่กับ chunk แรก - รวมด้วย merge_summaries ได้เหมือน CSV
+        chunk.attrs['totals'] = summary if start == 0 else None
+        yield chunk
@@ -0,0 +1,216 @@
+"""
+Steel Data - อ่าน Steel in ML.xlsx ครั้งเดียว แล้วแยก sheet ตามส่วนงาน (index ตามชื่อ sheet)
+ใช้ร่วมกันทุกสคริปต์เทรน (column_ml / beam_ml / slab_ml) และ train_all
+
+- parse workbook ครั้งเดียวต่อไฟล์ต่อ process (ผ่าน parse_cache + memo ในหน่วยความจำ)
+- ทำความสะอาดทุก sheet ครั้งเดียว (ลบแถว/คอลัมน์ว่าง, ตัดช่องว่างชื่อคอลัมน์)
+- index: ส่วนงาน -> ชื่อ sheet ตามคำในชื่อ sheet (SHEET_KEYWORDS)
+  ไม่มี sheet ของส่วนงานนั้น -> ใช้ sheet แรก
+
+ตัวอย่าง:
+    workbook = steel_workbook('Steel in ML.xlsx')
+    df = workbook.for_element('beam')          # DataFrame ของ sheet คาน (หรือ sheet แรก)
+    workbook.slab_sheets()                     # {'RC': df, 'PT': df} หรือ {'ALL': df}
+    df_beam, report = join_steel(df_beam, df)   # เติมคอลัมน์ Steel โดยจับคู่ Type Mark / Type / Level
+
+การรวม Steel เข้ากับ schedule (join_steel):
+- จับคู่แถวด้วย key ที่มีทั้งสองตาราง (Type Mark, Type, Level) ผ่าน hash index ของ key -> น้ำหนักเหล็ก
+- เก็บทุกแถวของ schedule (แถวที่ไม่มีคู่ได้ NaN) - ไม่ตัดตามจำนวนแถวที่น้อยกว่า และไม่จับคู่ตามลำดับแถว
+- key ซ้ำในตาราง Steel -> รวมน้ำหนักของ key นั้น
+- รายงานจำนวนแถวที่จับคู่ได้ / ไม่ได้ และ key ของ Steel ที่ไม่ถูกใช้
+"""
+
+import os
+
+import pandas as pd
+
+from parse_cache import cached_workbook
+from quantity_parser import clean_numeric_columns
+
+STEEL_FILE = 'Steel in ML.xlsx'
+
+# ชนิด sheet -> คำในชื่อ sheet (ตัวพิมพ์เล็ก) - 1 sheet อาจตรงได้หลายชนิด
+SHEET_KEYWORDS = {
+    'beam': ['beam', 'framing', 'คาน'],
+    'column': ['column', 'เสา'],
+    'slab': ['slab', 'floor', 'พื้น'],
+}
+# ชนิดย่อยของ sheet พื้น
+SLAB_KEYWORDS = {
+    'RC': ['rc'],
+    'PT': ['pt', 'post', 'tension', 'อัดแรง'],
+}
+
+# key สำหรับจับคู่แถว Steel กับแถว schedule -> ชื่อคอลัมน์ที่ใช้ได้ (ตัวพิมพ์เล็ก) เรียงตามลำดับที่ใช้
+JOIN_KEYS = {
+    'Type Mark': ['type mark'],
+    'Type': ['type', 'family and type'],
+    'Level': ['level', 'reference level', 'base level'],
+}
+KEY_SEPARATOR = '\x1f'
+# จำนวนตัวอย่าง key ที่ไม่มีคู่ในรายงาน
+REPORT_SAMPLES = 5
+
+# memo ของ process: path -> (mtime_ns, size, SteelWorkbook)
+_workbooks = {}
+
+
+def clean_sheet(df):
+    """ลบแถว/คอลัมน์ที่ว่างทั้งหมด และตัดช่องว่างของชื่อคอลัมน์"""
+    df = df.dropna(how='all').dropna(axis=1, how='all')
+    df.columns = df.columns.astype(str).str.strip()
+    return df
+
+
+def sheet_kinds(sheet_name):
+    """ชนิดของ sheet จากชื่อ เช่น 'RC Slab' -> ['slab', 'slab_RC']"""
+    lower = sheet_name.lower()
+    kinds = [kind for kind, words in SHEET_KEYWORDS.items() if any(word in lower for word in words)]
+    if 'slab' in kinds:
+        # RC ก่อน PT (ชื่อที่มีทั้งสองคำถือเป็น RC)
+        sub = next((sub for sub, words in SLAB_KEYWORDS.items() if any(word in lower for word in words)), None)
+        if sub is not None:
+            kinds.append(f'slab_{sub}')
+    return kinds
+
+
+class SteelWorkbook:
+    """ทุก sheet ของ Steel in ML.xlsx (ทำความสะอาดแล้ว) + index ตามชนิด"""
+
+    def __init__(self, sheets, path=None):
+        self.path = path
+        self.sheets = {str(name): clean_sheet(df) for name, df in sheets.items()}
+        self.index = {}
+        for name in self.sheets:
+            for kind in sheet_kinds(name):
+                self.index.setdefault(kind, []).append(name)
+
+    def names(self):
+        return list(self.sheets)
+
+    def sheet(self, kind):
+        """sheet แรกของชนิด (None ถ้าไม่มี)"""
+        names = self.index.get(kind)
+        return self.sheets[names[0]] if names else None
+
+    def first(self):
+        return next(iter(self.sheets.values()), None)
+
+    def for_element(self, element):
+        """sheet ของส่วนงาน (beam / column) หรือ sheet แรกถ้าไม่มี sheet ที่ชื่อตรง"""
+        df = self.sheet(element)
+        return df if df is not None else self.first()
+
+    def slab_sheets(self):
+        """sheet ของพื้นแยก RC / PT - ไม่มีทั้งคู่ใช้ sheet แรกเป็น 'ALL'"""
+        sheets = {sub: self.sheet(f'slab_{sub}') for sub in SLAB_KEYWORDS}
+        sheets = {sub: df for sub, df in sheets.items() if df is not None}
+        if not sheets and self.sheets:
+            sheets['ALL'] = self.first()
+        return sheets
+
+
+def load_steel_workbook(path=STEEL_FILE):
+    """อ่านไฟล์ครั้งเดียวต่อ process (อ่านใหม่เมื่อไฟล์เปลี่ยน)"""
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    memo = _workbooks.get(key)
+    if memo is not None and memo[:2] == (stat.st_mtime_ns, stat.st_size):
+        return memo[2]
+    workbook = SteelWorkbook(cached_workbook(path), path)
+    _workbooks[key] = (stat.st_mtime_ns, stat.st_size, workbook)
+    return workbook
+
+
+def steel_workbook(path=STEEL_FILE, sheets=None):
+    """SteelWorkbook จาก sheets ที่มีอยู่แล้ว (SteelWorkbook หรือ dict ชื่อ sheet -> DataFrame) หรืออ่านจากไฟล์"""
+    if isinstance(sheets, SteelWorkbook):
+        return sheets
+    if sheets is not None:
+        return SteelWorkbook(sheets, path)
+    return load_steel_workbook(path)
+
+
+# ===================================
+# รวม Steel เข้ากับ schedule
+# ===================================
+def steel_total_column(df):
+    """คอลัมน์น้ำหนักเหล็กรวม (ชื่อมี total และ steel / reinf / kg) หรือ None"""
+    for col in df.columns:
+        col_lower = col.lower()
+        if 'total' in col_lower and ('steel' in col_lower or 'reinf' in col_lower or 'kg' in col_lower):
+            return col
+    return None
+
+
+def key_columns(df):
+    """key ที่ตารางมี -> ชื่อคอลัมน์จริง"""
+    columns = {str(col).strip().lower(): col for col in df.columns}
+    found = {}
+    for key, names in JOIN_KEYS.items():
+        col = next((columns[name] for name in names if name in columns), None)
+        if col is not None:
+            found[key] = col
+    return found
+
+
+def row_keys(df, columns):
+    """key ของแต่ละแถว: ข้อความของคอลัมน์ key ต่อกัน (ตัดช่องว่าง, ไม่สนตัวพิมพ์) - key ไม่ครบได้ NA"""
+    key = None
+    for col in columns:
+        part = df[col].astype('string').str.strip().str.casefold().replace('', pd.NA)
+        key = part if key is None else key + KEY_SEPARATOR + part
+    return key
+
+
+def join_steel(df, df_steel, target=None):
+    """เติมน้ำหนักเหล็กให้ทุกแถวของ df โดยจับคู่ key กับตาราง Steel
+    target = ชื่อคอลัมน์ที่เติม (ค่าเริ่มต้น = ชื่อคอลัมน์เหล็กรวมของตาราง Steel)
+    คืนค่า (df ใหม่, report) - report เป็น None ถ้าตาราง Steel ไม่มีคอลัมน์เหล็กรวม (df ไม่เปลี่ยน)"""
+    steel_col = steel_total_column(df_steel)
+    if steel_col is None:
+        return df, None
+    target = target or steel_col
+
+    left, right = key_columns(df), key_columns(df_steel)
+    keys = [key for key in JOIN_KEYS if key in left and key in right]
+    report = {
+        'steel_column': steel_col, 'keys': keys, 'rows': len(df), 'matched': 0, 'unmatched': len(df),
+        'unmatched_keys': [], 'steel_rows': len(df_steel), 'steel_unused': len(df_steel),
+    }
+    df = df.copy()
+    if not keys:
+        df[target] = float('nan')
+        return df, report
+
+    # hash index: key -> น้ำหนักเหล็กรวมของ key
+    steel = clean_numeric_columns(df_steel[[right[key] for key in keys] + [steel_col]].copy(), [steel_col])
+    index = steel[steel_col].groupby(row_keys(steel, [right[key] for key in keys])).sum(min_count=1)
+
+    schedule_keys = row_keys(df, [left[key] for key in keys])
+    df[target] = schedule_keys.map(index).astype(float).to_numpy()
+
+    matched = schedule_keys.isin(index.index).to_numpy()
+    samples = df.loc[~matched, [left[key] for key in keys]].drop_duplicates().head(REPORT_SAMPLES)
+    report.update(
+        matched=int(matched.sum()),
+        unmatched=int((~matched).sum()),
+        unmatched_keys=[' | '.join(map(str, row)) for row in samples.itertuples(index=False)],
+        steel_unused=int((~index.index.isin(schedule_keys.dropna())).sum()),
+    )
+    return df, report
+
+
+def print_join_report(report, label='Steel'):
+    """แสดงผลการจับคู่ของ join_steel"""
+    if report is None:
+        print(f"  ⚠️ {label}: ไม่พบคอลัมน์น้ำหนักเหล็กรวม")
+        return
+    if not report['keys']:
+        print(f"  ⚠️ {label}: ไม่มีคอลัมน์ key ร่วมกัน ({' / '.join(JOIN_KEYS)}) - ไม่รวม Steel")
+        return
+    print(f"  ✓ รวม {label} ด้วย key {report['keys']}: จับคู่ได้ {report['matched']}/{report['rows']} แถว")
+    if report['unmatched']:
+        print(f"  ⚠️ ไม่มีคู่ใน Steel: {report['unmatched']} แถว เช่น {report['unmatched_keys']}")
+    if report['steel_unused']:
+        print(f"  ⚠️ key ใน Steel ที่ไม่มีแถวใน schedule: {report['steel_unused']} key")
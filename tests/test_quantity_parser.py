@@ -0,0 +1,78 @@
+"""
+ตรวจ parse_quantity - ค่าที่แปลงได้เป็นข้อมูลเทรนและผลรวมโดยตรง
+
+รัน:
+    python -m pytest tests/test_quantity_parser.py
+"""
+
+import math
+
+import pandas as pd
+import pytest
+
+from quantity_parser import clean_numeric_columns, parse_quantity
+
+
+def parse(values):
+    numbers, unit = parse_quantity(pd.Series(values, dtype=object))
+    return numbers.tolist(), unit
+
+
+def same(a, b):
+    return len(a) == len(b) and all(math.isclose(x, y) or (math.isnan(x) and math.isnan(y)) for x, y in zip(a, b))
+
+
+# (ค่าใน schedule, ตัวเลขที่ได้, หน่วยของคอลัมน์)
+CASES = [
+    # หน่วยเดียวทั้งคอลัมน์ (กรณีปกติของ Revit)
+    (['2.80 m'], [2.8], 'm'),
+    (['34.56 m²'], [34.56], 'm²'),
+    (['10.368 m³'], [10.368], 'm³'),
+    (['10.368 m3', '2 m3'], [10.368, 2.0], 'm³'),
+    (['12.5 kg'], [12.5], 'kg'),
+    # mm -> m
+    (['250 mm'], [0.25], 'm'),
+    (['1,200 mm'], [1.2], 'm'),
+    # thousands separator
+    (['1,884.000'], [1884.0], None),
+    (['1,200'], [1200.0], None),
+    # หน่วยปนกันในคอลัมน์เดียว - แปลงทีละค่า, หน่วยของคอลัมน์ = หน่วยที่พบบ่อยที่สุด
+    (['250 mm', '2.5 m'], [0.25, 2.5], 'm'),
+    (['1 m²', '2 m', '3 m'], [1.0, 2.0, 3.0], 'm'),
+    # ไม่ใช่ปริมาณ -> NaN (ไม่ตัดตัวอักษรทิ้งจนได้ตัวเลขผิด)
+    (['3-R'], [math.nan], None),
+    (['<varies>'], [math.nan], None),
+    (['2.80 m', '3-R'], [2.8, math.nan], 'm'),
+    # ค่าว่าง / ช่องว่างรอบตัวเลข / ค่าซ้ำ
+    ([None, '1 m'], [math.nan, 1.0], 'm'),
+    ([' 7 '], [7.0], None),
+    (['2 m', '2 m', '3 m'], [2.0, 2.0, 3.0], 'm'),
+]
+
+
+@pytest.mark.parametrize('values, expected, unit', CASES)
+def test_parse_quantity(values, expected, unit):
+    numbers, found = parse(values)
+    assert same(numbers, expected)
+    assert found == unit
+
+
+def test_numeric_column_unchanged():
+    numbers, unit = parse_quantity(pd.Series([1, 2]))
+    assert numbers.tolist() == [1.0, 2.0]
+    assert unit is None
+
+
+def test_empty_column():
+    numbers, unit = parse_quantity(pd.Series([None, None], dtype=object))
+    assert numbers.isna().all()
+    assert unit is None
+
+
+def test_clean_numeric_columns_records_units():
+    df = pd.DataFrame({'Width': ['300 mm', '400 mm'], 'Volume': ['1.5 m³', '2 m³'], 'Type': ['C1', 'C2']})
+    df = clean_numeric_columns(df, ['Width', 'Volume', 'Missing'])
+    assert df['Width'].tolist() == [0.3, 0.4]
+    assert df['Volume'].tolist() == [1.5, 2.0]
+    assert df['Type'].tolist() == ['C1', 'C2']
+    assert df.attrs['units'] == {'Width': 'm', 'Volume': 'm³'}
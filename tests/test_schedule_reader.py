@@ -0,0 +1,156 @@
+"""
+ตรวจ heuristic ของ schedule_reader - แยกแถวผลรวม (classify_rows / schedule_totals)
+และซ่อมแถวที่ comma ในชื่อ Type ทำให้มีช่องเกิน header (LineRepair / RepairedCSV)
+
+รัน:
+    python -m pytest tests/test_schedule_reader.py
+"""
+
+import io
+
+import pandas as pd
+import pytest
+
+from schedule_reader import (ROW_ELEMENT, ROW_GRAND_TOTAL, ROW_SUBTOTAL, LineRepair, classify_rows, iter_schedule,
+                             read_schedule, schedule_totals)
+
+TITLE = '"4.2 PS Floor ปริมาณพื้นคอนกรีตอัดแรง"\n'
+HEADER = 'Type,Count,Default Thickness,Area,Volume\n'
+
+
+def csv_source(*rows, encoding='utf-8-sig'):
+    """ไฟล์ CSV แบบที่ Revit export: ชื่อ schedule, header, แถวว่าง แล้วแถวข้อมูล"""
+    return io.BytesIO((TITLE + HEADER + '\n' + ''.join(row + '\n' for row in rows)).encode(encoding))
+
+
+# ===================================
+# classify_rows
+# ===================================
+# (คอลัมน์แรก, คอลัมน์ที่สอง, ชนิดของแถว)
+ROWS = [
+    ('C1', '2', ROW_ELEMENT),
+    ('3-R', '1', ROW_ELEMENT),
+    ('3', '4', ROW_ELEMENT),
+    ('Type A: note', 'x', ROW_ELEMENT),
+    ('Level 1: 10', '', ROW_SUBTOTAL),
+    ('Rectangular Column: 229', None, ROW_SUBTOTAL),
+    ('3', '', ROW_SUBTOTAL),
+    ('Grand total: 177', '', ROW_GRAND_TOTAL),
+    ('', '177', ROW_GRAND_TOTAL),
+    ('', '', ROW_GRAND_TOTAL),
+]
+
+
+@pytest.mark.parametrize('first, second, kind', ROWS)
+def test_classify_rows(first, second, kind):
+    df = pd.DataFrame([(first, second)], columns=['Type', 'Count'])
+    assert classify_rows(df).tolist() == [kind]
+
+
+def test_classify_rows_whole_frame():
+    df = pd.DataFrame([row[:2] for row in ROWS], columns=['Type', 'Count'])
+    assert classify_rows(df).tolist() == [row[2] for row in ROWS]
+
+
+# ===================================
+# schedule_totals (grand total)
+# ===================================
+def subtotal(count, **values):
+    return {'count': count, 'values': values}
+
+
+@pytest.mark.parametrize('summary, expected', [
+    # มีแถว grand total
+    ({'subtotals': [subtotal(2, Volume=1.0)], 'grand_total': {'Volume': 5.0}}, {'Volume': 5.0}),
+    # แถวผลรวมสุดท้ายมีจำนวนเท่ากับผลรวมของ subtotal ก่อนหน้า -> แถวนั้นคือ grand total
+    ({'subtotals': [subtotal(2, Volume=1.0), subtotal(3, Volume=2.0), subtotal(5, Volume=3.0)],
+      'grand_total': {}}, {'Volume': 3.0}),
+    # จำนวนไม่ตรง (จัดกลุ่มซ้อน) -> ไม่เดา
+    ({'subtotals': [subtotal(2, Volume=1.0), subtotal(3, Volume=2.0)], 'grand_total': {}}, {}),
+    ({'subtotals': [subtotal(2, Volume=1.0)], 'grand_total': {}}, {}),
+    (None, {}),
+])
+def test_schedule_totals(summary, expected):
+    assert schedule_totals(summary) == expected
+
+
+def test_read_schedule_splits_totals():
+    df = read_schedule(csv_source(
+        'RC Slab,2,0.20 m,50 m²,10 m³',
+        'PT Slab,1,0.25 m,100 m²,25 m³',
+        'Floor: 3,,,,',
+        ',3,,150 m²,35 m³',
+    ))
+    assert df['Type'].tolist() == ['RC Slab', 'PT Slab']
+    totals = df.attrs['totals']
+    assert totals['grand_total_rows'] == 1
+    assert schedule_totals(totals) == {'Count': 3.0, 'Area': 150.0, 'Volume': 35.0}
+    assert totals['element_rows']['Volume'] == 35.0
+
+
+def test_read_schedule_keeps_totals():
+    df = read_schedule(csv_source('RC Slab,2,0.20 m,50 m²,10 m³', ',2,,50 m²,10 m³'), totals='keep')
+    assert df['Row Kind'].tolist() == [ROW_ELEMENT, ROW_GRAND_TOTAL]
+
+
+# ===================================
+# แถวที่มีช่องเกิน header
+# ===================================
+HEADER_FIELDS = ['Type', 'Count', 'Default Thickness', 'Area', 'Volume']
+
+
+@pytest.mark.parametrize('fields, expected', [
+    # comma ในชื่อ Type -> รวมกลับที่ Type
+    (['PT Slab LL=200', ' SDL=250', '1', '0.25 m', '100 m²', '25 m³'],
+     ['PT Slab LL=200, SDL=250', '1', '0.25 m', '100 m²', '25 m³']),
+    (['A', 'B', 'C', '1', '0.25 m', '100 m²', '25 m³'], ['A,B,C', '1', '0.25 m', '100 m²', '25 m³']),
+    # รวมตรงไหนก็ได้คอลัมน์ปริมาณที่ไม่ใช่ตัวเลข -> ข้าม
+    (['Slab', 'x', 'y', 'z', '1', '2'], None),
+])
+def test_line_repair(fields, expected):
+    repair = LineRepair(HEADER_FIELDS)
+    assert repair(fields) == expected
+    assert repair.report() == {'repaired': int(expected is not None), 'skipped': int(expected is None)}
+
+
+def test_line_repair_prefers_text_over_count():
+    # Type ไม่ใช่คอลัมน์แรก - ต้องรวมที่ Type ไม่ใช่ Count ('2,Steel')
+    repair = LineRepair(['Count', 'Type', 'Volume'])
+    assert repair(['2', 'Steel', 'x', '1 m³']) == ['2', 'Steel,x', '1 m³']
+
+
+ROWS_WITH_COMMAS = [
+    'PT Slab LL=200, SDL=250,1,0.25 m,100 m²,25 m³',
+    'RC Slab,2,0.20 m,50 m²,10 m³',
+    '"Quoted, Type",1,0.10 m,1 m²,"1,000 m³"',
+    'bad,x,y,1,2,3',
+]
+EXPECTED_TYPES = ['PT Slab LL=200, SDL=250', 'RC Slab', 'Quoted, Type']
+
+
+@pytest.mark.parametrize('encoding', ['utf-8-sig', 'utf-8'])
+def test_read_schedule_repairs_rows(encoding):
+    # แถวข้อมูลแรกมีช่องเกิน - pandas จะเดาเป็น index ถ้าไม่ซ่อมก่อน parse
+    df = read_schedule(csv_source(*ROWS_WITH_COMMAS, encoding=encoding))
+    assert df['Type'].tolist() == EXPECTED_TYPES
+    assert df['Volume'].tolist() == ['25 m³', '10 m³', '1,000 m³']
+    assert df.attrs['bad_lines'] == {'repaired': 1, 'skipped': 1}
+
+
+def test_read_schedule_repairs_later_rows():
+    df = read_schedule(csv_source(*ROWS_WITH_COMMAS[1:2], *ROWS_WITH_COMMAS[:1]))
+    assert df['Type'].tolist() == ['RC Slab', 'PT Slab LL=200, SDL=250']
+    assert df.attrs['bad_lines'] == {'repaired': 1, 'skipped': 0}
+
+
+def test_iter_schedule_repairs_rows():
+    chunks = list(iter_schedule(csv_source(*ROWS_WITH_COMMAS), chunk_rows=2))
+    assert [t for chunk in chunks for t in chunk['Type']] == EXPECTED_TYPES
+    assert sum(chunk.attrs['bad_lines']['repaired'] for chunk in chunks) == 1
+    assert sum(chunk.attrs['bad_lines']['skipped'] for chunk in chunks) == 1
+
+
+def test_clean_file_not_repaired():
+    df = read_schedule(csv_source('RC Slab,2,0.20 m,50 m²,10 m³', 'PT Slab,1,0.25 m,100 m²,25 m³'))
+    assert df['Type'].tolist() == ['RC Slab', 'PT Slab']
+    assert df.attrs['bad_lines'] == {'repaired': 0, 'skipped': 0}
@@ -0,0 +1,130 @@
+"""
+Timing - จับเวลาแต่ละขั้นตอนของการเทรน แล้วสรุปเป็นรายงาน (JSON + ตาราง)
+
+ขั้นตอนที่วัด:
+    read_file       อ่าน/parse ไฟล์ schedule หรือ Excel
+    detect_header   หา encoding และแถว header
+    cache_load      hash ไฟล์ + โหลดผลที่ parse แล้วจาก parse_cache (hit=False ถ้าไม่มีใน cache)
+    cache_save      เก็บผล parse ลง parse_cache
+    clean_numeric   แปลงคอลัมน์ปริมาณเป็นตัวเลข
+    steel_merge     รวมข้อมูล Steel in ML.xlsx เข้ากับ schedule
+    scale           แบ่ง train/test + fit StandardScaler
+    fingerprint     hash ข้อมูลเทรน (skip-retrain)
+    fit             เทรน + วัดผลโมเดล 1 ตัว (ใน process ลูก - เวลารวมอาจมากกว่าเวลาจริงเพราะรันพร้อมกัน)
+    pickle          เขียนไฟล์ .pkl
+    export_compact  เขียนโฟลเดอร์ .compact
+
+เก็บ record เฉพาะใน collect() (หรือหลัง enable() ในสคริปต์ที่รันครั้งเดียวจบ) - นอกนั้น record() ไม่เก็บอะไร
+process ที่รันนาน (Streamlit, prediction_server, batch) เรียก stage() / record() ผ่าน schedule_reader ฯลฯ ได้
+โดยไม่สะสม record ไปเรื่อยๆ
+
+ตัวอย่าง:
+    from timing import collect, stage, print_report, write_report
+    with collect():
+        with stage('read_file', file='3.0 Framing ปริมาณคาน.csv'):
+            df = read_schedule(path)
+    print_report()
+    write_report('training_timing.json')
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+REPORT_FILE = 'training_timing.json'
+
+_records = []
+_lock = threading.Lock()
+# จำนวน collect() ที่เปิดอยู่ (enable() = เปิดค้างไว้ตลอด process)
+_collecting = 0
+
+
+@contextmanager
+def collect():
+    """เก็บ record ใน with block นี้ - block นอกสุดล้าง record เก่าตอนเริ่ม
+    record ยังอ่านได้หลังจบ block (print_report / write_report) จนกว่าจะเริ่ม collect ครั้งถัดไป"""
+    global _collecting
+    with _lock:
+        if not _collecting:
+            _records.clear()
+        _collecting += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _collecting -= 1
+
+
+def enable():
+    """เก็บ record ไปจนจบ process (สคริปต์เทรนที่รันครั้งเดียวจบ)"""
+    global _collecting
+    with _lock:
+        _collecting += 1
+
+
+def record(name, seconds, **info):
+    """บันทึกเวลาของขั้นตอน 1 ครั้ง (ไม่เก็บถ้าไม่ได้อยู่ใน collect())"""
+    if not _collecting:
+        return
+    with _lock:
+        _records.append(dict(info, stage=name, seconds=seconds))
+
+
+@contextmanager
+def stage(name, **info):
+    """จับเวลาโค้ดใน with block"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start, **info)
+
+
+def get_records():
+    with _lock:
+        return list(_records)
+
+
+def reset():
+    with _lock:
+        _records.clear()
+
+
+def summarize(records=None):
+    """รวมเวลาตามขั้นตอน (เรียงตามลำดับที่เจอครั้งแรก)"""
+    records = get_records() if records is None else records
+    summary = {}
+    for rec in records:
+        item = summary.setdefault(rec['stage'], {'stage': rec['stage'], 'count': 0, 'total_s': 0.0, 'max_s': 0.0})
+        item['count'] += 1
+        item['total_s'] += rec['seconds']
+        item['max_s'] = max(item['max_s'], rec['seconds'])
+    return list(summary.values())
+
+
+def print_report(records=None):
+    """แสดงตารางสรุปเวลาแต่ละขั้นตอน"""
+    summary = summarize(records)
+    if not summary:
+        return
+    print("\n" + "="*70)
+    print("⏱️ เวลาแต่ละขั้นตอน")
+    print("="*70)
+    print(f"  {'stage':<16}{'ครั้ง':>8}{'รวม (s)':>12}{'สูงสุด (s)':>14}")
+    for item in summary:
+        print(f"  {item['stage']:<16}{item['count']:>8}{item['total_s']:>12.3f}{item['max_s']:>14.3f}")
+
+
+def write_report(path=REPORT_FILE, records=None, **extra):
+    """เขียนรายงาน JSON (สรุป + ทุก record) คืนค่า path"""
+    records = get_records() if records is None else records
+    report = dict(extra, created_at=datetime.now().isoformat(timespec='seconds'),
+                  summary=summarize(records), records=records)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+    return path
@@ -0,0 +1,149 @@
+"""
+Train All - เทรนโมเดลทุกส่วนงาน (ฐานราก / เสา / คาน / พื้น) ในคำสั่งเดียว
+
+- อ่านไฟล์ข้อมูลแต่ละไฟล์ครั้งเดียว (Steel in ML.xlsx อ่านครั้งเดียวผ่าน steel_data.py แล้วแชร์ให้ทุกส่วนงาน)
+  ผ่าน parse_cache - ไฟล์ที่ไม่เปลี่ยนไม่ต้อง parse ใหม่
+- งานเทรน (ส่วนงาน × target × โมเดล) ทั้งหมดรันพร้อมกันใน process pool เดียว
+- บันทึกโมเดลลง MODEL ML/ แบบ atomic (เขียนไฟล์ชั่วคราวแล้ว os.replace)
+  app.py ที่เปิดอยู่จะไม่โหลดไฟล์ที่เขียนไม่เสร็จ
+- target ที่ fingerprint (ข้อมูล + features + hyperparameters + เวอร์ชันโค้ด) ตรงกับไฟล์ .pkl เดิม
+  จะไม่ถูกเทรนซ้ำ ใช้ --force เพื่อเทรนใหม่ทั้งหมด
+- เวลาแต่ละขั้นตอน (อ่านไฟล์, แปลงตัวเลข, รวม Steel, scale, fit, pickle) แสดงเป็นตาราง
+  และบันทึกเป็น JSON ที่ <output-dir>/training_timing.json
+
+รัน:
+    python train_all.py
+    python train_all.py --elements beam slab --workers 4
+    python train_all.py --data-dir "MODEL ML" --output-dir /tmp/models
+    python train_all.py --force
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from model_registry import BASE_DIR, MODEL_DIR
+from steel_data import STEEL_FILE, load_steel_workbook
+from timing import REPORT_FILE, collect, print_report, write_report
+from training import (SerialExecutor, collect_models, default_workers, save_models, skipped_targets,
+                      submit_models)
+
+# ===================================
+# สคริปต์เทรนของแต่ละส่วนงาน
+# ===================================
+SCRIPTS_DIR = os.path.join(BASE_DIR, 'Foundation xlsx', 'Modelที่ใช้งาน')
+
+ELEMENT_SCRIPTS = {
+    'foundation': os.path.join('ฐานราก+ทดสอบ', 'foundation_ml.py'),
+    'column': os.path.join('เสา+ทดสอบ', 'column_ml.py'),
+    'beam': os.path.join('คาน', 'beam_ml.py'),
+    'slab': os.path.join('พื้น', 'slab_ml.py'),
+}
+
+
+def load_script(element):
+    """import สคริปต์เทรนจาก path (โฟลเดอร์เป็นชื่อภาษาไทย import ตรงๆ ไม่ได้)"""
+    path = os.path.join(SCRIPTS_DIR, ELEMENT_SCRIPTS[element])
+    spec = importlib.util.spec_from_file_location(f"{element}_ml", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_steel_sheets(data_dir):
+    """อ่าน Steel in ML.xlsx ครั้งเดียวเป็น SteelWorkbook ให้ทุกส่วนงานใช้ร่วมกัน (None ถ้าไม่มีไฟล์)"""
+    path = os.path.join(data_dir, STEEL_FILE)
+    if not os.path.exists(path):
+        print(f"⚠️ ไม่พบ {path} - เทรนโดยไม่มีข้อมูล Steel")
+        return None
+    return load_steel_workbook(path)
+
+
+# ===================================
+# Orchestrator
+# ===================================
+def train_all(elements=None, data_dir=MODEL_DIR, output_dir=MODEL_DIR, max_workers=None, force=False):
+    """เทรนทุกส่วนงานพร้อมกัน
+
+    คืนค่า (saved, skipped): dict element -> list ของไฟล์ที่บันทึก
+    และ dict element -> list ของ target ที่ใช้โมเดลเดิม
+    """
+    elements = elements or list(ELEMENT_SCRIPTS)
+    workers = max_workers or default_workers()
+    os.makedirs(output_dir, exist_ok=True)
+
+    steel_sheets = load_steel_sheets(data_dir)
+    modules = {element: load_script(element) for element in elements}
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else SerialExecutor()
+    try:
+        # 1. โหลด + เตรียมข้อมูลทีละส่วนงาน แล้วส่งงานเทรนเข้า pool ทันที
+        #    ส่วนงานถัดไปเตรียมข้อมูลระหว่างที่ pool กำลังเทรนส่วนงานก่อนหน้า
+        pending = {}
+        for element, module in modules.items():
+            print(f"\n{'#'*70}\n# {element}\n{'#'*70}")
+            try:
+                inputs = module.load_inputs(data_dir, steel_sheets)
+                jobs, features = module.build_jobs(*inputs)
+            except Exception as e:
+                print(f"\n❌ {element}: เตรียมข้อมูลไม่สำเร็จ: {e}")
+                continue
+            if not jobs:
+                print(f"\n❌ {element}: ไม่พบคอลัมน์ features ที่ใช้ได้")
+                continue
+            pending[element] = submit_models(jobs, element, executor, module.ARTIFACTS, output_dir, force)
+
+        # 2. เก็บผลตามลำดับส่วนงาน (ผลลัพธ์ไม่ขึ้นกับว่างานไหนเสร็จก่อน) แล้วบันทึก
+        saved, skipped = {}, {}
+        for element, element_pending in pending.items():
+            results = collect_models(element_pending)
+            saved[element] = save_models(results, modules[element].ARTIFACTS, output_dir)
+            skipped[element] = skipped_targets(results)
+        return saved, skipped
+    finally:
+        if isinstance(executor, ProcessPoolExecutor):
+            executor.shutdown()
+
+
+# ===================================
+# CLI
+# ===================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="เทรนโมเดลทุกส่วนงานในคำสั่งเดียว")
+    parser.add_argument('--elements', nargs='+', choices=list(ELEMENT_SCRIPTS), help="ส่วนงานที่ต้องการเทรน (ค่าเริ่มต้น: ทั้งหมด)")
+    parser.add_argument('--data-dir', default=MODEL_DIR, help="โฟลเดอร์ไฟล์ schedule และ Steel in ML.xlsx")
+    parser.add_argument('--output-dir', default=MODEL_DIR, help="โฟลเดอร์ที่บันทึกไฟล์ .pkl")
+    parser.add_argument('--workers', type=int, help="จำนวน process (ค่าเริ่มต้น: จำนวน core)")
+    parser.add_argument('--force', action='store_true', help="เทรนใหม่ทุก target แม้ข้อมูลไม่เปลี่ยน")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with collect():
+        saved, skipped = train_all(args.elements, args.data_dir, args.output_dir, args.workers, args.force)
+    elapsed = time.perf_counter() - start
+
+    print("\n" + "="*70)
+    print(" ✅ เทรนเสร็จสมบูรณ์! ")
+    print("="*70)
+    for element in args.elements or ELEMENT_SCRIPTS:
+        files = saved.get(element)
+        if files is None:
+            print(f"  ❌ {element}: ไม่ได้เทรน")
+            continue
+        print(f"  {element}: เทรนใหม่ {len(files)} โมเดล, ข้าม {len(skipped[element])} โมเดล (ไม่เปลี่ยน)")
+        for path in files:
+            print(f"    💾 {os.path.basename(path)}")
+    print_report()
+    report = write_report(os.path.join(args.output_dir, REPORT_FILE), elements=args.elements or list(ELEMENT_SCRIPTS),
+                          total_seconds=elapsed)
+    print(f"\n⏱️ ใช้เวลา {elapsed:.1f} วินาที (รายละเอียด: {report})")
+
+    return 0 if len(saved) == len(args.elements or ELEMENT_SCRIPTS) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
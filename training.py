@@ -0,0 +1,415 @@
+"""
+Training - เทรนโมเดลของทุก target พร้อมกันด้วย process pool
+ใช้ร่วมกันโดย foundation_ml / column_ml / beam_ml / slab_ml
+
+งาน 1 ชิ้น = (target, โมเดลที่ลอง) เช่น ('Volume', 'Random Forest')
+ทุกชิ้นถูกส่งเข้า process pool พร้อมกัน แล้วเลือกโมเดลที่ดีที่สุดของแต่ละ target
+ตามลำดับเดิมเสมอ (R² สูงสุด, ถ้าเท่ากันเลือกตัวที่อยู่ก่อนใน CANDIDATES)
+ผลลัพธ์จึงเหมือนกันทุกครั้งไม่ว่างานไหนจะเสร็จก่อน
+
+ตัวอย่าง:
+    from training import train_models
+    results = train_models([
+        ('Volume', df, features, 'Volume'),
+        ('Formwork', df, features, 'Formwork'),
+    ], element='column')
+    model, scaler, feature_names, metadata = results['Volume']
+
+Skip-retrain: แต่ละ target มี fingerprint จาก ข้อมูลที่ใช้เทรนจริง (X, y),
+features, target, hyperparameters และเวอร์ชันโค้ด (training.py + scikit-learn)
+fingerprint ถูกฝังไว้ในไฟล์ .pkl (key 'metadata') ถ้าตรงกับของเดิม target นั้นจะไม่ถูกเทรนซ้ำ
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from compact_model import compact_path, export_compact
+from model_registry import file_sha256
+from timing import record, stage
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+# โมเดลที่ลอง (ลำดับนี้ใช้ตัดสินเมื่อ R² เท่ากัน)
+CANDIDATES = ['Random Forest', 'Gradient Boosting', 'Linear Regression']
+
+# hyperparameters ของแต่ละส่วนงาน (ค่าเดิมจากแต่ละสคริปต์)
+SHALLOW_PARAMS = {
+    'Random Forest': {'n_estimators': 100, 'max_depth': 5},
+    'Gradient Boosting': {'n_estimators': 50, 'max_depth': 3},
+    'Linear Regression': {},
+}
+DEEP_PARAMS = {
+    'Random Forest': {'n_estimators': 100, 'max_depth': 10},
+    'Gradient Boosting': {'n_estimators': 100, 'max_depth': 5},
+    'Linear Regression': {},
+}
+ELEMENT_PARAMS = {
+    'foundation': SHALLOW_PARAMS,
+    'column': SHALLOW_PARAMS,
+    'beam': DEEP_PARAMS,
+    'slab': DEEP_PARAMS,
+}
+
+MIN_ROWS = 5
+RANDOM_STATE = 42
+
+# metadata ของ target ที่เลิกใช้ (งานที่ build_jobs ส่ง df = None) - save_models ลบไฟล์โมเดลเดิมของ target นี้
+RETIRED = {'retired': True}
+
+_code_version = None
+
+
+def code_version():
+    """เวอร์ชันของโค้ดเทรน = hash ของ training.py + เวอร์ชัน scikit-learn"""
+    global _code_version
+    if _code_version is None:
+        with open(os.path.abspath(__file__), 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        _code_version = f"{digest}-sklearn{sklearn.__version__}"
+    return _code_version
+
+
+def data_hash(X, y):
+    """hash ของข้อมูลที่ใช้เทรนจริง (ค่าและลำดับแถว)"""
+    frame = pd.concat([X, y.rename('__target__')], axis=1)
+    hashed = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    return hashlib.sha256(hashed.tobytes()).hexdigest()
+
+
+def fingerprint(metadata):
+    """fingerprint จาก metadata ส่วนที่มีผลต่อโมเดล"""
+    keys = ['element', 'target', 'target_col', 'features', 'params', 'data_hash', 'code_version']
+    payload = json.dumps({k: metadata[k] for k in keys}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def make_model(name, params):
+    """สร้างโมเดลตามชื่อ"""
+    if name == 'Random Forest':
+        return RandomForestRegressor(random_state=RANDOM_STATE, **params)
+    if name == 'Gradient Boosting':
+        return GradientBoostingRegressor(random_state=RANDOM_STATE, **params)
+    if name == 'Linear Regression':
+        return LinearRegression(**params)
+    raise ValueError(f"ไม่รู้จักโมเดล: {name}")
+
+
+# ========================================
+# เตรียมข้อมูลของแต่ละ target
+# ========================================
+def prepare_target(df, feature_cols, target_col, model_name, element):
+    """แบ่ง train/test และ fit scaler คืนค่า dict ของข้อมูล หรือ None ถ้าเทรนไม่ได้"""
+    if target_col is None or target_col not in df.columns:
+        print(f"\n⚠️ ข้ามการเทรน {model_name} (ไม่พบข้อมูล)")
+        return None
+
+    print(f"\n{'='*70}")
+    print(f"🤖 เตรียมข้อมูล: {model_name}")
+    print(f"{'='*70}")
+
+    X = df[feature_cols].copy()
+    y = df[target_col].copy()
+
+    # ตรวจสอบข้อมูล
+    valid_mask = ~(X.isnull().any(axis=1) | y.isnull())
+    X = X[valid_mask]
+    y = y[valid_mask]
+
+    print(f"📊 จำนวนข้อมูล: {len(X)} แถว")
+    if 'Slab_Type' in X.columns:
+        print(f"   - RC: {(X['Slab_Type']==0).sum()} แถว")
+        print(f"   - PT: {(X['Slab_Type']==1).sum()} แถว")
+    print(f"📊 Features: {X.columns.tolist()}")
+    print(f"📊 Target range: {y.min():.2f} - {y.max():.2f}")
+
+    if len(X) < MIN_ROWS:
+        print(f"❌ ข้อมูลน้อยเกินไป (ต้องการอย่างน้อย {MIN_ROWS} แถว)")
+        return None
+
+    with stage('scale', element=element, target=model_name, rows=len(X)):
+        test_size = 0.2 if len(X) >= 10 else 0.1
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=test_size, random_state=RANDOM_STATE
+        )
+
+        # Standardize (ใช้กับ Linear Regression)
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+
+    start = time.perf_counter()
+    metadata = {
+        'element': element,
+        'target': model_name,
+        'target_col': target_col,
+        'features': X.columns.tolist(),
+        'params': ELEMENT_PARAMS[element],
+        'data_hash': data_hash(X, y),
+        'code_version': code_version(),
+        'rows': len(X),
+    }
+    metadata['fingerprint'] = fingerprint(metadata)
+    record('fingerprint', time.perf_counter() - start, element=element, target=model_name)
+
+    return {
+        'features': X.columns.tolist(),
+        'metadata': metadata,
+        'scaler': scaler,
+        'raw': (X_train, y_train, X_test, y_test),
+        'scaled': (X_train_scaled, y_train, X_test_scaled, y_test),
+    }
+
+
+# ========================================
+# งานใน process pool
+# ========================================
+def fit_candidate(task):
+    """เทรนและวัดผลโมเดล 1 ตัว (รันใน process ลูก - คืนเวลาที่ใช้ใน 'seconds')"""
+    name, params, (X_train, y_train, X_test, y_test) = task
+    start = time.perf_counter()
+    try:
+        model = make_model(name, params)
+        model.fit(X_train, y_train)
+        y_pred = model.predict(X_test)
+    except Exception as e:
+        return {'model': None, 'error': str(e), 'seconds': time.perf_counter() - start}
+
+    return {
+        'seconds': time.perf_counter() - start,
+        'model': model,
+        'r2': r2_score(y_test, y_pred),
+        'mae': mean_absolute_error(y_test, y_pred),
+        'rmse': np.sqrt(mean_squared_error(y_test, y_pred)),
+    }
+
+
+def default_workers():
+    """จำนวน process เริ่มต้น = จำนวน core"""
+    return os.cpu_count() or 1
+
+
+class SerialExecutor:
+    """executor ที่รันงานทันทีใน process เดียว (ใช้เมื่อ max_workers = 1)"""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def pick_best(model_name, results):
+    """แสดงผลและเลือกโมเดลที่ R² สูงสุด (เท่ากัน = ตัวที่อยู่ก่อน)"""
+    print(f"\n{'='*70}")
+    print(f"🤖 ผลการเทรน: {model_name}")
+    print(f"{'='*70}")
+    print("\n📈 ผลการทดสอบโมเดล:")
+
+    best_name, best = None, None
+    for name, result in results:
+        if result['model'] is None:
+            print(f"  ⚠️ {name} ล้มเหลว: {result['error']}")
+            continue
+
+        print(f"\n  {name}:")
+        print(f"    R² Score: {result['r2']:.4f}")
+        print(f"    MAE: {result['mae']:.4f}")
+        print(f"    RMSE: {result['rmse']:.4f}")
+        print(f"    เวลาเทรน: {result['seconds']:.3f} s")
+
+        if best is None or result['r2'] > best['r2']:
+            best_name, best = name, result
+
+    if best is not None:
+        print(f"\n✅ เลือกใช้: {best_name} (R² = {best['r2']:.4f})")
+    return best_name, best
+
+
+# ========================================
+# API หลัก
+# ========================================
+def read_artifact(path):
+    """อ่านไฟล์โมเดลเดิม (None ถ้าไม่มีหรืออ่านไม่ได้)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def submit_models(jobs, element, executor, artifacts=None, output_dir='.', force=False):
+    """เตรียมข้อมูลทุก target แล้วส่งงาน (target × โมเดล) เข้า executor ทันที
+
+    jobs: list ของ (model_name, df, feature_cols, target_col) - df เป็น None = target ที่เลิกใช้ (ไม่เทรน, ลบโมเดลเดิม)
+    artifacts: target -> ชื่อไฟล์โมเดล (ถ้าระบุ จะข้าม target ที่ fingerprint ตรงกับไฟล์เดิม)
+    คืนค่างานที่รอผล ส่งต่อให้ collect_models
+    """
+    params = ELEMENT_PARAMS[element]
+
+    pending = []
+    for model_name, df, feature_cols, target_col in jobs:
+        if df is None:
+            pending.append((model_name, RETIRED, [], None))
+            continue
+        data = prepare_target(df, feature_cols, target_col, model_name, element)
+        futures, existing = [], None
+
+        if data is not None and artifacts and not force:
+            path = os.path.join(output_dir, artifacts[model_name])
+            existing = read_artifact(path)
+            old_fingerprint = (existing or {}).get('metadata', {}).get('fingerprint')
+            if old_fingerprint == data['metadata']['fingerprint']:
+                print(f"⏭️ ข้าม {model_name}: ข้อมูลและการตั้งค่าไม่เปลี่ยน ({artifacts[model_name]})")
+            else:
+                existing = None
+
+        if data is not None and existing is None:
+            for name in CANDIDATES:
+                split = data['scaled'] if name == 'Linear Regression' else data['raw']
+                futures.append((name, executor.submit(fit_candidate, (name, params[name], split))))
+        pending.append((model_name, data, futures, existing))
+    return pending
+
+
+def collect_models(pending):
+    """รอผลตามลำดับ jobs แล้วเลือกโมเดลที่ดีที่สุดของแต่ละ target
+
+    คืนค่า dict model_name -> (model, scaler, feature_names, metadata)
+    (model เป็น None ถ้าเทรนไม่ได้, metadata['skipped'] = True ถ้าใช้โมเดลเดิม,
+    metadata['retired'] = True ถ้า target เลิกใช้แล้ว)
+    """
+    results = {}
+    for model_name, data, futures, existing in pending:
+        if data is None:
+            results[model_name] = (None, None, None, None)
+            continue
+
+        if data is RETIRED:
+            results[model_name] = (None, None, None, dict(RETIRED))
+            continue
+
+        if existing is not None:
+            metadata = dict(existing['metadata'], skipped=True)
+            results[model_name] = (existing['model'], existing['scaler'], existing['feature_names'], metadata)
+            continue
+
+        fitted = [(name, future.result()) for name, future in futures]
+        for name, result in fitted:
+            record('fit', result['seconds'], element=data['metadata']['element'], target=model_name, candidate=name)
+        best_name, best = pick_best(model_name, fitted)
+        if best is None:
+            results[model_name] = (None, data['scaler'], data['features'], None)
+            continue
+
+        metadata = dict(data['metadata'], candidate=best_name, r2=float(best['r2']),
+                        trained_at=datetime.now().isoformat(timespec='seconds'), skipped=False)
+        results[model_name] = (best['model'], data['scaler'], data['features'], metadata)
+    return results
+
+
+def train_models(jobs, element, max_workers=None, artifacts=None, output_dir='.', force=False):
+    """เทรนหลาย target พร้อมกันใน process pool (ข้าม target ที่ไม่เปลี่ยนถ้าระบุ artifacts)"""
+    workers = min(max_workers or default_workers(), len(jobs) * len(CANDIDATES))
+    if workers <= 1:
+        return collect_models(submit_models(jobs, element, SerialExecutor(), artifacts, output_dir, force))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return collect_models(submit_models(jobs, element, pool, artifacts, output_dir, force))
+
+
+def train_model(df, feature_cols, target_col, model_name, element, max_workers=None):
+    """เทรน target เดียว (ลองทุกโมเดลพร้อมกัน)"""
+    return train_models([(model_name, df, feature_cols, target_col)], element, max_workers)[model_name]
+
+
+# ========================================
+# บันทึกโมเดล
+# ========================================
+def save_model(model, scaler, feature_names, filename, metadata=None):
+    """บันทึกโมเดล - เขียนไฟล์ชั่วคราวแล้ว os.replace (app จะไม่เห็นไฟล์ที่เขียนไม่เสร็จ)
+
+    เขียนโฟลเดอร์ compact (NumPy array) คู่กันด้วย ให้ app โหลดได้โดยไม่ต้อง import scikit-learn
+    compact เขียนก่อน .pkl - registry ใช้ compact เฉพาะเมื่อ sha256 ของ .pkl ตรงกัน
+    """
+    if model is None:
+        return
+
+    model_data = {
+        'model': model,
+        'scaler': scaler,
+        'feature_names': feature_names
+    }
+    if metadata is not None:
+        model_data['metadata'] = {k: v for k, v in metadata.items() if k != 'skipped'}
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp_', suffix='.pkl', dir=directory)
+    name = os.path.basename(filename)
+    try:
+        with stage('pickle', file=name):
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(model_data, f)
+        with stage('export_compact', file=name):
+            export_compact(model, scaler, feature_names, filename, file_sha256(tmp_path), model_data.get('metadata'))
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    print(f"💾 บันทึกที่: {filename}")
+
+
+def remove_model(path):
+    """ลบไฟล์โมเดล .pkl และโฟลเดอร์ .compact ของไฟล์นั้น คืนค่า True ถ้ามีไฟล์ให้ลบ"""
+    removed = False
+    if os.path.exists(path):
+        os.remove(path)
+        removed = True
+    if os.path.isdir(compact_path(path)):
+        shutil.rmtree(compact_path(path))
+        removed = True
+    return removed
+
+
+def save_models(results, artifacts, output_dir='.'):
+    """บันทึกผลของ train_models ตามชื่อไฟล์ใน artifacts (target -> ไฟล์)
+
+    target ที่ถูกข้าม (fingerprint ไม่เปลี่ยน) จะไม่ถูกเขียนทับ
+    target ที่เลิกใช้ (metadata['retired'] เช่น Steel ที่อ่านไฟล์ได้แต่จับคู่ key ได้ไม่พอ)
+    -> ลบไฟล์โมเดลเดิม ไม่ให้ app / bulk / server ใช้โมเดลที่เทรนจากข้อมูลที่เลิกใช้แล้ว
+    target ที่ไม่มีในผลเลย (เช่น อ่านไฟล์ Steel ไม่ได้) หรือเทรนไม่สำเร็จ -> ไฟล์เดิมไม่ถูกแตะ
+    คืนค่า list ของไฟล์ที่บันทึก
+    """
+    saved = []
+    for model_name, (model, scaler, feature_names, metadata) in results.items():
+        path = os.path.join(output_dir, artifacts[model_name])
+        if (metadata or {}).get('retired'):
+            if remove_model(path):
+                print(f"🗑️ ลบโมเดลเดิมที่ไม่มีข้อมูลเทรนแล้ว: {artifacts[model_name]}")
+            continue
+        if model is None or (metadata or {}).get('skipped'):
+            continue
+        save_model(model, scaler, feature_names, path, metadata)
+        saved.append(path)
+    return saved
+
+
+def skipped_targets(results):
+    """รายชื่อ target ที่ใช้โมเดลเดิม (ไม่ได้เทรนใหม่)"""
+    return [name for name, result in results.items() if (result[3] or {}).get('skipped')]